@@ -1,24 +1,30 @@
 # src/python/AccreditationAuthority/accreditation_authority.py
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+import logging
 
-from utils.crypto_utils import generate_rsa_keys, sign_data, key_to_pem
+from config import SIGNATURE_SUITE
+from utils.crypto_utils import sign_data, key_to_pem
+from utils.key_pool import acquire_keys
+from utils.signature_suites import PublicKey, suite_for_key
 from models import Certificate, CertificateData
 
+logger = logging.getLogger(__name__)
+
 class AccreditationAuthority:
-    def __init__(self, name: str):
+    def __init__(self, name: str, signature_suite: str = SIGNATURE_SUITE):
         """Inizializza l'Ente di Accreditamento (EA)."""
         self.name = name
-        self.private_key, self.public_key = generate_rsa_keys()
-        print(f"Ente di Accreditamento '{self.name}' creato.")
+        self.private_key, self.public_key = acquire_keys(signature_suite)
+        logger.info("Ente di Accreditamento '%s' creato.", self.name)
 
-    def certify_university(self, university_id: str, university_public_key: RSAPublicKey) -> Certificate:
+    def certify_university(self, university_id: str, university_public_key: PublicKey) -> Certificate:
         """
         Firma la chiave pubblica di un'università, creando un certificato.
         Questo certificato attesta che l'EA riconosce l'università.
         """
         certificate_data = CertificateData(
             university_id=university_id,
-            public_key_pem=key_to_pem(university_public_key)
+            public_key_pem=key_to_pem(university_public_key),
+            signature_suite=suite_for_key(university_public_key).name
         )
         
         signature = sign_data(self.private_key, certificate_data)
@@ -29,5 +35,5 @@ class AccreditationAuthority:
             authority_name=self.name
         )
         
-        print(f"L'EA '{self.name}' ha certificato l'università '{university_id}'.")
+        logger.info("L'EA '%s' ha certificato l'università '%s'.", self.name, university_id)
         return certified_university
\ No newline at end of file
@@ -1,46 +1,307 @@
 # src/python/IssuingUniversity/issuing_university.py
-from typing import List, Dict, Any
+import functools
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from cryptography.hazmat.primitives import serialization
 
-from utils.crypto_utils import generate_rsa_keys, sign_data
+from config import ISSUANCE_QUEUE_SIZE, ISSUANCE_PARALLEL_THRESHOLD, BATCH_SIGNING_SIZE, MERKLE_TREE_VERSION, SIGNATURE_SUITE
+from utils.crypto_utils import sign_data
+from utils.key_pool import acquire_keys
 from utils.credential import AcademicCredential
+from utils.merkle_tree import MerkleTree
+from utils.metrics import DEFAULT_REGISTRY, MetricsRegistry, span
 from AccreditationAuthority.accreditation_authority import AccreditationAuthority
 from Student.wallet import StudentWallet
 from Revocation.revocation import RevocationRegistry
+from Revocation.status_list import BitstringStatusList
+from models import CredentialBatchRoot, IssuanceReport, StatusList, VerifiableCredentialPublicPart
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=8)
+def _load_signing_key(private_key_der: bytes):
+    """Deserializza una chiave di firma una sola volta per processo del pool."""
+    return serialization.load_der_private_key(private_key_der, password=None)
+
+def _sign_public_part_job(private_key_der: bytes, public_part: VerifiableCredentialPublicPart) -> bytes:
+    """
+    Job eseguito nei processi del pool: firma la parte pubblica di una credenziale.
+    La chiave viaggia con il job, così basta un qualsiasi pool di processi.
+    """
+    return sign_data(_load_signing_key(private_key_der), public_part)
+
 
 class IssuingUniversity:
-    def __init__(self, university_id: str, accreditation_authority: AccreditationAuthority):
+    def __init__(
+        self,
+        university_id: str,
+        accreditation_authority: AccreditationAuthority,
+        signature_suite: str = SIGNATURE_SUITE,
+        metrics: MetricsRegistry = DEFAULT_REGISTRY,
+        status_list_size: Optional[int] = None
+    ):
         """
         Inizializza l'Università Emittente (UE).
-        L'UE genera la propria coppia di chiavi e viene certificata da un EA.
+        L'UE genera la propria coppia di chiavi (nella suite di firma indicata)
+        e viene certificata da un EA. Le metriche di emissione sono pubblicate
+        nel registro metrics.
+
+        Con status_list_size ogni credenziale emessa riceve un indice in una
+        lista di stato di quella dimensione (una nuova lista quando è piena):
+        la revoca diventa un bit da pubblicare con publish_status_lists(),
+        anziché un ID nel registro di revoca.
         """
         self.id = university_id
-        self.private_key, self.public_key = generate_rsa_keys()
+        self.metrics = metrics
+        self._issued = metrics.counter(
+            'aps_issued_credentials_total', 'Credenziali emesse, per modalità di emissione.', ('issuer', 'mode')
+        )
+        self._issuance_seconds = metrics.histogram(
+            'aps_issuance_seconds', "Durata di un'emissione singola o in blocco.", ('issuer', 'mode')
+        )
+        self._throughput = metrics.gauge(
+            'aps_issuance_credentials_per_second', "Throughput dell'ultima emissione in blocco.", ('issuer',)
+        )
+        self.private_key, self.public_key = acquire_keys(signature_suite)
+        # ID di tutte le credenziali emesse: universo del filtro di revoca
+        self.issued_credential_ids: List[str] = []
+        # Data ISO dell'ultima credenziale emessa: copertura del filtro di revoca
+        self.last_issue_date: Optional[str] = None
+        self.status_list_size = status_list_size
+        self.status_lists: Dict[str, BitstringStatusList] = {}
+        # credential_id -> (lista di stato, indice)
+        self.status_entries: Dict[str, Tuple[str, int]] = {}
+        self._current_status_list: Optional[BitstringStatusList] = None
         
         self.certificate = accreditation_authority.certify_university(
             self.id, self.public_key
         )
-        print(f"Università Emittente '{self.id}' creata e certificata da '{accreditation_authority.name}'.")
+        logger.info("Università Emittente '%s' creata e certificata da '%s'.", self.id, accreditation_authority.name)
 
-    def issue_credential(self, student_wallet: StudentWallet, courses: List[Dict[str, Any]]):
-        """Crea, firma e rilascia una credenziale accademica a uno studente."""
-        print(f"\nL'università '{self.id}' sta emettendo una credenziale per lo studente...")
-        
+    def _build_credential(self, student_pseudonym: str, courses: List[Dict[str, Any]]) -> AcademicCredential:
+        """Costruisce una credenziale non ancora firmata (incluso il suo Merkle Tree)."""
         issuer_info = {'id': self.id, 'certificate': self.certificate}
+        if self.status_list_size is None:
+            return AcademicCredential(
+                issuer_info=issuer_info,
+                student_pseudonym=student_pseudonym,
+                courses=courses
+            )
+        status_list = self._status_list_with_room()
         credential = AcademicCredential(
             issuer_info=issuer_info,
-            student_pseudonym=student_wallet.pseudonym,
-            courses=courses
+            student_pseudonym=student_pseudonym,
+            courses=courses,
+            status_list_id=status_list.list_id,
+            status_list_index=status_list.allocate()
         )
+        self.status_entries[credential.credential_id] = (credential.status_list_id, credential.status_list_index)
+        return credential
+
+    def _record_issued(self, credential: AcademicCredential):
+        """Registra una credenziale firmata nell'universo del filtro di revoca."""
+        self.issued_credential_ids.append(credential.credential_id)
+        if self.last_issue_date is None or credential.issue_date > self.last_issue_date:
+            self.last_issue_date = credential.issue_date
+
+    def _status_list_with_room(self) -> BitstringStatusList:
+        """Lista di stato corrente, o una nuova se quella corrente è piena."""
+        if self._current_status_list is None or self._current_status_list.is_full:
+            list_id = f"{self.id}/status/{len(self.status_lists) + 1}"
+            self._current_status_list = BitstringStatusList(list_id, self.id, self.status_list_size)
+            self.status_lists[list_id] = self._current_status_list
+        return self._current_status_list
+
+    def publish_status_list(self, list_id: str) -> StatusList:
+        """Firma la versione corrente di una lista di stato, da pubblicare ai verificatori."""
+        data = self.status_lists[list_id].to_data()
+        return StatusList(data=data, signature=sign_data(self.private_key, data), issuer_certificate=self.certificate)
+
+    def publish_status_lists(self) -> List[StatusList]:
+        """Firma tutte le liste di stato dell'università (una firma per lista)."""
+        return [self.publish_status_list(list_id) for list_id in self.status_lists]
 
-        data_to_sign = credential.get_public_part()
-        signature = sign_data(self.private_key, data_to_sign)
-        credential.signature = signature
+    def issue_credential(self, student_wallet: StudentWallet, courses: List[Dict[str, Any]]):
+        """Crea, firma e rilascia una credenziale accademica a uno studente."""
+        logger.debug("L'università '%s' sta emettendo una credenziale per lo studente...", self.id)
+        start_time = time.perf_counter()
+
+        with span('issuance.issue_credential', issuer=self.id):
+            credential = self._build_credential(student_wallet.pseudonym, courses)
 
-        print(f"Credenziale {credential.credential_id} creata e firmata con Merkle Root: {credential.merkle_root[:10]}...")
+            data_to_sign = credential.get_public_part()
+            signature = sign_data(self.private_key, data_to_sign)
+            credential.signature = signature
+        self._record_issued(credential)
+        self._issuance_seconds.observe(time.perf_counter() - start_time, issuer=self.id, mode='single')
+        self._issued.inc(issuer=self.id, mode='single')
+
+        logger.info("Credenziale %s creata e firmata con Merkle Root: %.10s...", credential.credential_id, credential.merkle_root)
         
         student_wallet.receive_credential(credential)
+
+    def issue_credentials(
+        self,
+        batch: Iterable[Tuple[Optional[StudentWallet], List[Dict[str, Any]]]],
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        queue_size: int = ISSUANCE_QUEUE_SIZE,
+        output_path: Optional[str] = None,
+        batch_signing: bool = False,
+        signing_batch_size: int = BATCH_SIGNING_SIZE
+    ) -> IssuanceReport:
+        """
+        Emette in blocco le credenziali di un batch di coppie (wallet, corsi).
+
+        Le credenziali e i loro Merkle Tree vengono costruiti nel processo
+        corrente mentre il batch viene consumato; le firme RSA, che occupano
+        la CPU, vengono eseguite su un pool di processi. Al più queue_size
+        firme sono in volo: il batch (anche un generatore) viene letto solo
+        quando si libera un posto. Ogni credenziale firmata viene consegnata
+        al proprio wallet (se presente) e, se indicato, accodata in JSON Lines
+        al file output_path.
+
+        Con batch_signing=True le credenziali vengono raggruppate in blocchi
+        di signing_batch_size: per ogni blocco si costruisce un Merkle Tree
+        sulle parti pubbliche e si firma solo la sua radice (una firma RSA
+        per blocco); ogni credenziale riceve la propria prova di appartenenza.
+
+        Args:
+            batch: Coppie (wallet dello studente o None, lista dei corsi).
+            max_workers: Numero di processi di firma (None = numero di core).
+            executor: Pool di processi già esistente da riutilizzare tra più batch.
+            queue_size: Numero massimo di firme in attesa (backpressure).
+            output_path: File JSON Lines su cui scrivere le credenziali emesse.
+            batch_signing: Se True firma una sola radice per blocco di credenziali.
+            signing_batch_size: Numero di credenziali coperte da ogni radice firmata.
+        """
+        if queue_size <= 0:
+            raise ValueError("queue_size deve essere positivo.")
+        if batch_signing and signing_batch_size <= 0:
+            raise ValueError("signing_batch_size deve essere positivo.")
+        items = iter(batch)
+        start_time = time.perf_counter()
+        issued = 0
+        output = open(output_path, 'a', encoding='utf-8') if output_path else None
+
+        def deliver(wallet: Optional[StudentWallet], credential: AcademicCredential, signature: bytes):
+            nonlocal issued
+            credential.signature = signature
+            self._record_issued(credential)
+            if wallet is not None:
+                wallet.receive_credential(credential)
+            if output is not None:
+                output.write(json.dumps(credential.to_dict(serializable=True)) + '\n')
+            issued += 1
+
+        def build(item) -> Tuple[Optional[StudentWallet], AcademicCredential]:
+            wallet, courses = item
+            pseudonym = wallet.pseudonym if wallet is not None else None
+            return wallet, self._build_credential(pseudonym, courses)
+
+        try:
+            if batch_signing:
+                while True:
+                    chunk = [build(item) for item in itertools.islice(items, signing_batch_size)]
+                    if not chunk:
+                        break
+                    signature = self._sign_credential_batch([credential for _, credential in chunk])
+                    for wallet, credential in chunk:
+                        deliver(wallet, credential, signature)
+                items = iter(())
+
+            # Si legge un primo blocco per decidere se il pool conviene
+            head = []
+            for item in items:
+                head.append(build(item))
+                if len(head) >= ISSUANCE_PARALLEL_THRESHOLD:
+                    break
+
+            if executor is None and (max_workers == 1 or len(head) < ISSUANCE_PARALLEL_THRESHOLD):
+                for wallet, credential in itertools.chain(head, map(build, items)):
+                    deliver(wallet, credential, sign_data(self.private_key, credential.get_public_part()))
+            else:
+                pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+                private_key_der = self._private_key_der()
+                try:
+                    in_flight = {}
+                    pending_items = iter(head)
+                    exhausted = False
+                    while True:
+                        # Riempie la finestra fino a queue_size firme in volo
+                        while not exhausted and len(in_flight) < queue_size:
+                            entry = next(pending_items, None)
+                            if entry is None:
+                                item = next(items, None)
+                                if item is None:
+                                    exhausted = True
+                                    break
+                                entry = build(item)
+                            wallet, credential = entry
+                            future = pool.submit(_sign_public_part_job, private_key_der, credential.get_public_part())
+                            in_flight[future] = entry
+                        if not in_flight:
+                            break
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            wallet, credential = in_flight.pop(future)
+                            deliver(wallet, credential, future.result())
+                finally:
+                    if executor is None:
+                        pool.shutdown()
+        finally:
+            if output is not None:
+                output.close()
+
+        report = IssuanceReport(issued=issued, elapsed_seconds=time.perf_counter() - start_time)
+        mode = 'batch_signed' if batch_signing else 'bulk'
+        self._issued.inc(report.issued, issuer=self.id, mode=mode)
+        self._issuance_seconds.observe(report.elapsed_seconds, issuer=self.id, mode=mode)
+        self._throughput.set(report.credentials_per_second, issuer=self.id)
+        logger.info(
+            "L'università '%s' ha emesso %d credenziali in %.2f s (%.1f credenziali/s).",
+            self.id, report.issued, report.elapsed_seconds, report.credentials_per_second
+        )
+        return report
+
+    def _sign_credential_batch(self, credentials: List[AcademicCredential]) -> bytes:
+        """
+        Costruisce il Merkle Tree delle parti pubbliche di un blocco di credenziali,
+        firma la sua radice e assegna a ogni credenziale radice e prova di appartenenza.
+        """
+        public_parts = [credential.get_public_part() for credential in credentials]
+        tree = MerkleTree(public_parts, version=MERKLE_TREE_VERSION)
+        signature = sign_data(self.private_key, CredentialBatchRoot(
+            issuer_id=self.id,
+            batch_root=tree.root,
+            merkle_version=tree.version
+        ))
+        for credential, public_part in zip(credentials, public_parts):
+            credential.batch_root = tree.root
+            credential.batch_proof = tree.get_proof(public_part)
+        return signature
+
+    def _private_key_der(self) -> bytes:
+        """Serializza la chiave privata in DER (PKCS8) per inviarla ai processi di firma."""
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
     
     def revoke_credential(self, registry: RevocationRegistry, credential_id: str):
-        """Registra la revoca di una credenziale."""
-        print(f"\nL'università '{self.id}' sta revocando la credenziale ID: {credential_id}")
-        registry.add_revocation(credential_id)
\ No newline at end of file
+        """
+        Registra la revoca di una credenziale: nel suo bit della lista di stato,
+        se ne ha uno (la lista va poi ripubblicata), altrimenti nel registro.
+        """
+        logger.info("L'università '%s' sta revocando la credenziale ID: %s", self.id, credential_id)
+        if credential_id in self.status_entries:
+            list_id, index = self.status_entries[credential_id]
+            self.status_lists[list_id].revoke(index)
+            logger.info("REVOCA: Impostato il bit %d della lista di stato '%s'.", index, list_id)
+            return
+        registry.add_revocation(credential_id)
@@ -0,0 +1,170 @@
+# src/python/Revocation/filter_cascade.py
+"""
+Filtro di revoca compatto a cascata di Bloom filter (schema CRLite).
+
+Il primo livello contiene le credenziali revocate; ogni livello successivo
+contiene i falsi positivi del livello precedente presi dall'insieme opposto
+(valide, poi revocate, ...). La costruzione termina quando un livello non
+produce più falsi positivi: per ogni credenziale dell'universo su cui è
+stato costruito (emesse = valide + revocate) la risposta è esatta, con
+pochi bit per credenziale.
+
+Fuori dall'universo la cascata risponde a caso (per lo più "valida"): per
+questo porta con sé la sua copertura, cioè per ogni emittente la data di
+emissione dell'ultima credenziale inclusa. covers() considera affidabile
+la risposta per le credenziali di quegli emittenti emesse entro tale data;
+la copertura occupa pochi byte per emittente, non per credenziale.
+"""
+import hashlib
+import math
+import struct
+from typing import Iterable, List, Mapping, Optional, Set
+
+_CASCADE_MAGIC = b'RVFC'
+_CASCADE_VERSION = 2
+_CASCADE_HEADER = struct.Struct('>4sHH')
+_LEVEL_HEADER = struct.Struct('>QB')
+# Copertura: numero di emittenti, poi per ciascuno le lunghezze di ID e data
+_COVERAGE_HEADER = struct.Struct('>H')
+_COVERAGE_ENTRY = struct.Struct('>HH')
+
+
+class BloomFilter:
+    def __init__(self, size_bits: int, num_hashes: int, level: int, bits: bytearray = None):
+        """Bloom filter su bytearray; il livello fa da sale per decorrelare i livelli della cascata."""
+        self.size_bits = max(8, size_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.level = level
+        self.bits = bits if bits is not None else bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, num_items: int, fp_rate: float, level: int) -> "BloomFilter":
+        """Dimensiona il filtro per num_items elementi con il tasso di falsi positivi indicato."""
+        num_items = max(1, num_items)
+        size_bits = math.ceil(-num_items * math.log(fp_rate) / (math.log(2) ** 2))
+        num_hashes = round(size_bits / num_items * math.log(2))
+        return cls(size_bits, num_hashes, level)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(self.level.to_bytes(2, 'big') + item.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class FilterCascade:
+    def __init__(self, levels: List[BloomFilter], coverage: Optional[Mapping[str, str]] = None):
+        """
+        Cascata di Bloom filter; usare build() o from_bytes() per costruirla.
+        coverage associa a ogni emittente la data ISO dell'ultima credenziale
+        inclusa (None = sconosciuta: nessuna credenziale è coperta).
+        """
+        self.levels = levels
+        self.coverage = dict(coverage) if coverage is not None else {}
+
+    @classmethod
+    def build(
+        cls,
+        revoked_ids: Iterable[str],
+        valid_ids: Iterable[str],
+        fp_rate: float = 0.01,
+        coverage: Optional[Mapping[str, str]] = None
+    ) -> "FilterCascade":
+        """
+        Costruisce la cascata sull'universo revocate + valide.
+
+        Args:
+            revoked_ids: ID delle credenziali revocate.
+            valid_ids: ID delle credenziali emesse e non revocate.
+            fp_rate: Tasso di falsi positivi del primo livello (i successivi usano 0.5).
+            coverage: Emittente -> data di emissione fino alla quale tutte le
+                sue credenziali sono in revoked_ids o valid_ids.
+        """
+        include: Set[str] = set(revoked_ids)
+        exclude: Set[str] = set(valid_ids) - include
+        levels: List[BloomFilter] = []
+        rate = fp_rate
+        while include:
+            bloom = BloomFilter.for_capacity(len(include), rate, level=len(levels))
+            for item in include:
+                bloom.add(item)
+            levels.append(bloom)
+            false_positives = {item for item in exclude if item in bloom}
+            include, exclude = false_positives, include
+            rate = 0.5
+        return cls(levels, coverage)
+
+    def covers(self, issuer_id: str, issue_date: str) -> bool:
+        """
+        True se la credenziale rientra nella copertura (quindi is_revoked è esatto).
+        Le date sono stringhe ISO 8601 in UTC, confrontabili come testo.
+        """
+        issued_until = self.coverage.get(issuer_id)
+        return issued_until is not None and issue_date <= issued_until
+
+    def is_revoked(self, credential_id: str) -> bool:
+        """Esatto per le credenziali dell'universo di costruzione (vedi covers())."""
+        for depth, bloom in enumerate(self.levels):
+            if credential_id not in bloom:
+                # Assente a un livello pari (0, 2, ...) => dalla parte delle valide
+                return depth % 2 == 1
+        return len(self.levels) % 2 == 1
+
+    def to_bytes(self) -> bytes:
+        """Serializza la cascata nel formato compatto da distribuire ai verificatori."""
+        parts = [_CASCADE_HEADER.pack(_CASCADE_MAGIC, _CASCADE_VERSION, len(self.levels))]
+        for bloom in self.levels:
+            parts.append(_LEVEL_HEADER.pack(bloom.size_bits, bloom.num_hashes))
+            parts.append(bytes(bloom.bits))
+        parts.append(_COVERAGE_HEADER.pack(len(self.coverage)))
+        for issuer_id, issued_until in self.coverage.items():
+            issuer_bytes, date_bytes = issuer_id.encode('utf-8'), issued_until.encode('utf-8')
+            parts.append(_COVERAGE_ENTRY.pack(len(issuer_bytes), len(date_bytes)))
+            parts.append(issuer_bytes + date_bytes)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FilterCascade":
+        """Ricostruisce una cascata pubblicata con to_bytes()."""
+        magic, version, num_levels = _CASCADE_HEADER.unpack_from(data, 0)
+        if magic != _CASCADE_MAGIC or version != _CASCADE_VERSION:
+            raise ValueError("Formato del filtro di revoca non riconosciuto.")
+        offset = _CASCADE_HEADER.size
+        levels = []
+        for level in range(num_levels):
+            size_bits, num_hashes = _LEVEL_HEADER.unpack_from(data, offset)
+            offset += _LEVEL_HEADER.size
+            length = (size_bits + 7) // 8
+            levels.append(BloomFilter(size_bits, num_hashes, level, bytearray(data[offset:offset + length])))
+            offset += length
+        (count,) = _COVERAGE_HEADER.unpack_from(data, offset)
+        offset += _COVERAGE_HEADER.size
+        coverage = {}
+        for _ in range(count):
+            issuer_length, date_length = _COVERAGE_ENTRY.unpack_from(data, offset)
+            offset += _COVERAGE_ENTRY.size
+            end = offset + issuer_length + date_length
+            if len(data) < end:
+                raise ValueError("Copertura del filtro di revoca troncata.")
+            issuer_id = bytes(data[offset:offset + issuer_length]).decode('utf-8')
+            coverage[issuer_id] = bytes(data[offset + issuer_length:end]).decode('utf-8')
+            offset = end
+        return cls(levels, coverage)
+
+    def __len__(self) -> int:
+        """Dimensione in byte della forma serializzata."""
+        return (
+            _CASCADE_HEADER.size + sum(_LEVEL_HEADER.size + len(b.bits) for b in self.levels)
+            + _COVERAGE_HEADER.size + sum(
+                _COVERAGE_ENTRY.size + len(issuer_id.encode('utf-8')) + len(issued_until.encode('utf-8'))
+                for issuer_id, issued_until in self.coverage.items()
+            )
+        )
@@ -1,58 +1,216 @@
 # src/python/Revocation/revocation.py
-import json
-import os
-from typing import Set
+import logging
+import threading
+from typing import Callable, Iterable, List, Mapping, Optional, Set
 
-from config import REVOCATION_REGISTRY_FILE_PATH
+from config import (
+    REVOCATION_REGISTRY_FILE_PATH, REVOCATION_LOG_FSYNC_BATCH, REVOCATION_LOG_COMPACTION_THRESHOLD,
+    REVOCATION_FILTER_FP_RATE, REVOCATION_WATCH_INTERVAL_SECONDS
+)
+from utils.metrics import DEFAULT_REGISTRY, MetricsRegistry
+from models import RevocationDelta
+from .filter_cascade import FilterCascade
+from .revocation_store import AppendOnlyRevocationStore
+
+logger = logging.getLogger(__name__)
 
 class RevocationRegistry:
-    def __init__(self, registry_file_path: str = REVOCATION_REGISTRY_FILE_PATH):
+    def __init__(
+        self,
+        registry_file_path: str = REVOCATION_REGISTRY_FILE_PATH,
+        fsync_batch: int = REVOCATION_LOG_FSYNC_BATCH,
+        compaction_threshold: int = REVOCATION_LOG_COMPACTION_THRESHOLD,
+        metrics: MetricsRegistry = DEFAULT_REGISTRY
+    ):
         """
         Simula un registro di revoca pubblico.
-        Utilizza un file JSON locale per persistere la lista delle revoche.
+        Le revoche vengono accodate a un log append-only e periodicamente
+        compattate in uno snapshot JSON con indice ordinato mappato in memoria.
+        Consultazioni e revoche sono contate nel registro di metriche metrics.
+
+        Ogni revoca ha un numero di sequenza (epoca): un consumatore che conosce
+        le prime N revoche ottiene le successive con revocations_since(N), le
+        riceve con subscribe(), e con start_watching() anche quelle scritte
+        sugli stessi file da un altro processo.
         """
         self.file_path = registry_file_path
-        self.revoked_ids: Set[str] = self._load_revocations()
-        print(f"Registro di revoca inizializzato. Caricate {len(self.revoked_ids)} revoche da '{self.file_path}'.")
+        self.store = AppendOnlyRevocationStore(registry_file_path, fsync_batch, compaction_threshold)
+        self.metrics = metrics
+        self._lookups = metrics.counter(
+            'aps_revocation_lookups_total', 'Consultazioni del registro di revoca, per esito.', ('registry', 'result')
+        )
+        self._revocations = metrics.counter(
+            'aps_revocations_total', 'Revoche aggiunte al registro.', ('registry',)
+        )
+        self._errors = metrics.counter(
+            'aps_revocation_errors_total', 'Errori di scrittura del registro di revoca.', ('registry',)
+        )
+        self._size = metrics.gauge(
+            'aps_revocation_registry_size', 'Credenziali revocate presenti nel registro.', ('registry',)
+        )
+        self._revocations.inc(0, registry=self.file_path)
+        self._errors.inc(0, registry=self.file_path)
+        self._size.set(len(self.store), registry=self.file_path)
+        # Funzioni chiamate con l'ID di ogni nuova revoca
+        self._listeners: List[Callable[[str], None]] = []
+        # Incrementata quando il registro riparte da zero: le epoche precedenti non valgono più
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        logger.info("Registro di revoca inizializzato. Caricate %d revoche da '%s'.", len(self.store), self.file_path)
 
-    def _load_revocations(self) -> Set[str]:
-        """Carica la lista degli ID revocati dal file."""
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r') as f:
-                    return set(json.load(f))
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Attenzione: impossibile caricare il file di revoca '{self.file_path}'. Errore: {e}. Inizio con un registro vuoto.")
-                return set()
-        return set()
-
-    def _save_revocations(self):
-        """Salva la lista aggiornata degli ID revocati nel file."""
-        try:
-            with open(self.file_path, 'w') as f:
-                json.dump(list(self.revoked_ids), f, indent=2)
-        except IOError as e:
-            print(f"Errore: impossibile salvare il file di revoca '{self.file_path}'. Errore: {e}")
+    @property
+    def revoked_ids(self) -> Set[str]:
+        """Insieme completo degli ID revocati (costo lineare: legge lo snapshot)."""
+        return set(self.store.all_ids())
+
+    def revoked_digests(self) -> bytes:
+        """
+        Digest SHA256 di tutti gli ID revocati, ordinati e concatenati nel
+        formato di SortedDigestIndex (es. da copiare in memoria condivisa).
+        Lo snapshot indicizzato viene copiato dall'mmap, non ricodificato.
+        """
+        with self._lock:
+            return self.store.sorted_digests()
+
+    @property
+    def epoch(self) -> int:
+        """Numero di sequenza dell'ultima revoca (quante revoche contiene il registro)."""
+        return len(self.store)
 
     def add_revocation(self, credential_id: str):
         """Aggiunge un ID di credenziale al registro delle revoche."""
-        if credential_id not in self.revoked_ids:
-            self.revoked_ids.add(credential_id)
-            self._save_revocations()
-            print(f"REVOCA: Aggiunto credential_id '{credential_id}' al registro.")
+        with self._lock:
+            if self.store.contains(credential_id):
+                return
+            try:
+                self.store.append(credential_id)
+            except IOError as e:
+                self._errors.inc(registry=self.file_path)
+                logger.error("Impossibile salvare il file di revoca '%s': %s", self.file_path, e)
+                return
+            self._revocations.inc(registry=self.file_path)
+            self._size.set(len(self.store), registry=self.file_path)
+        logger.info("REVOCA: Aggiunto credential_id '%s' al registro.", credential_id)
+        self._notify([credential_id])
+
+    def _notify(self, credential_ids: List[str]):
+        for listener in list(self._listeners):
+            for credential_id in credential_ids:
+                listener(credential_id)
+
+    def revocations_since(self, epoch: int, generation: Optional[int] = None) -> RevocationDelta:
+        """
+        Revoche aggiunte dopo l'epoca indicata, in ordine di revoca, in O(delta).
+        Se il registro è ripartito da zero (generation diversa da quella del
+        consumatore, o epoca futura) il delta ha reset=True e contiene tutte le revoche.
+        """
+        with self._lock:
+            current = self.epoch
+            if epoch > current or (generation is not None and generation != self.generation):
+                return RevocationDelta(since=0, epoch=current, revoked_ids=self.store.all_ids(), generation=self.generation, reset=True)
+            return RevocationDelta(since=epoch, epoch=current, revoked_ids=self.store.ids_since(epoch), generation=self.generation)
+
+    def refresh(self) -> List[str]:
+        """
+        Acquisisce le revoche scritte sugli stessi file da un altro processo
+        (es. l'emittente) e le notifica ai sottoscrittori. Restituisce gli ID nuovi.
+        """
+        with self._lock:
+            added, reset = self.store.refresh()
+            if reset:
+                self.generation += 1
+                logger.warning("Il registro di revoca '%s' è stato svuotato da un altro processo.", self.file_path)
+            if added or reset:
+                self._size.set(len(self.store), registry=self.file_path)
+        if added:
+            logger.info("Acquisite %d nuove revoche da '%s' (epoca %d).", len(added), self.file_path, self.epoch)
+            self._notify(added)
+        return added
+
+    def start_watching(self, interval: float = REVOCATION_WATCH_INTERVAL_SECONDS):
+        """
+        Avvia un thread che ogni interval secondi controlla i file del registro
+        e acquisisce le revoche scritte da altri processi (vedi refresh()).
+        Il controllo costa due stat finché i file non cambiano.
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(
+            target=self._watch, args=(self._watch_stop, interval), name='revocation-watch', daemon=True
+        )
+        self._watch_thread.start()
+
+    def _watch(self, stop: threading.Event, interval: float):
+        while not stop.wait(interval):
+            try:
+                self.refresh()
+            except (OSError, ValueError) as e:
+                logger.warning("Impossibile rileggere il registro di revoca '%s': %s", self.file_path, e)
+
+    def stop_watching(self):
+        """Arresta il thread avviato da start_watching()."""
+        if self._watch_thread is None:
+            return
+        self._watch_stop.set()
+        self._watch_thread.join()
+        self._watch_stop = self._watch_thread = None
+
+    def subscribe(self, listener: Callable[[str], None]):
+        """Registra una funzione da chiamare con l'ID di ogni revoca aggiunta da questo registro."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str], None]):
+        """Rimuove una funzione registrata con subscribe()."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
 
     def is_revoked(self, credential_id: str) -> bool:
         """Controlla se un ID di credenziale è presente nel registro delle revoche."""
-        return credential_id in self.revoked_ids
-        
+        with self._lock:
+            revoked = self.store.contains(credential_id)
+        self._lookups.inc(registry=self.file_path, result='revoked' if revoked else 'not_revoked')
+        return revoked
+
+    def build_filter(
+        self,
+        issued_ids: Iterable[str],
+        coverage: Mapping[str, str],
+        fp_rate: float = REVOCATION_FILTER_FP_RATE
+    ) -> FilterCascade:
+        """
+        Costruisce il filtro compatto da pubblicare ai verificatori.
+        È esatto (nessun falso positivo né negativo) per le credenziali in
+        issued_ids. coverage associa a ogni emittente la data di emissione
+        entro la quale tutte le sue credenziali sono in issued_ids (vedi
+        IssuingUniversity.last_issue_date): per le altre i verificatori
+        consultano il registro. Va ripubblicato dopo nuove emissioni o revoche.
+        """
+        revoked = self.revoked_ids
+        issued = set(issued_ids)
+        return FilterCascade.build(revoked & issued, issued - revoked, fp_rate, coverage)
+
+    def compact(self):
+        """Compatta il log delle revoche nello snapshot indicizzato."""
+        with self._lock:
+            self.store.compact()
+
+    def close(self):
+        """Sincronizza su disco le revoche in sospeso e chiude i file."""
+        self.stop_watching()
+        with self._lock:
+            self.store.close()
+
     def clear_registry_for_testing(self):
         """Metodo di utilità per pulire il registro tra un test e l'altro."""
-        self.revoked_ids = set()
-        if os.path.exists(self.file_path):
-            try:
-                os.remove(self.file_path)
-                print("Registro di revoca pulito per il test.")
-            except OSError as e:
-                print(f"Errore durante la pulizia del registro: {e}")
-        # Ensure the file is gone so _load_revocations doesn't find it
-        self._save_revocations()
\ No newline at end of file
+        try:
+            with self._lock:
+                self.store.clear()
+                self.generation += 1
+            self._size.set(0, registry=self.file_path)
+            logger.info("Registro di revoca pulito per il test.")
+        except OSError as e:
+            logger.error("Errore durante la pulizia del registro: %s", e)
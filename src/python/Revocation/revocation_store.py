@@ -0,0 +1,345 @@
+# src/python/Revocation/revocation_store.py
+"""
+Backend di persistenza del registro di revoca: log append-only + snapshot indicizzato.
+
+File gestiti, a partire dal percorso base del registro:
+  - <base>       snapshot: lista JSON degli ID revocati, in ordine di revoca
+                 (stesso formato del vecchio revocation_list.json)
+  - <base>.idx   indice dello snapshot: digest SHA256 degli ID ordinati,
+                 letto via mmap e interrogato con ricerca binaria
+  - <base>.log   revoche successive allo snapshot, un ID per riga
+
+Le revoche hanno un ordine totale (snapshot, poi log): la posizione di una
+revoca in quest'ordine è la sua epoca, e ids_since(n) restituisce quelle
+successive alla n-esima. Un solo processo scrive; gli altri che aprono gli
+stessi file possono rileggere le nuove revoche con refresh().
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32
+
+# Intestazione dell'indice: magic, versione, numero di digest, dimensione dello snapshot indicizzato
+_INDEX_MAGIC = b'RVIX'
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct('>4sHQQ')
+
+
+def credential_digest(credential_id: str) -> bytes:
+    """Digest SHA256 di un ID di credenziale, chiave dell'indice ordinato."""
+    return hashlib.sha256(credential_id.encode('utf-8')).digest()
+
+
+class SortedDigestIndex:
+    def __init__(self, buffer, count: int, offset: int = 0):
+        """
+        Vista in sola lettura su un array ordinato di digest da 32 byte.
+        Il buffer può essere un mmap, una memoria condivisa o semplici bytes.
+        """
+        self._buffer = buffer
+        self._count = count
+        self._offset = offset
+
+    @staticmethod
+    def encode(digests: Iterable[bytes]) -> bytes:
+        """Ordina i digest e li concatena nel formato dell'indice."""
+        return b''.join(sorted(set(digests)))
+
+    def _digest_at(self, i: int) -> bytes:
+        start = self._offset + i * DIGEST_SIZE
+        # Le fette di una memoryview (memoria condivisa) non sono confrontabili: si copiano 32 byte
+        return bytes(self._buffer[start:start + DIGEST_SIZE])
+
+    def _position(self, digest: bytes) -> int:
+        """Primo indice il cui digest non precede digest (ricerca binaria)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest_at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def contains(self, digest: bytes) -> bool:
+        """Ricerca binaria del digest, O(log n) senza caricare l'indice in memoria."""
+        position = self._position(digest)
+        return position < self._count and self._digest_at(position) == digest
+
+    def merged_with(self, digests: Iterable[bytes]) -> bytes:
+        """
+        Array ordinato dell'indice con in più i digest indicati (quelli già
+        presenti vengono ignorati). Il buffer viene copiato a blocchi contigui,
+        tra una posizione di inserimento e la successiva: O(n) byte copiati
+        più O(k log n) confronti per k digest aggiunti.
+        """
+        view = memoryview(self._buffer)[self._offset:self._offset + self._count * DIGEST_SIZE]
+        parts, start = [], 0
+        for digest in sorted(set(digests)):
+            position = self._position(digest)
+            if position < self._count and self._digest_at(position) == digest:
+                continue
+            parts.append(view[start * DIGEST_SIZE:position * DIGEST_SIZE])
+            parts.append(digest)
+            start = position
+        parts.append(view[start * DIGEST_SIZE:])
+        return b''.join(parts)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class AppendOnlyRevocationStore:
+    def __init__(self, base_path: str, fsync_batch: int, compaction_threshold: int):
+        """
+        Apre (o crea) lo storage delle revoche.
+
+        Args:
+            base_path: Percorso dello snapshot JSON; log e indice stanno accanto.
+            fsync_batch: Numero di revoche accodate tra due fsync del log.
+            compaction_threshold: Dimensione del log oltre la quale si compatta nello snapshot.
+        """
+        self.snapshot_path = base_path
+        self.index_path = base_path + '.idx'
+        self.log_path = base_path + '.log'
+        self.fsync_batch = max(1, fsync_batch)
+        self.compaction_threshold = compaction_threshold
+
+        self._index_file = None
+        self._index_map: Optional[mmap.mmap] = None
+        self._index = SortedDigestIndex(b'', 0)
+        self._snapshot_size = 0
+        self._log_file = None
+        self._log_offset = 0  # byte del log già letti (o scritti) da questo processo
+        self._unsynced = 0
+        # Revoche presenti nel log ma non ancora nello snapshot
+        self._tail: List[str] = []
+        self._tail_set: Set[str] = set()
+
+        self._open_index()
+        self._replay_log()
+
+    # ------------------------------------------------------------------ caricamento
+    def _open_index(self):
+        """Mappa in memoria l'indice, ricostruendolo se manca o non corrisponde allo snapshot."""
+        snapshot_size = os.path.getsize(self.snapshot_path) if os.path.exists(self.snapshot_path) else 0
+        if not self._index_matches(snapshot_size):
+            self._write_snapshot_index(self._read_snapshot(), snapshot_size)
+        self._snapshot_size = snapshot_size
+
+        with open(self.index_path, 'rb') as f:
+            _, _, count, _ = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+        if count == 0:
+            return
+        self._index_file = open(self.index_path, 'rb')
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = SortedDigestIndex(self._index_map, count, offset=_INDEX_HEADER.size)
+
+    def _index_matches(self, snapshot_size: int) -> bool:
+        """Controlla che l'indice esista e sia stato costruito sullo snapshot attuale."""
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(_INDEX_HEADER.size)
+                magic, version, count, indexed_size = _INDEX_HEADER.unpack(header)
+        except (IOError, struct.error):
+            return False
+        expected_size = _INDEX_HEADER.size + count * DIGEST_SIZE
+        return (
+            magic == _INDEX_MAGIC and version == _INDEX_VERSION and indexed_size == snapshot_size
+            and os.path.getsize(self.index_path) == expected_size
+        )
+
+    def _read_snapshot(self) -> List[str]:
+        """Legge la lista completa degli ID dallo snapshot JSON."""
+        if not os.path.exists(self.snapshot_path):
+            return []
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                return list(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning("Impossibile caricare il file di revoca '%s': %s. Inizio con un registro vuoto.", self.snapshot_path, e)
+            return []
+
+    def _replay_log(self, truncate_partial: bool = True):
+        """
+        Rilegge le revoche accodate dopo l'ultimo snapshot, scartando una riga
+        finale troncata (e rimuovendola dal file, salvo truncate_partial=False).
+        """
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'rb') as f:
+                content = f.read()
+            complete = content[:content.rfind(b'\n') + 1]
+            if truncate_partial and len(complete) != len(content):
+                # Scrittura interrotta da un crash: si tronca all'ultima riga completa
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(len(complete))
+            self._extend_tail(complete)
+            self._log_offset = len(complete)
+        self._log_file = open(self.log_path, 'ab')
+
+    def _extend_tail(self, lines: bytes) -> List[str]:
+        """Aggiunge al log in memoria gli ID non ancora revocati. Restituisce quelli aggiunti."""
+        added = []
+        for line in lines.decode('utf-8').splitlines():
+            if line and not self.contains(line):
+                self._tail.append(line)
+                self._tail_set.add(line)
+                added.append(line)
+        return added
+
+    # ------------------------------------------------------------------ scrittura atomica
+    @staticmethod
+    def _atomic_write(path: str, payload: bytes):
+        """Scrive su un file temporaneo, esegue fsync e lo sostituisce atomicamente."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_snapshot_index(self, ids: List[str], snapshot_size: int):
+        digests = SortedDigestIndex.encode(credential_digest(i) for i in ids)
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, len(digests) // DIGEST_SIZE, snapshot_size)
+        self._atomic_write(self.index_path, header + digests)
+
+    def _close_index(self):
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_file.close()
+        self._index_map = self._index_file = None
+        self._index = SortedDigestIndex(b'', 0)
+
+    # ------------------------------------------------------------------ API
+    def contains(self, credential_id: str) -> bool:
+        """True se l'ID è nel log o nello snapshot indicizzato."""
+        return credential_id in self._tail_set or self._index.contains(credential_digest(credential_id))
+
+    def append(self, credential_id: str):
+        """Accoda una revoca al log; l'fsync viene eseguito ogni fsync_batch revoche."""
+        if '\n' in credential_id:
+            raise ValueError("Un ID di credenziale non può contenere un a capo.")
+        line = credential_id.encode('utf-8') + b'\n'
+        self._log_file.write(line)
+        self._log_offset += len(line)
+        # Il flush rende la riga visibile al sistema operativo: un crash del
+        # processo non la perde, un crash della macchina al più un batch.
+        self._log_file.flush()
+        self._tail.append(credential_id)
+        self._tail_set.add(credential_id)
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_batch:
+            self.sync()
+        if len(self._tail) >= self.compaction_threshold:
+            self.compact()
+
+    def sync(self):
+        """Forza su disco le revoche accodate."""
+        if self._log_file is not None and self._unsynced:
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """
+        Riversa il log nello snapshot e ricostruisce l'indice.
+        Il log viene svuotato per ultimo: un crash a metà lascia al più
+        revoche duplicate tra log e snapshot, mai revoche perse.
+        """
+        self.sync()
+        ids = self.all_ids()
+        self._close_index()
+        self._atomic_write(self.snapshot_path, json.dumps(ids).encode('utf-8'))
+        self._write_snapshot_index(ids, os.path.getsize(self.snapshot_path))
+        self._log_file.close()
+        self._atomic_write(self.log_path, b'')
+        self._log_file = open(self.log_path, 'ab')
+        self._log_offset = 0
+        self._tail, self._tail_set = [], set()
+        self._open_index()
+
+    def sorted_digests(self) -> bytes:
+        """Digest di tutti gli ID revocati nel formato di SortedDigestIndex, senza rileggere lo snapshot."""
+        return self._index.merged_with(credential_digest(i) for i in self._tail)
+
+    def all_ids(self) -> List[str]:
+        """Tutti gli ID revocati in ordine di revoca (legge lo snapshot: costo lineare)."""
+        # Un vecchio revocation_list.json può contenere duplicati: le epoche contano ID distinti
+        return list(dict.fromkeys(self._read_snapshot())) + self._tail
+
+    def ids_since(self, epoch: int) -> List[str]:
+        """
+        ID revocati dopo i primi epoch, in ordine di revoca. Costa O(delta)
+        finché epoch non precede l'ultima compattazione; altrimenti legge lo snapshot.
+        """
+        snapshot_count = len(self._index)
+        if epoch >= snapshot_count:
+            return self._tail[epoch - snapshot_count:]
+        return self.all_ids()[epoch:]
+
+    def refresh(self) -> Tuple[List[str], bool]:
+        """
+        Rilegge le revoche scritte sugli stessi file da un altro processo.
+        Di norma legge solo le righe del log successive all'ultima lettura; se
+        lo snapshot è cambiato (compattazione o svuotamento altrove) ricarica
+        indice e log. Restituisce gli ID aggiunti, in ordine di revoca, e True
+        se il registro è stato svuotato altrove (gli ID sono allora tutti quelli presenti).
+        """
+        snapshot_size = os.path.getsize(self.snapshot_path) if os.path.exists(self.snapshot_path) else 0
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if snapshot_size == self._snapshot_size and log_size >= self._log_offset:
+            if log_size == self._log_offset:
+                return [], False
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                content = f.read()
+            # Una riga senza a capo è ancora in scrittura: verrà letta al prossimo refresh
+            complete = content[:content.rfind(b'\n') + 1]
+            self._log_offset += len(complete)
+            return self._extend_tail(complete), False
+
+        if not self._index_matches(snapshot_size):
+            # Compattazione in corso nel processo che scrive: l'indice arriverà al prossimo refresh
+            return [], False
+        # La compattazione fa solo crescere lo snapshot: se si accorcia, il registro è stato svuotato
+        reset = snapshot_size < self._snapshot_size or (snapshot_size == self._snapshot_size and log_size < self._log_offset)
+        known = len(self)
+        self._close_index()
+        self._tail, self._tail_set = [], set()
+        self._open_index()
+        self._log_file.close()
+        self._log_offset = 0
+        self._replay_log(truncate_partial=False)
+        if reset or len(self) < known:
+            return self.all_ids(), True
+        return self.ids_since(known), False
+
+    def clear(self):
+        """Elimina snapshot, indice e log e riparte da un registro vuoto."""
+        self.close()
+        for path in (self.snapshot_path, self.index_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._tail, self._tail_set = [], set()
+        self._unsynced = 0
+        self._open_index()
+        self._log_file = open(self.log_path, 'ab')
+        self._log_offset = 0
+
+    def close(self):
+        """Sincronizza il log e rilascia file e mappature."""
+        self.sync()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        self._close_index()
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._tail)
@@ -0,0 +1,157 @@
+# src/python/Revocation/status_list.py
+"""
+Revoca a lista di stato (schema Bitstring Status List).
+
+All'emissione ogni credenziale riceve un indice in una lista dell'emittente,
+scelto a caso tra quelli liberi (così l'indice non rivela l'ordine di
+emissione). Revocarla significa portare a 1 il suo bit. L'emittente pubblica
+la lista firmata, con il bitstring compresso con gzip: le liste sono quasi
+tutte a zero, quindi 131072 credenziali occupano poche centinaia di byte più
+pochi byte per revoca. Il verificatore controlla la firma una volta, quando
+riceve una nuova versione, e poi interroga il bit in O(1).
+"""
+import base64
+import datetime
+import secrets
+import zlib
+from typing import Optional
+
+from config import STATUS_LIST_SIZE
+from utils.exceptions import StatusListError
+from models import Certificate, StatusListData
+
+# wbits per il formato gzip in zlib
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _bit_is_set(bits, index: int) -> bool:
+    return bool(bits[index >> 3] & (0x80 >> (index & 7)))
+
+
+class BitstringStatusList:
+    def __init__(self, list_id: str, issuer_id: str, size: int = STATUS_LIST_SIZE):
+        """
+        Lista di stato modificabile, tenuta dall'emittente.
+
+        Args:
+            list_id: Identificativo della lista, riportato nelle credenziali.
+            issuer_id: Università emittente.
+            size: Numero di indici (bit) della lista, multiplo di 8.
+        """
+        if size <= 0 or size % 8:
+            raise ValueError("La dimensione di una lista di stato deve essere un multiplo positivo di 8.")
+        self.list_id = list_id
+        self.issuer_id = issuer_id
+        self.size = size
+        # Incrementata a ogni revoca: i verificatori ignorano le versioni più vecchie di quella in cache
+        self.version = 0
+        self._revoked = bytearray(size // 8)
+        self._allocated = bytearray(size // 8)
+        self.allocated_count = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self.allocated_count >= self.size
+
+    def allocate(self) -> int:
+        """Assegna un indice libero scelto a caso. Solleva StatusListError se la lista è piena."""
+        if self.is_full:
+            raise StatusListError(f"La lista di stato '{self.list_id}' è piena.")
+        # Tentativi casuali: il numero atteso resta basso finché la lista non è quasi piena
+        while True:
+            index = secrets.randbelow(self.size)
+            if not _bit_is_set(self._allocated, index):
+                break
+        self._allocated[index >> 3] |= 0x80 >> (index & 7)
+        self.allocated_count += 1
+        return index
+
+    def revoke(self, index: int) -> bool:
+        """Porta a 1 il bit di un indice. Restituisce False se era già revocato."""
+        if not 0 <= index < self.size:
+            raise StatusListError(f"Indice {index} fuori dalla lista di stato '{self.list_id}'.")
+        if _bit_is_set(self._revoked, index):
+            return False
+        self._revoked[index >> 3] |= 0x80 >> (index & 7)
+        self.version += 1
+        return True
+
+    def is_revoked(self, index: int) -> bool:
+        return _bit_is_set(self._revoked, index)
+
+    def encode(self) -> str:
+        """Bitstring compresso con gzip (senza data di modifica, quindi deterministico) e codificato in base64url."""
+        compressor = zlib.compressobj(9, zlib.DEFLATED, _GZIP_WBITS)
+        compressed = compressor.compress(bytes(self._revoked)) + compressor.flush()
+        return base64.urlsafe_b64encode(compressed).decode('ascii')
+
+    def to_data(self) -> StatusListData:
+        """Contenuto da firmare e pubblicare per la versione corrente."""
+        return StatusListData(
+            list_id=self.list_id,
+            issuer_id=self.issuer_id,
+            version=self.version,
+            size=self.size,
+            encoded_list=self.encode(),
+            issued_at=datetime.datetime.utcnow().isoformat()
+        )
+
+
+def decode_status_bits(data: StatusListData) -> bytes:
+    """
+    Decomprime il bitstring di una lista pubblicata. La decompressione si
+    ferma alla dimensione dichiarata, così una lista malevola non può
+    espandersi oltre. Solleva StatusListError se la lista non è valida.
+    """
+    if not isinstance(data.size, int) or data.size <= 0 or data.size % 8:
+        raise StatusListError(f"Dimensione non valida per la lista di stato '{data.list_id}'.")
+    expected = data.size // 8
+    try:
+        compressed = base64.urlsafe_b64decode(data.encoded_list)
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        bits = decompressor.decompress(compressed, expected)
+        # Raggiunta la dimensione dichiarata, il resto del flusso non deve produrre altri byte
+        overflow = decompressor.decompress(decompressor.unconsumed_tail, 1) if not decompressor.eof else b''
+        complete = decompressor.eof and not overflow
+    except (ValueError, TypeError, zlib.error) as e:
+        raise StatusListError(f"Lista di stato '{data.list_id}' non decodificabile: {e}") from None
+    if len(bits) != expected or not complete:
+        raise StatusListError(f"La lista di stato '{data.list_id}' non ha la dimensione dichiarata.")
+    return bits
+
+
+class VerifiedStatusList:
+    def __init__(
+        self,
+        list_id: str,
+        issuer_id: str,
+        version: int,
+        bits: bytes,
+        issuer_public_key_pem: str,
+        authority_name: str
+    ):
+        """
+        Lista di stato già verificata dal verificatore, con il bitstring
+        decompresso e la chiave (e l'ente) del certificato che ne ha verificato la firma.
+        """
+        self.list_id = list_id
+        self.issuer_id = issuer_id
+        self.version = version
+        self.size = len(bits) * 8
+        self.issuer_public_key_pem = issuer_public_key_pem
+        self.authority_name = authority_name
+        self.bits = bits
+
+    @classmethod
+    def from_verified(cls, data: StatusListData, issuer_certificate: Certificate) -> "VerifiedStatusList":
+        """Decomprime una lista la cui firma è stata appena verificata con issuer_certificate."""
+        return cls(
+            data.list_id, data.issuer_id, data.version, decode_status_bits(data),
+            issuer_certificate.data.public_key_pem, issuer_certificate.authority_name
+        )
+
+    def is_revoked(self, index: int) -> Optional[bool]:
+        """Stato del bit in O(1); None se l'indice è fuori dalla lista."""
+        if not isinstance(index, int) or not 0 <= index < self.size:
+            return None
+        return _bit_is_set(self.bits, index)
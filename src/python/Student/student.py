@@ -1,6 +1,9 @@
 # src/python/Student/student.py
+import logging
 from .wallet import StudentWallet
 
+logger = logging.getLogger(__name__)
+
 class Student:
     def __init__(self, name: str):
         """Inizializza uno Studente con un nome e un wallet personale."""
@@ -8,4 +11,4 @@ class Student:
         self.wallet = StudentWallet(self.name)
         self.pseudonym = self.wallet.pseudonym
 
-        print(f"Studente '{self.name}' creato con wallet; pseudonym={self.pseudonym[:10]}…")
\ No newline at end of file
+        logger.info("Studente '%s' creato con wallet; pseudonym=%.10s…", self.name, self.pseudonym)
\ No newline at end of file
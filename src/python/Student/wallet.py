@@ -1,27 +1,56 @@
 # src/python/Student/wallet.py
-from typing import Dict, Any
+import logging
+from typing import List, MutableMapping, Optional
 
-from utils.crypto_utils import generate_rsa_keys, key_to_pem, hash_data
+from config import SIGNATURE_SUITE
+from utils.crypto_utils import key_to_pem, hash_data
+from utils.key_pool import acquire_keys
 from utils.credential import AcademicCredential
 from utils.exceptions import CredentialNotFoundError, CourseNotFoundError
-from models import VerifiablePresentation
+from models import VerifiablePresentation, MultiCoursePresentation
+from .wallet_store import WalletStore, StoredCredentials
+
+logger = logging.getLogger(__name__)
 
 class StudentWallet:
-    def __init__(self, student_id: str):
-        """Inizializza il wallet digitale dello studente."""
+    def __init__(
+        self,
+        student_id: str,
+        signature_suite: str = SIGNATURE_SUITE,
+        store: Optional[WalletStore] = None,
+        store_password: Optional[bytes] = None
+    ):
+        """
+        Inizializza il wallet digitale dello studente.
+
+        Con uno store le credenziali (e la chiave del wallet) sono persistite
+        su disco e caricate solo quando servono; senza, restano in memoria.
+        La chiave viene salvata cifrata con store_password, obbligatoria con uno store.
+        """
+        if store is not None and not store_password:
+            raise ValueError("Un wallet persistente richiede una password per cifrare la chiave privata.")
         self.owner_id = student_id
-        self.private_key, self.public_key = generate_rsa_keys()
+        self.store = store
+        private_key = store.load_private_key(store_password) if store is not None else None
+        if private_key is None:
+            self.private_key, self.public_key = acquire_keys(signature_suite)
+            if store is not None:
+                store.save_private_key(self.private_key, store_password)
+        else:
+            self.private_key, self.public_key = private_key, private_key.public_key()
         
         # Identificatore pseudonimo basato sulla chiave pubblica
         self.pseudonym = hash_data(key_to_pem(self.public_key))
         
-        self.credentials: Dict[str, AcademicCredential] = {}
-        print(f"Wallet creato per lo studente '{self.owner_id}' con pseudonym '{self.pseudonym[:10]}...'.")
+        self.credentials: MutableMapping[str, AcademicCredential] = (
+            StoredCredentials(store) if store is not None else {}
+        )
+        logger.info("Wallet creato per lo studente '%s' con pseudonym '%.10s...'.", self.owner_id, self.pseudonym)
     
     def receive_credential(self, credential: AcademicCredential):
         """Riceve e salva una nuova credenziale nel wallet."""
         self.credentials[credential.credential_id] = credential
-        print(f"Wallet di '{self.owner_id}': ricevuta e salvata la credenziale {credential.credential_id}.")
+        logger.info("Wallet di '%s': ricevuta e salvata la credenziale %s.", self.owner_id, credential.credential_id)
 
     def create_selective_presentation(self, credential_id: str, course_id_to_present: int) -> VerifiablePresentation:
         """
@@ -50,8 +79,51 @@ class StudentWallet:
             merkle_proof=proof,
             original_credential_public_part=credential.get_public_part(),
             issuer_certificate=credential.issuer_info,
-            credential_signature=credential.signature
+            credential_signature=credential.signature,
+            batch_root=credential.batch_root,
+            batch_proof=credential.batch_proof
         )
         
-        print(f"\nWallet di '{self.owner_id}': creata presentazione per il corso '{presented_course_data['nome']}'.")
-        return presentation
\ No newline at end of file
+        logger.info("Wallet di '%s': creata presentazione per il corso '%s'.", self.owner_id, presented_course_data.get('nome'))
+        return presentation
+
+    def create_multi_course_presentation(self, credential_id: str, course_ids_to_present: List[int]) -> MultiCoursePresentation:
+        """
+        Crea un'unica presentazione per più corsi della stessa credenziale,
+        con una sola Merkle multiproof al posto di una prova per corso.
+        Solleva CredentialNotFoundError o CourseNotFoundError in caso di problemi.
+        """
+        if credential_id not in self.credentials:
+            raise CredentialNotFoundError(f"Credenziale con ID {credential_id} non trovata nel wallet.")
+        if not course_ids_to_present:
+            raise CourseNotFoundError("Nessun corso indicato per la presentazione.")
+
+        credential = self.credentials[credential_id]
+        courses_by_id = {}
+        for course in credential.courses:
+            courses_by_id.setdefault(course.get("id"), course)
+
+        presented_courses = []
+        for course_id in dict.fromkeys(course_ids_to_present):
+            course = courses_by_id.get(course_id)
+            if course is None:
+                raise CourseNotFoundError(f"Corso con ID '{course_id}' non trovato nella credenziale.")
+            presented_courses.append(course)
+
+        multiproof = credential.generate_multiproof_for_courses(presented_courses)
+        if multiproof is None:
+            raise CourseNotFoundError("Impossibile generare la Merkle multiproof per i corsi.")
+
+        presentation = MultiCoursePresentation(
+            type="MultiCoursePresentation",
+            presented_courses=presented_courses,
+            merkle_multiproof=multiproof,
+            original_credential_public_part=credential.get_public_part(),
+            issuer_certificate=credential.issuer_info,
+            credential_signature=credential.signature,
+            batch_root=credential.batch_root,
+            batch_proof=credential.batch_proof
+        )
+
+        logger.info("Wallet di '%s': creata presentazione per %d corsi.", self.owner_id, len(presented_courses))
+        return presentation
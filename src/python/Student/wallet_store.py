@@ -0,0 +1,231 @@
+# src/python/Student/wallet_store.py
+"""
+Archivio persistente del wallet dello studente.
+
+Le credenziali sono salvate in un database SQLite (letto tramite mmap) con un
+record compatto per credenziale: parte pubblica, firma, foglie dei corsi e
+livelli del Merkle Tree già calcolati. I certificati degli emittenti stanno in
+una tabella condivisa, deduplicata per digest. L'apertura non legge alcuna
+credenziale: ognuna viene materializzata solo quando serve.
+"""
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional
+from cryptography.hazmat.primitives import serialization
+
+from config import WALLET_STORE_MMAP_SIZE, WALLET_STORE_CACHE_SIZE
+from utils.canonical import canonical_bytes
+from utils.crypto_utils import hash_data
+from utils.credential import AcademicCredential
+from utils.merkle_tree import MerkleTree, DIGEST_SIZE
+from utils.signature_suites import PrivateKey
+from models import Certificate, VerifiableCredentialPublicPart
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS certificates (
+    digest TEXT PRIMARY KEY,
+    record BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS credentials (
+    credential_id TEXT PRIMARY KEY,
+    certificate_digest TEXT NOT NULL REFERENCES certificates(digest),
+    public_part BLOB NOT NULL,
+    signature BLOB NOT NULL,
+    courses BLOB NOT NULL,
+    tree_levels BLOB NOT NULL,
+    batch_root TEXT,
+    batch_proof BLOB
+);
+"""
+
+
+def _split_levels(blob: bytes, leaf_count: int) -> List[bytearray]:
+    """Ricava i livelli del Merkle Tree dalla loro concatenazione (foglie -> radice)."""
+    levels = []
+    offset, size = 0, leaf_count
+    while size > 0:
+        levels.append(bytearray(blob[offset:offset + size * DIGEST_SIZE]))
+        offset += size * DIGEST_SIZE
+        if size == 1:
+            break
+        size = (size + 1) // 2
+    return levels
+
+
+class WalletStore:
+    def __init__(self, path: str, cache_size: int = WALLET_STORE_CACHE_SIZE):
+        """
+        Apre (o crea) l'archivio del wallet nel file indicato.
+
+        Args:
+            path: Percorso del database SQLite.
+            cache_size: Credenziali materializzate mantenute in memoria (LRU).
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(f"PRAGMA mmap_size = {int(WALLET_STORE_MMAP_SIZE)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, AcademicCredential]" = OrderedDict()
+        # I certificati sono condivisi tra credenziali: uno stesso oggetto per digest
+        self._certificates: Dict[str, Certificate] = {}
+
+    # ------------------------------------------------------------------ chiavi del wallet
+    def save_private_key(self, private_key: PrivateKey, password: bytes):
+        """Salva la chiave privata del wallet come PKCS8 cifrato; la password è obbligatoria."""
+        if not password:
+            raise ValueError("La chiave privata del wallet può essere salvata solo cifrata: serve una password.")
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.BestAvailableEncryption(password)
+        )
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('private_key', ?)", (pem,))
+
+    def load_private_key(self, password: bytes) -> Optional[PrivateKey]:
+        """Restituisce la chiave privata salvata, o None se l'archivio è nuovo."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'private_key'").fetchone()
+        if row is None:
+            return None
+        return serialization.load_pem_private_key(row[0], password=password)
+
+    # ------------------------------------------------------------------ credenziali
+    def put(self, credential: AcademicCredential):
+        """Salva (o sovrascrive) una credenziale e il certificato del suo emittente."""
+        certificate = credential.issuer_info
+        certificate_digest = hash_data(certificate)
+        tree_levels = b''.join(bytes(level) for level in credential.tree.levels)
+        batch_proof = canonical_bytes(credential.batch_proof) if credential.batch_proof is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO certificates (digest, record) VALUES (?, ?)",
+                (certificate_digest, canonical_bytes(certificate))
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO credentials "
+                "(credential_id, certificate_digest, public_part, signature, courses, tree_levels, batch_root, batch_proof) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    credential.credential_id, certificate_digest,
+                    canonical_bytes(credential.get_public_part()), credential.signature,
+                    canonical_bytes(credential.courses), tree_levels,
+                    credential.batch_root, batch_proof
+                )
+            )
+            self._remember(credential.credential_id, credential)
+
+    def get(self, credential_id: str) -> Optional[AcademicCredential]:
+        """Materializza una credenziale dall'archivio (o dalla cache in memoria)."""
+        with self._lock:
+            credential = self._cache.get(credential_id)
+            if credential is not None:
+                self._cache.move_to_end(credential_id)
+                return credential
+            row = self._conn.execute(
+                "SELECT certificate_digest, public_part, signature, courses, tree_levels, batch_root, batch_proof "
+                "FROM credentials WHERE credential_id = ?", (credential_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            credential = self._materialize(*row)
+            self._remember(credential_id, credential)
+            return credential
+
+    def _materialize(self, certificate_digest, public_part, signature, courses, tree_levels, batch_root, batch_proof) -> AcademicCredential:
+        public_part = VerifiableCredentialPublicPart.from_bytes(public_part)
+        courses = json.loads(courses)
+        tree = MerkleTree.from_levels(courses, _split_levels(tree_levels, len(courses)), public_part.merkle_version)
+        return AcademicCredential.from_stored(
+            public_part=public_part,
+            issuer_certificate=self._certificate(certificate_digest),
+            courses=courses,
+            tree=tree,
+            signature=bytes(signature),
+            batch_root=batch_root,
+            batch_proof=json.loads(batch_proof) if batch_proof is not None else None
+        )
+
+    def _certificate(self, digest: str) -> Certificate:
+        certificate = self._certificates.get(digest)
+        if certificate is None:
+            row = self._conn.execute("SELECT record FROM certificates WHERE digest = ?", (digest,)).fetchone()
+            certificate = Certificate.from_bytes(row[0])
+            self._certificates[digest] = certificate
+        return certificate
+
+    def _remember(self, credential_id: str, credential: AcademicCredential):
+        self._cache[credential_id] = credential
+        self._cache.move_to_end(credential_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def delete(self, credential_id: str) -> bool:
+        """Elimina una credenziale; restituisce False se non era presente."""
+        with self._lock, self._conn:
+            self._cache.pop(credential_id, None)
+            cursor = self._conn.execute("DELETE FROM credentials WHERE credential_id = ?", (credential_id,))
+            return cursor.rowcount > 0
+
+    def __contains__(self, credential_id: str) -> bool:
+        with self._lock:
+            if credential_id in self._cache:
+                return True
+            return self._conn.execute(
+                "SELECT 1 FROM credentials WHERE credential_id = ?", (credential_id,)
+            ).fetchone() is not None
+
+    def credential_ids(self) -> List[str]:
+        """ID delle credenziali in ordine di ricezione (senza materializzarle)."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT credential_id FROM credentials ORDER BY rowid")]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM credentials").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StoredCredentials(MutableMapping):
+    """Vista dict-like sulle credenziali di un WalletStore, materializzate pigramente."""
+
+    def __init__(self, store: WalletStore):
+        self.store = store
+
+    def __getitem__(self, credential_id: str) -> AcademicCredential:
+        credential = self.store.get(credential_id)
+        if credential is None:
+            raise KeyError(credential_id)
+        return credential
+
+    def __setitem__(self, credential_id: str, credential: AcademicCredential):
+        if credential_id != credential.credential_id:
+            raise ValueError("La chiave deve coincidere con l'ID della credenziale.")
+        self.store.put(credential)
+
+    def __delitem__(self, credential_id: str):
+        if not self.store.delete(credential_id):
+            raise KeyError(credential_id)
+
+    def __contains__(self, credential_id: object) -> bool:
+        return isinstance(credential_id, str) and credential_id in self.store
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.credential_ids())
+
+    def __len__(self) -> int:
+        return len(self.store)
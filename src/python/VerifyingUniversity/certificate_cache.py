@@ -0,0 +1,114 @@
+# src/python/VerifyingUniversity/certificate_cache.py
+"""
+Cache LRU dei certificati emittente già verificati dall'Università Verificatrice.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from config import CERTIFICATE_CACHE_MAXSIZE, CERTIFICATE_CACHE_TTL_SECONDS, CERTIFICATE_CACHE_MAX_BATCH_ROOTS
+from utils.crypto_utils import hash_data
+from utils.signature_suites import PublicKey
+from models import Certificate
+
+
+class _CacheEntry:
+    __slots__ = ('certificate', 'public_key', 'inserted_at', 'verified_batches')
+
+    def __init__(self, certificate: Certificate, public_key: PublicKey):
+        self.certificate = certificate
+        self.public_key = public_key
+        self.inserted_at = time.monotonic()
+        # Radici di batch (con la relativa firma) già verificate per questo emittente
+        self.verified_batches: "OrderedDict[Tuple[str, bytes], None]" = OrderedDict()
+
+
+class VerifiedCertificateCache:
+    def __init__(self, maxsize: int = CERTIFICATE_CACHE_MAXSIZE, ttl: Optional[float] = CERTIFICATE_CACHE_TTL_SECONDS):
+        """
+        Conserva i certificati la cui firma dell'EA è già stata verificata,
+        insieme alla chiave pubblica dell'emittente già deserializzata.
+
+        Args:
+            maxsize: Numero massimo di certificati mantenuti (politica LRU).
+            ttl: Validità in secondi di una voce; None per nessuna scadenza.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def certificate_digest(certificate: Certificate) -> str:
+        """Calcola l'hash dei byte canonici del certificato (dati, firma ed ente)."""
+        return hash_data(certificate)
+
+    def _lookup(self, digest: str) -> Optional[_CacheEntry]:
+        """Voce valida per il digest (da chiamare con il lock acquisito)."""
+        entry = self._entries.get(digest)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry.inserted_at > self.ttl:
+            del self._entries[digest]
+            entry = None
+        return entry
+
+    def get(self, certificate: Certificate) -> Optional[PublicKey]:
+        """Restituisce la chiave dell'emittente se il certificato è già stato verificato."""
+        digest = self.certificate_digest(certificate)
+        with self._lock:
+            entry = self._lookup(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry.public_key
+
+    def get_certificate(self, digest: str) -> Optional[Certificate]:
+        """Restituisce il certificato verificato con il digest indicato (es. inviato per riferimento)."""
+        with self._lock:
+            entry = self._lookup(digest)
+            return entry.certificate if entry is not None else None
+
+    def put(self, certificate: Certificate, public_key: PublicKey):
+        """Registra un certificato appena verificato."""
+        digest = self.certificate_digest(certificate)
+        with self._lock:
+            self._entries[digest] = _CacheEntry(certificate, public_key)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def is_batch_verified(self, certificate: Certificate, batch_root: str, signature: bytes) -> bool:
+        """True se la firma della radice di batch è già stata verificata con questo certificato."""
+        with self._lock:
+            entry = self._lookup(self.certificate_digest(certificate))
+            return entry is not None and (batch_root, signature) in entry.verified_batches
+
+    def mark_batch_verified(self, certificate: Certificate, batch_root: str, signature: bytes):
+        """Registra una radice di batch la cui firma è stata appena verificata."""
+        with self._lock:
+            entry = self._lookup(self.certificate_digest(certificate))
+            if entry is None:
+                return
+            entry.verified_batches[(batch_root, signature)] = None
+            if len(entry.verified_batches) > CERTIFICATE_CACHE_MAX_BATCH_ROOTS:
+                entry.verified_batches.popitem(last=False)
+
+    def invalidate_authority(self, authority_name: str) -> int:
+        """Rimuove tutti i certificati firmati da un ente. Restituisce quanti ne ha rimossi."""
+        with self._lock:
+            stale = [d for d, entry in self._entries.items() if entry.certificate.authority_name == authority_name]
+            for digest in stale:
+                del self._entries[digest]
+        return len(stale)
+
+    def clear(self):
+        """Svuota la cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,133 @@
+# src/python/VerifyingUniversity/result_cache.py
+"""
+Cache LRU (opzionale) degli esiti di verifica delle presentazioni.
+
+La chiave è l'hash dei byte canonici della presentazione: la stessa
+presentazione reinviata (nuovi tentativi, più uffici, un nuovo clic su
+"Verifica") non ripaga le verifiche di firma. Si conservano solo le
+presentazioni che hanno superato i controlli diversi dalla revoca (ente
+fidato, prova di Merkle, certificato e firma); la revoca è rivalutata a
+ogni verifica. Le voci di una credenziale vengono inoltre rimosse quando
+un registro osservato ne registra la revoca.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from config import RESULT_CACHE_MAXSIZE, RESULT_CACHE_TTL_SECONDS
+from utils.crypto_utils import hash_data
+from models import Presentation
+
+
+class _ResultEntry:
+    __slots__ = ('credential_id', 'authority_name', 'inserted_at')
+
+    def __init__(self, credential_id: str, authority_name: str):
+        self.credential_id = credential_id
+        self.authority_name = authority_name
+        self.inserted_at = time.monotonic()
+
+
+class VerificationResultCache:
+    def __init__(self, maxsize: int = RESULT_CACHE_MAXSIZE, ttl: Optional[float] = RESULT_CACHE_TTL_SECONDS):
+        """
+        Args:
+            maxsize: Numero massimo di presentazioni ricordate (politica LRU).
+            ttl: Validità in secondi di una voce; None per nessuna scadenza.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _ResultEntry]" = OrderedDict()
+        # credential_id -> chiavi delle sue presentazioni in cache
+        self._by_credential: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def presentation_digest(presentation: Presentation) -> str:
+        """Calcola l'hash dei byte canonici della presentazione."""
+        return hash_data(presentation)
+
+    def _remove(self, digest: str):
+        """Rimuove una voce e il suo riferimento nell'indice (da chiamare con il lock acquisito)."""
+        entry = self._entries.pop(digest)
+        digests = self._by_credential[entry.credential_id]
+        digests.discard(digest)
+        if not digests:
+            del self._by_credential[entry.credential_id]
+
+    def contains(self, digest: str) -> bool:
+        """True se la presentazione con questo digest ha già superato i controlli diversi dalla revoca."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry.inserted_at > self.ttl:
+                self._remove(digest)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return True
+
+    def put(self, digest: str, presentation: Presentation):
+        """Registra una presentazione appena verificata con successo."""
+        credential_id = presentation.original_credential_public_part.credential_id
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = _ResultEntry(credential_id, presentation.issuer_certificate.authority_name)
+            self._by_credential.setdefault(credential_id, set()).add(digest)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_credential(self, credential_id: str) -> int:
+        """Rimuove le presentazioni di una credenziale. Restituisce quante ne ha rimosse."""
+        with self._lock:
+            stale = list(self._by_credential.get(credential_id, ()))
+            for digest in stale:
+                self._remove(digest)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_authority(self, authority_name: str) -> int:
+        """Rimuove le presentazioni di emittenti certificati da un ente. Restituisce quante ne ha rimosse."""
+        with self._lock:
+            stale = [d for d, entry in self._entries.items() if entry.authority_name == authority_name]
+            for digest in stale:
+                self._remove(digest)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def watch(self, registry):
+        """
+        Invalida le voci delle credenziali revocate da un registro in futuro.
+        Registri senza notifiche (es. snapshot in sola lettura) vengono ignorati.
+        """
+        subscribe = getattr(registry, 'subscribe', None)
+        if subscribe is not None:
+            subscribe(self.invalidate_credential)
+
+    def clear(self):
+        """Svuota la cache."""
+        with self._lock:
+            self._entries.clear()
+            self._by_credential.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Consultazioni riuscite e mancate, invalidazioni, dimensione e hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
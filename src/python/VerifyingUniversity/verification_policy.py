@@ -0,0 +1,157 @@
+# src/python/VerifyingUniversity/verification_policy.py
+"""
+Ordine di esecuzione dei controlli di verifica di una presentazione.
+
+La politica predefinita è fail-fast: i controlli economici (nome dell'ente
+fidato, revoca, prova di Merkle) precedono le verifiche di firma, così una
+presentazione revocata o manomessa viene scartata senza pagare alcuna
+operazione a chiave pubblica. Ogni controllo solleva la stessa eccezione di
+sempre; l'ordine decide solo quale fallimento emerge per primo.
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
+
+from config import VERIFICATION_EVENT_SAMPLE_RATE
+from utils.exceptions import ProjectBaseException
+from utils.metrics import span
+from Revocation.revocation import RevocationRegistry
+from models import Presentation
+
+if TYPE_CHECKING:
+    from .verifying_university import VerifyingUniversity
+
+# Eventi strutturati per controllo (campi in extra: event, check, outcome, duration_ms, ...)
+events_logger = logging.getLogger('VerifyingUniversity.events')
+
+AUTHORITY_NAME = 'authority_name'
+REVOCATION = 'revocation'
+MERKLE_PROOF = 'merkle_proof'
+ISSUER_CERTIFICATE = 'issuer_certificate'
+CREDENTIAL_SIGNATURE = 'credential_signature'
+
+# Controlli economici prima delle firme
+FAIL_FAST_ORDER = (AUTHORITY_NAME, REVOCATION, MERKLE_PROOF, ISSUER_CERTIFICATE, CREDENTIAL_SIGNATURE)
+# Ordine storico: fiducia, firma della credenziale, prova di Merkle, revoca
+LEGACY_ORDER = (AUTHORITY_NAME, ISSUER_CERTIFICATE, CREDENTIAL_SIGNATURE, MERKLE_PROOF, REVOCATION)
+
+CHECK_LABELS = {
+    AUTHORITY_NAME: "Ente di accreditamento fidato",
+    REVOCATION: "Stato di revoca",
+    MERKLE_PROOF: "Prova di inclusione del corso",
+    ISSUER_CERTIFICATE: "Certificato dell'emittente",
+    CREDENTIAL_SIGNATURE: "Firma della credenziale",
+}
+
+
+@dataclass
+class VerificationReport:
+    """Esito di una verifica: durata di ogni controllo eseguito e primo fallimento."""
+    timings: Dict[str, float] = field(default_factory=dict)  # secondi, in ordine di esecuzione
+    failed_check: Optional[str] = None
+    error: Optional[ProjectBaseException] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.timings.values())
+
+
+class VerificationPolicy:
+    def __init__(self, order: Sequence[str] = FAIL_FAST_ORDER, event_sample_rate: float = VERIFICATION_EVENT_SAMPLE_RATE):
+        """
+        Args:
+            order: Permutazione dei cinque controlli. La verifica del certificato
+                   dell'emittente deve seguire il controllo del nome dell'ente e
+                   precedere la firma della credenziale, che ne usa la chiave pubblica.
+            event_sample_rate: Frazione delle verifiche riuscite di cui emettere gli eventi per controllo.
+        """
+        order = tuple(order)
+        if sorted(order) != sorted(FAIL_FAST_ORDER):
+            raise ValueError(f"La politica deve contenere esattamente i controlli {FAIL_FAST_ORDER}.")
+        if not order.index(AUTHORITY_NAME) < order.index(ISSUER_CERTIFICATE) < order.index(CREDENTIAL_SIGNATURE):
+            raise ValueError(
+                "Il certificato dell'emittente va verificato dopo il nome dell'ente e prima della firma della credenziale."
+            )
+        self.order = order
+        self.event_sample_rate = event_sample_rate
+
+    def run(
+        self,
+        verifier: "VerifyingUniversity",
+        presentation: Presentation,
+        registry: RevocationRegistry,
+        only: Optional[Sequence[str]] = None
+    ) -> VerificationReport:
+        """
+        Esegue i controlli nell'ordine della politica fermandosi al primo
+        fallimento, che viene registrato nel report (non sollevato).
+        Con only si eseguono soltanto i controlli indicati (es. la sola revoca
+        per una presentazione i cui altri esiti sono già in cache).
+        """
+        report = VerificationReport()
+        context: Dict[str, Any] = {}
+        try:
+            verifier._check_structure(presentation)
+        except ProjectBaseException as e:
+            report.error = e
+            return report
+
+        # Il campionamento si decide una volta per verifica: gli eventi di una
+        # presentazione campionata sono tutti emessi, e i fallimenti sempre
+        emit = events_logger.isEnabledFor(logging.DEBUG)
+        sampled = emit and random.random() < self.event_sample_rate
+
+        checks = self.order if only is None else [c for c in self.order if c in only]
+        for check in checks:
+            start = time.perf_counter()
+            try:
+                with span('verification.' + check, verifier=verifier.id, check=check):
+                    self.run_check(check, verifier, presentation, registry, context)
+            except ProjectBaseException as e:
+                report.timings[check] = time.perf_counter() - start
+                report.failed_check, report.error = check, e
+                if emit:
+                    self._emit_event(verifier, presentation, check, report.timings[check], e)
+                break
+            report.timings[check] = time.perf_counter() - start
+            if sampled:
+                self._emit_event(verifier, presentation, check, report.timings[check], None)
+        return report
+
+    @staticmethod
+    def _emit_event(verifier: "VerifyingUniversity", presentation: Presentation, check: str, seconds: float, error: Optional[ProjectBaseException]):
+        outcome = 'ok' if error is None else 'fail'
+        credential_id = presentation.original_credential_public_part.credential_id
+        events_logger.debug(
+            "check=%s outcome=%s duration_ms=%.3f credential_id=%s", check, outcome, seconds * 1000, credential_id,
+            extra={
+                'event': 'verification_check',
+                'verifier': verifier.id,
+                'check': check,
+                'outcome': outcome,
+                'duration_ms': seconds * 1000,
+                'credential_id': credential_id,
+                'error': type(error).__name__ if error is not None else None,
+            }
+        )
+
+    @staticmethod
+    def run_check(check: str, verifier: "VerifyingUniversity", presentation: Presentation, registry: RevocationRegistry, context: Dict[str, Any]):
+        """Esegue un singolo controllo; context trasporta la chiave dell'emittente tra i controlli di firma."""
+        issuer_cert = presentation.issuer_certificate
+        if check == AUTHORITY_NAME:
+            verifier._check_authority_name(issuer_cert)
+        elif check == REVOCATION:
+            verifier._check_revocation(presentation, registry)
+        elif check == MERKLE_PROOF:
+            verifier._check_merkle_proof(presentation)
+        elif check == ISSUER_CERTIFICATE:
+            context['issuer_public_key'] = verifier._check_issuer_certificate(issuer_cert)
+        elif check == CREDENTIAL_SIGNATURE:
+            verifier._check_credential_signature(presentation, context['issuer_public_key'])
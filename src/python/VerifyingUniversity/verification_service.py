@@ -0,0 +1,377 @@
+# src/python/VerifyingUniversity/verification_service.py
+"""
+Servizio di verifica asincrono (asyncio) davanti a VerifyingUniversity.
+
+Protocollo su socket TCP: ogni messaggio è preceduto dalla sua lunghezza
+(4 byte, big-endian) ed è un array CBOR.
+- Richiesta: [request_id, presentazione nel formato binario di utils.wire_format]
+- Risposta:  [request_id, valida, nome dell'eccezione o None, messaggio]
+
+Un client può inviare più richieste senza attendere le risposte, che
+possono arrivare in ordine diverso e si abbinano tramite request_id.
+
+Le richieste di tutte le connessioni confluiscono in micro-batch: il primo
+arrivo apre una finestra di batch_window secondi (chiusa prima se il batch
+si riempie). Ogni batch viene decodificato e verificato con
+verify_presentations in un thread, che invia le firme RSA a un pool di
+processi; il ciclo di eventi resta libero di accettare richieste. Oltre
+max_pending richieste in attesa il servizio risponde subito con
+ServiceOverloadedError, così la coda (e la latenza) resta limitata.
+"""
+import asyncio
+import itertools
+import logging
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from config import (
+    BATCH_VERIFICATION_PARALLEL_THRESHOLD, VERIFICATION_SERVICE_HOST, VERIFICATION_SERVICE_PORT,
+    VERIFICATION_BATCH_WINDOW_SECONDS, VERIFICATION_BATCH_MAX_SIZE, VERIFICATION_SERVICE_MAX_PENDING,
+    VERIFICATION_SERVICE_MAX_FRAME_SIZE
+)
+from utils import cbor
+from utils.exceptions import ServiceOverloadedError, WireFormatError
+from utils.wire_format import decode_presentation, encode_presentation
+from Revocation.revocation import RevocationRegistry
+from models import Presentation
+from .verifying_university import VerifyingUniversity
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('>I')
+# Batch verificati contemporaneamente: mentre uno è in verifica, il successivo si riempie
+_MAX_BATCHES_IN_FLIGHT = 2
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int = VERIFICATION_SERVICE_MAX_FRAME_SIZE) -> Optional[bytes]:
+    """Legge un messaggio prefissato dalla lunghezza; None se la connessione è chiusa tra due messaggi."""
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise WireFormatError("Messaggio troncato.")
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > max_size:
+        raise WireFormatError(f"Messaggio di {length} byte oltre il limite di {max_size}.")
+    try:
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise WireFormatError("Messaggio troncato.")
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    """Accoda un messaggio prefissato dalla lunghezza (va seguito da drain())."""
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+@dataclass(frozen=True)
+class VerificationReply:
+    """Esito di una verifica remota."""
+    valid: bool
+    error: Optional[str] = None  # nome dell'eccezione (es. 'CredentialRevokedError')
+    message: str = ''
+
+
+class VerificationService:
+    def __init__(
+        self,
+        verifier: VerifyingUniversity,
+        registry: RevocationRegistry,
+        host: str = VERIFICATION_SERVICE_HOST,
+        port: int = VERIFICATION_SERVICE_PORT,
+        batch_window: float = VERIFICATION_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = VERIFICATION_BATCH_MAX_SIZE,
+        max_pending: int = VERIFICATION_SERVICE_MAX_PENDING,
+        max_workers: Optional[int] = None,
+        max_frame_size: int = VERIFICATION_SERVICE_MAX_FRAME_SIZE
+    ):
+        """
+        Args:
+            verifier: L'università che esegue le verifiche (fiducia, cache, politica).
+            registry: Il registro di revoca da consultare.
+            host, port: Indirizzo di ascolto (porta 0 = scelta dal sistema).
+            batch_window: Attesa massima in secondi per riempire un micro-batch.
+            max_batch_size: Presentazioni al massimo per micro-batch.
+            max_pending: Richieste in attesa oltre cui le nuove vengono rifiutate.
+            max_workers: Processi per le firme (None = numero di core, 1 = nessun pool).
+            max_frame_size: Dimensione massima in byte di un messaggio.
+        """
+        self.verifier = verifier
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.max_workers = max_workers
+        self.max_frame_size = max_frame_size
+
+        self.requests_served = 0
+        self.requests_rejected = 0
+        self.batches_dispatched = 0
+
+        metrics = verifier.metrics
+        self._request_seconds = metrics.histogram(
+            'aps_service_request_seconds', 'Latenza di una richiesta al servizio di verifica (coda inclusa).', ('verifier',)
+        )
+        self._batch_sizes = metrics.histogram(
+            'aps_service_batch_size', 'Presentazioni per micro-batch.', ('verifier',), buckets=_BATCH_SIZE_BUCKETS
+        )
+        self._rejected = metrics.counter(
+            'aps_service_rejected_total', 'Richieste rifiutate per coda piena.', ('verifier',)
+        )
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Indirizzo effettivo di ascolto (utile con port=0)."""
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        """Avvia il pool di processi, il raccoglitore dei batch e il server TCP."""
+        self._queue = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._slots = asyncio.Semaphore(_MAX_BATCHES_IN_FLIGHT)
+        if self.max_workers != 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._threads = ThreadPoolExecutor(max_workers=_MAX_BATCHES_IN_FLIGHT, thread_name_prefix='verification-batch')
+        self._collector = asyncio.create_task(self._collect_batches())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info("Servizio di verifica di '%s' in ascolto su %s:%d.", self.verifier.id, *self.address)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Chiude il server e le connessioni aperte, completa i batch in corso e arresta i pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._connections.values():
+            writer.close()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+        if self._threads is not None:
+            self._threads.shutdown()
+        if self._pool is not None:
+            self._pool.shutdown()
+        logger.info(
+            "Servizio di verifica di '%s' chiuso: %d richieste servite in %d batch, %d rifiutate.",
+            self.verifier.id, self.requests_served, self.batches_dispatched, self.requests_rejected
+        )
+
+    async def __aenter__(self) -> "VerificationService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def submit(self, data: bytes) -> VerificationReply:
+        """Accoda una presentazione (formato binario) al prossimo micro-batch e ne attende l'esito."""
+        if self._pending >= self.max_pending:
+            self.requests_rejected += 1
+            self._rejected.inc(verifier=self.verifier.id)
+            return VerificationReply(False, ServiceOverloadedError.__name__, "Troppe richieste in attesa, riprovare più tardi.")
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._pending += 1
+        try:
+            self._queue.put_nowait((data, future, start))
+            if self._queue.qsize() >= self.max_batch_size:
+                self._batch_full.set()
+            reply = await future
+        finally:
+            self._pending -= 1
+        self.requests_served += 1
+        self._request_seconds.observe(time.perf_counter() - start, verifier=self.verifier.id)
+        return reply
+
+    async def _collect_batches(self):
+        """Forma i micro-batch: attende il primo elemento, poi la finestra o il riempimento."""
+        while True:
+            first = await self._queue.get()
+            if self._queue.qsize() + 1 < self.max_batch_size and self.batch_window > 0:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.batch_window)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [first]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._slots.acquire()
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[bytes, asyncio.Future, float]]):
+        try:
+            self.batches_dispatched += 1
+            self._batch_sizes.observe(len(batch), verifier=self.verifier.id)
+            loop = asyncio.get_running_loop()
+            try:
+                replies = await loop.run_in_executor(self._threads, self._verify_batch, [data for data, _, _ in batch])
+            except Exception as e:
+                logger.exception("Errore inatteso durante la verifica di un batch.")
+                replies = [VerificationReply(False, type(e).__name__, str(e))] * len(batch)
+            for (_, future, _), reply in zip(batch, replies):
+                if not future.done():
+                    future.set_result(reply)
+        finally:
+            self._slots.release()
+
+    def _verify_batch(self, payloads: List[bytes]) -> List[VerificationReply]:
+        """Eseguito in un thread: decodifica e verifica un micro-batch."""
+        replies: List[Optional[VerificationReply]] = [None] * len(payloads)
+        presentations: List[Presentation] = []
+        positions: List[int] = []
+        for i, data in enumerate(payloads):
+            try:
+                presentations.append(decode_presentation(data, self.verifier.resolve_certificate))
+                positions.append(i)
+            except WireFormatError as e:
+                replies[i] = VerificationReply(False, type(e).__name__, str(e))
+        if presentations:
+            # Sotto la soglia le firme costano meno dell'invio al pool
+            parallel = self._pool is not None and len(presentations) >= BATCH_VERIFICATION_PARALLEL_THRESHOLD
+            results = self.verifier.verify_presentations(
+                presentations, self.registry,
+                max_workers=None if parallel else 1,
+                executor=self._pool if parallel else None
+            )
+            for i, result in zip(positions, results):
+                if result.is_valid:
+                    replies[i] = VerificationReply(True)
+                else:
+                    replies[i] = VerificationReply(False, type(result.error).__name__, str(result.error))
+        return replies
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = asyncio.current_task()
+        self._connections[connection] = writer
+        answers: Set[asyncio.Task] = set()
+        try:
+            while True:
+                frame = await read_frame(reader, self.max_frame_size)
+                if frame is None:
+                    break
+                try:
+                    request_id, data = cbor.loads(frame)
+                except (cbor.CBORDecodeError, TypeError, ValueError):
+                    raise WireFormatError("Richiesta non valida: atteso [request_id, presentazione].")
+                if not isinstance(request_id, int) or not isinstance(data, bytes):
+                    raise WireFormatError("Richiesta non valida: atteso [request_id, presentazione].")
+                task = asyncio.create_task(self._answer(writer, request_id, data))
+                answers.add(task)
+                task.add_done_callback(answers.discard)
+        except (WireFormatError, ConnectionError) as e:
+            logger.warning("Connessione chiusa per errore di protocollo: %s", e)
+        finally:
+            if answers:
+                await asyncio.gather(*answers, return_exceptions=True)
+            self._connections.pop(connection, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _answer(self, writer: asyncio.StreamWriter, request_id: int, data: bytes):
+        reply = await self.submit(data)
+        if writer.is_closing():
+            return
+        write_frame(writer, cbor.dumps([request_id, reply.valid, reply.error, reply.message]))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+class VerificationClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Client del servizio di verifica; usare VerificationClient.connect()."""
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive_replies())
+
+    @classmethod
+    async def connect(cls, host: str = VERIFICATION_SERVICE_HOST, port: int = VERIFICATION_SERVICE_PORT) -> "VerificationClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def verify(self, presentation: Union[Presentation, bytes], certificate_by_reference: bool = False) -> VerificationReply:
+        """
+        Invia una presentazione (oggetto o già codificata) e ne attende l'esito.
+        Più chiamate concorrenti condividono la stessa connessione.
+        """
+        if self._receiver.done():
+            raise ConnectionError("Connessione al servizio di verifica chiusa.")
+        data = presentation if isinstance(presentation, bytes) else encode_presentation(presentation, certificate_by_reference)
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        write_frame(self._writer, cbor.dumps([request_id, data]))
+        await self._writer.drain()
+        return await future
+
+    async def _receive_replies(self):
+        error: Exception = ConnectionError("Connessione al servizio di verifica chiusa.")
+        try:
+            while True:
+                frame = await read_frame(self._reader)
+                if frame is None:
+                    break
+                request_id, valid, error_name, message = cbor.loads(frame)
+                future = self._waiting.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(VerificationReply(valid, error_name, message))
+        except (WireFormatError, cbor.CBORDecodeError, TypeError, ValueError, ConnectionError) as e:
+            error = ConnectionError(f"Risposta non valida dal servizio di verifica: {e}")
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._waiting.clear()
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def __aenter__(self) -> "VerificationClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -1,71 +1,542 @@
 # src/python/VerifyingUniversity/verifying_university.py
-from typing import Dict
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+import functools
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives import serialization
 
+from config import BATCH_VERIFICATION_PARALLEL_THRESHOLD
 from utils.crypto_utils import verify_signature
 from utils.credential import AcademicCredential
+from utils.merkle_tree import MerkleTree
+from utils.signature_suites import PublicKey
+from utils.metrics import DEFAULT_REGISTRY, MetricsRegistry, span
 from utils.exceptions import (
-    SignatureVerificationError, MerkleProofError, UntrustedAuthorityError, CredentialRevokedError
+    ProjectBaseException, SignatureVerificationError, MerkleProofError, UntrustedAuthorityError, CredentialRevokedError,
+    StatusListError, WireFormatError
 )
 from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from Revocation.filter_cascade import FilterCascade
 from Revocation.revocation import RevocationRegistry
-from models import VerifiablePresentation
+from Revocation.status_list import VerifiedStatusList
+from models import (
+    Certificate, CredentialBatchRoot, MultiCoursePresentation, Presentation, RevocationDelta, StatusList,
+    VerificationResult, VerifiableCredentialPublicPart
+)
+from .certificate_cache import VerifiedCertificateCache
+from .result_cache import VerificationResultCache
+from .verification_policy import (
+    VerificationPolicy, VerificationReport, CHECK_LABELS, AUTHORITY_NAME, REVOCATION, MERKLE_PROOF
+)
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=128)
+def _load_public_key(public_key_pem: str) -> PublicKey:
+    """Deserializza una chiave PEM, una sola volta per processo worker."""
+    return serialization.load_pem_public_key(public_key_pem.encode('utf-8'))
+
+def _verify_credential_signature_job(public_key_pem: str, signature_suite: str, signature: bytes, signed_payload) -> Optional[SignatureVerificationError]:
+    """
+    Job eseguito nei processi del pool: verifica la firma di una credenziale
+    (o della radice del batch che la contiene).
+    Restituisce l'eccezione invece di sollevarla, così il batch può proseguire;
+    una chiave PEM malformata o una firma di tipo errato valgono come firma non valida.
+    """
+    try:
+        verify_signature(_load_public_key(public_key_pem), signature, signed_payload, signature_suite)
+    except SignatureVerificationError as e:
+        return e
+    except (ValueError, TypeError, UnsupportedAlgorithm) as e:
+        return SignatureVerificationError(f"Verifica della firma fallita: {type(e).__name__}: {e}")
+    return None
+
+
+def _exception_types(base: type) -> List[type]:
+    """Tutte le sottoclassi (dirette e indirette) di un'eccezione."""
+    found = []
+    for subclass in base.__subclasses__():
+        found.append(subclass)
+        found.extend(_exception_types(subclass))
+    return found
+
 
 class VerifyingUniversity:
-    def __init__(self, university_id: str):
-        """Inizializza l'Università Verificatrice (UV)."""
+    def __init__(
+        self,
+        university_id: str,
+        policy: Optional[VerificationPolicy] = None,
+        metrics: MetricsRegistry = DEFAULT_REGISTRY,
+        result_cache: Optional[VerificationResultCache] = None
+    ):
+        """
+        Inizializza l'Università Verificatrice (UV).
+
+        Args:
+            university_id: Nome dell'università.
+            policy: Ordine dei controlli (None = fail-fast, controlli economici prima delle firme).
+            metrics: Registro in cui pubblicare le metriche di verifica.
+            result_cache: Cache degli esiti delle presentazioni già verificate (None = disattivata).
+        """
         self.id = university_id
-        self.trusted_authorities: Dict[str, RSAPublicKey] = {}
-        print(f"Università Verificatrice '{self.id}' creata.")
+        self.policy = policy if policy is not None else VerificationPolicy()
+        self.metrics = metrics
+        self._check_seconds = metrics.histogram(
+            'aps_verification_check_seconds', 'Durata di ciascun controllo di verifica.', ('verifier', 'check')
+        )
+        self._batch_seconds = metrics.histogram(
+            'aps_verification_batch_seconds', 'Durata della verifica di un batch di presentazioni.', ('verifier',)
+        )
+        self._verifications = metrics.counter(
+            'aps_verifications_total', 'Presentazioni verificate, per esito.', ('verifier', 'outcome')
+        )
+        self._exceptions = metrics.counter(
+            'aps_verification_exceptions_total', 'Verifiche fallite, per tipo di eccezione.', ('verifier', 'exception')
+        )
+        self._cache_lookups = metrics.counter(
+            'aps_certificate_cache_lookups_total', 'Consultazioni della cache dei certificati verificati.', ('verifier', 'cache', 'result')
+        )
+        # Le serie partono da zero, così ogni tipo di eccezione è visibile anche prima del primo fallimento
+        for exception_type in _exception_types(ProjectBaseException):
+            self._exceptions.inc(0, verifier=self.id, exception=exception_type.__name__)
+        # Report (tempi per controllo) dell'ultima verifica singola
+        self.last_report: Optional[VerificationReport] = None
+        self.trusted_authorities: Dict[str, PublicKey] = {}
+        self.certificate_cache = VerifiedCertificateCache()
+        self.result_cache = result_cache
+        # Filtro di revoca compatto pubblicato dal registro (opzionale)
+        self.revocation_filter: Optional[FilterCascade] = None
+        # Revoche successive alla costruzione del filtro, ricevute come delta
+        self._revoked_since_filter: Set[str] = set()
+        # Liste di stato verificate, per (emittente, lista)
+        self.status_lists: Dict[Tuple[str, str], VerifiedStatusList] = {}
+        logger.info("Università Verificatrice '%s' creata.", self.id)
 
     def add_trusted_authority(self, authority: AccreditationAuthority):
         """Aggiunge un Ente di Accreditamento all'elenco di quelli fidati."""
+        # Una chiave diversa per lo stesso nome rende obsoleti i certificati in cache
+        self.certificate_cache.invalidate_authority(authority.name)
+        self._drop_status_lists(authority.name)
+        if self.result_cache is not None:
+            self.result_cache.invalidate_authority(authority.name)
         self.trusted_authorities[authority.name] = authority.public_key
-        print(f"'{self.id}' ora si fida di '{authority.name}'.")
+        logger.info("'%s' ora si fida di '%s'.", self.id, authority.name)
+
+    def remove_trusted_authority(self, authority_name: str):
+        """Rimuove un ente fidato e invalida i certificati da esso firmati presenti in cache."""
+        self.trusted_authorities.pop(authority_name, None)
+        self.certificate_cache.invalidate_authority(authority_name)
+        self._drop_status_lists(authority_name)
+        if self.result_cache is not None:
+            self.result_cache.invalidate_authority(authority_name)
+        logger.info("'%s' non si fida più di '%s'.", self.id, authority_name)
+
+    def _drop_status_lists(self, authority_name: str):
+        """Scarta le liste di stato verificate con certificati firmati da un ente."""
+        self.status_lists = {key: sl for key, sl in self.status_lists.items() if sl.authority_name != authority_name}
+
+    def set_revocation_filter(self, revocation_filter: Optional[FilterCascade]):
+        """Installa (o rimuove, con None) il filtro di revoca usato dal CHECK 4."""
+        self.revocation_filter = revocation_filter
+        self._revoked_since_filter = set()
 
-    def verify_presentation(self, presentation: VerifiablePresentation, registry: RevocationRegistry) -> bool:
+    def apply_revocation_delta(self, delta: RevocationDelta):
         """
-        Verifica una presentazione selettiva ricevuta da uno studente.
-        Esegue 4 controlli sequenziali. Ritorna True se tutti passano.
-        Solleva un'eccezione specifica al primo fallimento.
+        Applica al filtro installato le revoche successive alla sua costruzione
+        (vedi RevocationRegistry.revocations_since), in O(delta): per questi ID
+        il CHECK 4 consulta il registro anche se il filtro li dà per validi.
         """
-        # print(f"\n'{self.id}' sta verificando una presentazione per lo studente con pseudonym: {presentation['original_credential_public_part']['student_pseudonym']}")
+        delta.apply_to(self._revoked_since_filter)
 
-        # --- CHECK 1: Fiducia nell'Emittente (Trust in CA) ---
-        issuer_cert = presentation.issuer_certificate
+    def _lookup_result(self, presentation: Presentation, registry: RevocationRegistry) -> Tuple[Optional[str], bool]:
+        """
+        Consulta la cache degli esiti. Restituisce il digest della presentazione
+        (None se la cache è disattivata o la presentazione non è codificabile)
+        e True se i controlli diversi dalla revoca sono già stati superati.
+        """
+        if self.result_cache is None:
+            return None, False
+        try:
+            digest = self.result_cache.presentation_digest(presentation)
+        except (ProjectBaseException, TypeError, ValueError):
+            # Presentazione malformata: la verifica completa riporterà l'errore
+            return None, False
+        self.result_cache.watch(registry)
+        cached = self.result_cache.contains(digest)
+        self._cache_lookups.inc(verifier=self.id, cache='result', result='hit' if cached else 'miss')
+        return digest, cached
+
+    def update_status_list(self, status_list: StatusList) -> bool:
+        """
+        Acquisisce una lista di stato pubblicata da un emittente: verifica il
+        certificato (ente fidato e firma dell'EA) e la firma della lista,
+        poi ne tiene in memoria il bitstring decompresso. Le versioni non più
+        recenti di quella in cache vengono ignorate (restituisce False).
+        Solleva l'eccezione del controllo fallito se la lista non è valida.
+        """
+        data = status_list.data
+        issuer_cert = status_list.issuer_certificate
+        key = (data.issuer_id, data.list_id)
+        cached = self.status_lists.get(key)
+        if cached is not None and cached.version >= data.version:
+            return False
+
+        self._check_authority_name(issuer_cert)
+        issuer_public_key = self._check_issuer_certificate(issuer_cert)
+        if issuer_cert.data.university_id != data.issuer_id:
+            raise StatusListError(
+                f"La lista di stato '{data.list_id}' dichiara l'emittente '{data.issuer_id}', "
+                f"ma è firmata da '{issuer_cert.data.university_id}'."
+            )
+        verify_signature(issuer_public_key, status_list.signature, data, issuer_cert.data.signature_suite)
+        self.status_lists[key] = VerifiedStatusList.from_verified(data, issuer_cert)
+        logger.info("'%s' ha acquisito la lista di stato '%s' (versione %d).", self.id, data.list_id, data.version)
+        return True
+
+    def resolve_certificate(self, digest: str) -> Optional[Certificate]:
+        """
+        Risolve un certificato inviato per riferimento nel formato binario
+        (vedi utils.wire_format), tra quelli già verificati da questa università.
+        """
+        return self.certificate_cache.get_certificate(digest)
+
+    def _check_structure(self, presentation: Presentation):
+        """La presentazione deve contenere una parte pubblica e un certificato ben formati."""
+        if not isinstance(presentation.original_credential_public_part, VerifiableCredentialPublicPart):
+            raise WireFormatError("La parte pubblica della credenziale non è ben formata.")
+        if not isinstance(presentation.issuer_certificate, Certificate):
+            raise WireFormatError("Il certificato dell'emittente non è ben formato.")
+
+    def _check_authority_name(self, issuer_cert: Certificate):
+        """Il certificato dell'emittente dichiara un ente fidato (nessuna operazione crittografica)."""
         authority_name = issuer_cert.authority_name
-        
         if authority_name not in self.trusted_authorities:
             raise UntrustedAuthorityError(f"L'ente '{authority_name}' non è nella lista di quelli fidati.")
-        
+
+    def _check_issuer_certificate(self, issuer_cert: Certificate) -> PublicKey:
+        """
+        CHECK 1: il certificato dell'emittente è firmato dall'ente fidato
+        (il cui nome è già stato controllato da _check_authority_name).
+        Restituisce la chiave pubblica dell'emittente, servita dalla cache se
+        il certificato è già stato verificato.
+        """
+        authority_name = issuer_cert.authority_name
+        issuer_public_key = self.certificate_cache.get(issuer_cert)
+        self._cache_lookups.inc(verifier=self.id, cache='certificate', result='miss' if issuer_public_key is None else 'hit')
+        if issuer_public_key is not None:
+            return issuer_public_key
+
         authority_public_key = self.trusted_authorities[authority_name]
         verify_signature(authority_public_key, issuer_cert.signature, issuer_cert.data)
-        print("CHECK 1/4: Fiducia nell'emittente... OK.")
 
-        # --- CHECK 2: Firma della Credenziale (Issuer Signature) ---
         issuer_public_key = issuer_cert.get_public_key()
-        try:
-            verify_signature(
-                issuer_public_key, 
-                presentation.credential_signature, 
-                presentation.original_credential_public_part
+        self.certificate_cache.put(issuer_cert, issuer_public_key)
+        return issuer_public_key
+
+    def _signed_payload(self, presentation: Presentation) -> Any:
+        """
+        Restituisce il dato coperto dalla firma dell'emittente: la parte pubblica
+        della credenziale oppure, per le credenziali emesse a batch, la radice
+        del batch dopo aver verificato che la parte pubblica vi appartenga.
+        """
+        public_part = presentation.original_credential_public_part
+        if presentation.batch_root is None:
+            return public_part
+        if not MerkleTree.verify_proof(public_part, presentation.batch_proof or [], presentation.batch_root, public_part.merkle_version):
+            raise SignatureVerificationError("La credenziale non appartiene al batch firmato dall'emittente.")
+        return CredentialBatchRoot(
+            issuer_id=public_part.issuer_id,
+            batch_root=presentation.batch_root,
+            merkle_version=public_part.merkle_version
+        )
+
+    def _check_credential_signature(self, presentation: Presentation, issuer_public_key: PublicKey):
+        """
+        CHECK 2: la parte pubblica della credenziale è firmata dall'emittente.
+        La firma di una radice di batch viene verificata una sola volta per batch.
+        """
+        signed_payload = self._signed_payload(presentation)
+        issuer_cert = presentation.issuer_certificate
+        batch_root = presentation.batch_root
+        signature = presentation.credential_signature
+        batch_verified = batch_root is not None and self.certificate_cache.is_batch_verified(issuer_cert, batch_root, signature)
+        if batch_root is not None:
+            self._cache_lookups.inc(verifier=self.id, cache='batch_root', result='hit' if batch_verified else 'miss')
+        if not batch_verified:
+            verify_signature(issuer_public_key, signature, signed_payload, issuer_cert.data.signature_suite)
+            if batch_root is not None:
+                self.certificate_cache.mark_batch_verified(issuer_cert, batch_root, signature)
+        self._check_signature_suite(presentation)
+
+    def _check_signature_suite(self, presentation: Presentation):
+        """La suite dichiarata (e firmata) nella credenziale deve coincidere con quella del certificato."""
+        declared_suite = presentation.original_credential_public_part.signature_suite
+        certified_suite = presentation.issuer_certificate.data.signature_suite
+        if declared_suite != certified_suite:
+            raise SignatureVerificationError(
+                f"La credenziale dichiara la suite '{declared_suite}', ma il certificato dell'emittente è '{certified_suite}'."
             )
-        except SignatureVerificationError as e:
-            raise e
-        
-        print("CHECK 2/4: Firma della credenziale... OK.")
 
-        # --- CHECK 3: Prova di Inclusione (Merkle Proof) ---
+    def _check_merkle_proof(self, presentation: Presentation):
+        """CHECK 3: il corso (o i corsi) presentati appartengono al Merkle Tree della credenziale."""
         public_part = presentation.original_credential_public_part
-        if not AcademicCredential.verify_proof(presentation.presented_course, presentation.merkle_proof, public_part.merkle_root):
+        if isinstance(presentation, MultiCoursePresentation):
+            if not AcademicCredential.verify_multiproof(
+                presentation.presented_courses, presentation.merkle_multiproof, public_part.merkle_root, public_part.merkle_version
+            ):
+                raise MerkleProofError("La prova di inclusione dei corsi non è valida.")
+            return
+        if not AcademicCredential.verify_proof(
+            presentation.presented_course, presentation.merkle_proof, public_part.merkle_root, public_part.merkle_version
+        ):
             raise MerkleProofError("La prova di inclusione del corso non è valida.")
-        print("CHECK 3/4: Prova di inclusione del corso... OK.")
-        
-        # --- CHECK 4: Controllo Stato di Revoca ---
+
+    def _check_revocation(self, presentation: Presentation, registry: RevocationRegistry):
+        """
+        CHECK 4: la credenziale non è presente nel registro di revoca e, se
+        ne ha una, il suo bit nella lista di stato dell'emittente è a zero.
+        Il registro resta valido anche per le credenziali con lista di stato,
+        così una revoca registrata con add_revocation non viene ignorata.
+        Se è installato un filtro, il registro viene consultato solo quando
+        il filtro segnala la credenziale come revocata, quando è stata
+        revocata dopo la costruzione del filtro (apply_revocation_delta) o
+        quando è fuori dalla copertura del filtro (emessa da un'altra
+        università o dopo l'ultima emissione inclusa nel filtro).
+        """
+        public_part = presentation.original_credential_public_part
+        if public_part.status_list_id is not None:
+            self._check_status_list(presentation)
         credential_id = public_part.credential_id
+        if (
+            self.revocation_filter is not None and credential_id not in self._revoked_since_filter
+            and self.revocation_filter.covers(public_part.issuer_id, public_part.issue_date)
+            and not self.revocation_filter.is_revoked(credential_id)
+        ):
+            return
         if registry.is_revoked(credential_id):
             raise CredentialRevokedError(f"La credenziale ID {credential_id} è stata revocata.")
-        print("CHECK 4/4: Stato di revoca... OK (non revocata).")
 
-        print("\nRISULTATO: SUCCESSO! La presentazione è valida e verificata.")
-        return True
\ No newline at end of file
+    def _check_status_list(self, presentation: Presentation):
+        """
+        CHECK 4 per le credenziali con lista di stato: test in O(1) del loro bit
+        nella lista in cache, che deve essere firmata dalla stessa chiave del
+        certificato presentato.
+        """
+        public_part = presentation.original_credential_public_part
+        status_list = self.status_lists.get((public_part.issuer_id, public_part.status_list_id))
+        if status_list is None:
+            raise StatusListError(f"La lista di stato '{public_part.status_list_id}' non è disponibile.")
+        if status_list.issuer_public_key_pem != presentation.issuer_certificate.data.public_key_pem:
+            raise StatusListError(f"La lista di stato '{public_part.status_list_id}' non è firmata dall'emittente della credenziale.")
+        revoked = status_list.is_revoked(public_part.status_list_index)
+        if revoked is None:
+            raise StatusListError(
+                f"L'indice {public_part.status_list_index} è fuori dalla lista di stato '{public_part.status_list_id}'."
+            )
+        if revoked:
+            raise CredentialRevokedError(f"La credenziale ID {public_part.credential_id} è stata revocata.")
+
+    def verify_presentation(self, presentation: Presentation, registry: RevocationRegistry) -> bool:
+        """
+        Verifica una presentazione selettiva ricevuta da uno studente, di un
+        singolo corso o di più corsi (MultiCoursePresentation, verificata in
+        un solo passaggio). I controlli sono eseguiti nell'ordine della
+        politica (per default: ente fidato, revoca, prova di Merkle, firma del
+        certificato, firma della credenziale). Ritorna True se tutti passano.
+        Solleva un'eccezione specifica al primo fallimento; i tempi di ogni
+        controllo restano in self.last_report.
+        """
+        with span('verification.verify_presentation', verifier=self.id):
+            digest, cached = self._lookup_result(presentation, registry)
+            # Esito in cache: resta da rivalutare solo la revoca
+            report = self.policy.run(self, presentation, registry, only=(REVOCATION,) if cached else None)
+        if digest is not None and not cached and report.error is None:
+            self.result_cache.put(digest, presentation)
+        self.last_report = report
+        for check, seconds in report.timings.items():
+            self._check_seconds.observe(seconds, verifier=self.id, check=check)
+        self._record_outcome(report.error)
+
+        if logger.isEnabledFor(logging.INFO):
+            if cached:
+                logger.info("Presentazione già verificata (esito in cache): controllata solo la revoca.")
+            total = len(report.timings) if cached else len(self.policy.order)
+            for position, (check, seconds) in enumerate(report.timings.items(), start=1):
+                if check != report.failed_check:
+                    logger.info("CHECK %d/%d: %s... OK (%.3f ms).", position, total, CHECK_LABELS[check], seconds * 1000)
+
+        if report.error is not None:
+            logger.info("Verifica fallita: %s", report.error)
+            raise report.error
+
+        logger.info("RISULTATO: SUCCESSO! La presentazione è valida e verificata.")
+        return True
+
+    def verify_presentations(
+        self,
+        batch: Sequence[Presentation],
+        registry: RevocationRegistry,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> List[VerificationResult]:
+        """
+        Verifica un batch di presentazioni e restituisce un esito per ciascuna,
+        nello stesso ordine del batch, senza interrompersi al primo fallimento.
+
+        I controlli economici (ente fidato, revoca, prova di Merkle) vengono
+        eseguiti per primi su tutto il batch, nell'ordine relativo della
+        politica; le firme dei certificati vengono poi verificate una sola
+        volta per certificato distinto e quelle delle credenziali in parallelo
+        su un pool di processi, solo per le presentazioni ancora valide.
+        L'eccezione riportata è la stessa che solleverebbe verify_presentation
+        con la politica fail-fast.
+
+        Args:
+            batch: Le presentazioni da verificare.
+            registry: Il registro di revoca da consultare.
+            max_workers: Numero di processi del pool (None = numero di core).
+            executor: Pool già esistente da riutilizzare tra più batch.
+        """
+        with span('verification.verify_presentations', verifier=self.id, size=len(batch)):
+            start = time.perf_counter()
+            results = self._verify_batch(batch, registry, max_workers, executor)
+            self._batch_seconds.observe(time.perf_counter() - start, verifier=self.id)
+        for result in results:
+            self._record_outcome(result.error)
+        return results
+
+    def _item_error(self, error: Exception) -> ProjectBaseException:
+        """
+        Errore da riportare per una presentazione di un batch. Un'eccezione
+        diversa da quelle del progetto indica una presentazione malformata:
+        viene riportata come WireFormatError sulla sola presentazione, senza
+        interrompere la verifica delle altre.
+        """
+        if isinstance(error, ProjectBaseException):
+            return error
+        logger.warning("Presentazione malformata in un batch: %s: %s", type(error).__name__, error)
+        wrapped = WireFormatError(f"Presentazione non valida: {type(error).__name__}: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+
+    def _record_outcome(self, error: Optional[ProjectBaseException]):
+        """Aggiorna i contatori di esito e di eccezioni di una verifica."""
+        self._verifications.inc(verifier=self.id, outcome='valid' if error is None else 'invalid')
+        if error is not None:
+            self._exceptions.inc(verifier=self.id, exception=type(error).__name__)
+
+    def _verify_batch(
+        self,
+        batch: Sequence[Presentation],
+        registry: RevocationRegistry,
+        max_workers: Optional[int],
+        executor: Optional[Executor]
+    ) -> List[VerificationResult]:
+        errors: List[Optional[ProjectBaseException]] = [None] * len(batch)
+
+        # --- Esiti in cache: per queste presentazioni resta solo la revoca ---
+        digests: List[Optional[str]] = [None] * len(batch)
+        cached: List[bool] = [False] * len(batch)
+        if self.result_cache is not None:
+            for i, presentation in enumerate(batch):
+                try:
+                    digests[i], cached[i] = self._lookup_result(presentation, registry)
+                except Exception as e:
+                    errors[i] = self._item_error(e)
+
+        # --- Controlli economici, nel processo corrente ---
+        cheap_checks = [c for c in self.policy.order if c in (AUTHORITY_NAME, REVOCATION, MERKLE_PROOF)]
+        for i, presentation in enumerate(batch):
+            if errors[i] is not None:
+                continue
+            try:
+                if cached[i]:
+                    self._check_revocation(presentation, registry)
+                    continue
+                self._check_structure(presentation)
+                for check in cheap_checks:
+                    VerificationPolicy.run_check(check, self, presentation, registry, {})
+            except Exception as e:
+                errors[i] = self._item_error(e)
+
+        # --- Certificato dell'emittente: una sola verifica per certificato distinto ---
+        trust_by_certificate: Dict[Certificate, Optional[ProjectBaseException]] = {}
+        for i, presentation in enumerate(batch):
+            if errors[i] is not None or cached[i]:
+                continue
+            issuer_cert = presentation.issuer_certificate
+            try:
+                if issuer_cert not in trust_by_certificate:
+                    try:
+                        self._check_issuer_certificate(issuer_cert)
+                        trust_by_certificate[issuer_cert] = None
+                    except ProjectBaseException as e:
+                        trust_by_certificate[issuer_cert] = e
+                errors[i] = trust_by_certificate[issuer_cert]
+            except Exception as e:
+                # Certificato non utilizzabile come chiave (campi malformati)
+                errors[i] = self._item_error(e)
+
+        # --- Firme delle credenziali, in parallelo ---
+        # Le credenziali emesse a batch condividono la firma della radice:
+        # ogni terna (certificato, radice, firma) genera un solo job.
+        job_of_item: Dict[int, int] = {}
+        batch_jobs: Dict[Tuple[Certificate, str, bytes], int] = {}
+        jobs: Tuple[List[str], List[str], List[bytes], List[Any]] = ([], [], [], [])
+        for i, presentation in enumerate(batch):
+            if errors[i] is not None or cached[i]:
+                continue
+            issuer_cert = presentation.issuer_certificate
+            try:
+                signed_payload = self._signed_payload(presentation)
+                signature = presentation.credential_signature
+                if presentation.batch_root is not None:
+                    batch_verified = self.certificate_cache.is_batch_verified(issuer_cert, presentation.batch_root, signature)
+                    self._cache_lookups.inc(verifier=self.id, cache='batch_root', result='hit' if batch_verified else 'miss')
+                    if batch_verified:
+                        continue
+                    batch_key = (issuer_cert, presentation.batch_root, signature)
+                    if batch_key in batch_jobs:
+                        job_of_item[i] = batch_jobs[batch_key]
+                        continue
+                    batch_jobs[batch_key] = len(jobs[0])
+            except Exception as e:
+                errors[i] = self._item_error(e)
+                continue
+            job_of_item[i] = len(jobs[0])
+            jobs[0].append(issuer_cert.data.public_key_pem)
+            jobs[1].append(issuer_cert.data.signature_suite)
+            jobs[2].append(signature)
+            jobs[3].append(signed_payload)
+
+        if executor is not None:
+            signature_errors = list(executor.map(_verify_credential_signature_job, *jobs, chunksize=8))
+        elif max_workers == 1 or len(jobs[0]) < BATCH_VERIFICATION_PARALLEL_THRESHOLD:
+            signature_errors = list(map(_verify_credential_signature_job, *jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                signature_errors = list(pool.map(_verify_credential_signature_job, *jobs, chunksize=8))
+        for i, job in job_of_item.items():
+            errors[i] = signature_errors[job]
+        for (issuer_cert, batch_root, signature), job in batch_jobs.items():
+            if signature_errors[job] is None:
+                self.certificate_cache.mark_batch_verified(issuer_cert, batch_root, signature)
+        for i, presentation in enumerate(batch):
+            if errors[i] is None and not cached[i]:
+                try:
+                    self._check_signature_suite(presentation)
+                    if digests[i] is not None:
+                        self.result_cache.put(digests[i], presentation)
+                except Exception as e:
+                    errors[i] = self._item_error(e)
+
+        results = [VerificationResult(presentation=p, error=e) for p, e in zip(batch, errors)]
+        valid_count = sum(1 for r in results if r.is_valid)
+        logger.info(
+            "'%s' ha verificato %d presentazioni (%d certificati distinti): %d valide.",
+            self.id, len(batch), len(trust_by_certificate), valid_count
+        )
+        return results
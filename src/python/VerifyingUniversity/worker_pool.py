@@ -0,0 +1,234 @@
+# src/python/VerifyingUniversity/worker_pool.py
+"""
+Pool di processi verificatori che condividono lo stato del processo padre.
+
+Il padre possiede gli enti fidati e le liste di stato verificate (della
+sua VerifyingUniversity) e il registro di revoca, e li pubblica come
+snapshot in un segmento di memoria condivisa (mappato in memoria, senza
+copie nei processi):
+
+    intestazione | fiducia (CBOR: [nome -> chiave DER, liste di stato]) | digest revocati ordinati
+
+I digest usano il formato di SortedDigestIndex, interrogato per ricerca
+binaria direttamente sul segmento. Un blocco di controllo condiviso contiene
+versione e nome dello snapshot corrente: publish() scrive un nuovo segmento
+e poi sostituisce versione e nome sotto lock, così i processi passano alla
+nuova versione al job successivo, senza essere riavviati. Le cache dei
+certificati dei processi restano calde finché gli enti fidati non cambiano.
+"""
+import multiprocessing
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence
+from cryptography.hazmat.primitives import serialization
+
+from config import VERIFIER_POOL_CHUNK_SIZE
+from utils import cbor
+from utils.exceptions import ProjectBaseException
+from Revocation.revocation import RevocationRegistry
+from Revocation.revocation_store import DIGEST_SIZE, SortedDigestIndex, credential_digest
+from Revocation.status_list import VerifiedStatusList
+from models import Presentation, VerificationResult
+from .verifying_university import VerifyingUniversity
+from .verification_policy import VerificationPolicy
+
+_SNAPSHOT_MAGIC = b'VWSS'
+_SNAPSHOT_FORMAT = 2
+# magic, formato, versione, byte della sezione di fiducia, numero di digest revocati
+_SNAPSHOT_HEADER = struct.Struct('>4sHQIQ')
+# Blocco di controllo: versione corrente e nome del suo segmento
+_CONTROL = struct.Struct('>Q64s')
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Apre un segmento esistente. La sua vita è gestita dal padre, che lo
+    rimuove quando pubblica la versione successiva.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        # I processi del pool condividono il resource tracker del padre:
+        # la registrazione coincide con la sua e viene rimossa dal suo unlink()
+        return SharedMemory(name=name)
+
+
+class SharedRevocationSnapshot:
+    def __init__(self, index: SortedDigestIndex):
+        """Registro di revoca in sola lettura su uno snapshot in memoria condivisa."""
+        self._index = index
+
+    def is_revoked(self, credential_id: str) -> bool:
+        return self._index.contains(credential_digest(credential_id))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class _WorkerState:
+    def __init__(self, verifier_id: str, policy: VerificationPolicy, control, lock):
+        """Stato di un processo del pool: il verificatore locale e lo snapshot in uso."""
+        self.verifier = VerifyingUniversity(f"{verifier_id}/worker-{os.getpid()}", policy=policy)
+        self.control = control
+        self.lock = lock
+        self.version = 0
+        self.segment: Optional[SharedMemory] = None
+        self.trust_der: Dict[str, bytes] = {}
+        self.status_rows: List[list] = []
+        self.revocations: Optional[SharedRevocationSnapshot] = None
+
+    def refresh(self):
+        """Passa allo snapshot corrente, se il padre ne ha pubblicato uno nuovo."""
+        with self.lock:
+            version, name = _CONTROL.unpack_from(self.control)
+            if version == self.version:
+                return
+            segment = _attach(name.rstrip(b'\0').decode('ascii'))
+
+        magic, snapshot_format, _, trust_size, revoked_count = _SNAPSHOT_HEADER.unpack_from(segment.buf)
+        if magic != _SNAPSHOT_MAGIC or snapshot_format != _SNAPSHOT_FORMAT:
+            segment.close()
+            raise RuntimeError("Snapshot condiviso del verificatore non riconosciuto.")
+        trust_der, status_rows = cbor.loads(bytes(segment.buf[_SNAPSHOT_HEADER.size:_SNAPSHOT_HEADER.size + trust_size]))
+        if status_rows != self.status_rows:
+            # Liste già verificate dal padre: si ricostruiscono senza ripeterne la verifica
+            self.verifier.status_lists = {
+                (row[1], row[0]): VerifiedStatusList(*row) for row in status_rows
+            }
+            self.status_rows = status_rows
+        if trust_der != self.trust_der:
+            # Enti diversi: i certificati verificati in precedenza non valgono più
+            self.verifier.trusted_authorities = {
+                authority: serialization.load_der_public_key(der) for authority, der in trust_der.items()
+            }
+            self.verifier.certificate_cache.clear()
+            self.trust_der = trust_der
+        index = SortedDigestIndex(segment.buf, revoked_count, offset=_SNAPSHOT_HEADER.size + trust_size)
+
+        old_segment = self.segment
+        self.revocations = SharedRevocationSnapshot(index)
+        self.segment, self.version = segment, version
+        if old_segment is not None:
+            old_segment.close()
+
+
+_worker: Optional[_WorkerState] = None
+
+def _init_worker(verifier_id: str, policy: VerificationPolicy, control, lock):
+    global _worker
+    _worker = _WorkerState(verifier_id, policy, control, lock)
+
+def _verify_chunk_job(presentations: List[Presentation]) -> List[Optional[ProjectBaseException]]:
+    """Job eseguito nei processi del pool: verifica un blocco con lo snapshot più recente."""
+    _worker.refresh()
+    results = _worker.verifier.verify_presentations(presentations, _worker.revocations, max_workers=1)
+    return [result.error for result in results]
+
+
+class VerifierWorkerPool:
+    def __init__(
+        self,
+        verifier: VerifyingUniversity,
+        registry: RevocationRegistry,
+        max_workers: Optional[int] = None,
+        chunk_size: int = VERIFIER_POOL_CHUNK_SIZE
+    ):
+        """
+        Avvia i processi verificatori e pubblica il primo snapshot.
+
+        Args:
+            verifier: Università del padre, proprietaria degli enti fidati (e della politica).
+            registry: Registro di revoca del padre.
+            max_workers: Numero di processi (None = numero di core).
+            chunk_size: Presentazioni per job.
+
+        Dopo aver cambiato enti fidati, liste di stato o revoche, chiamare publish().
+        """
+        self.verifier = verifier
+        self.registry = registry
+        self.chunk_size = chunk_size
+        self.version = 0
+        context = multiprocessing.get_context()
+        self._lock = context.Lock()
+        self._control = context.RawArray('c', _CONTROL.size)
+        self._segment: Optional[SharedMemory] = None
+        self._publish_lock = threading.Lock()
+        self.publish()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(verifier.id, verifier.policy, self._control, self._lock)
+        )
+
+    def publish(self) -> int:
+        """
+        Pubblica enti fidati, liste di stato e revoche correnti come nuova versione dello
+        snapshot e la rende visibile ai processi in modo atomico.
+        Restituisce il numero di versione.
+        """
+        trust = cbor.dumps([
+            {
+                name: key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+                for name, key in self.verifier.trusted_authorities.items()
+            },
+            [
+                [sl.list_id, sl.issuer_id, sl.version, sl.bits, sl.issuer_public_key_pem, sl.authority_name]
+                for sl in self.verifier.status_lists.values()
+            ]
+        ])
+        digests = self.registry.revoked_digests()
+        revoked_count = len(digests) // DIGEST_SIZE
+
+        with self._publish_lock:
+            version = self.version + 1
+            segment = SharedMemory(create=True, size=_SNAPSHOT_HEADER.size + len(trust) + len(digests))
+            _SNAPSHOT_HEADER.pack_into(segment.buf, 0, _SNAPSHOT_MAGIC, _SNAPSHOT_FORMAT, version, len(trust), revoked_count)
+            offset = _SNAPSHOT_HEADER.size
+            segment.buf[offset:offset + len(trust)] = trust
+            offset += len(trust)
+            segment.buf[offset:offset + len(digests)] = digests
+
+            # I processi leggono il controllo e aprono il segmento sotto lo stesso lock:
+            # il vecchio segmento può essere rimosso subito (chi lo ha già mappato continua a usarlo)
+            with self._lock:
+                _CONTROL.pack_into(self._control, 0, version, segment.name.encode('ascii'))
+                old_segment, self._segment, self.version = self._segment, segment, version
+                if old_segment is not None:
+                    old_segment.close()
+                    old_segment.unlink()
+        return version
+
+    def verify_presentations(self, batch: Sequence[Presentation]) -> List[VerificationResult]:
+        """
+        Verifica un batch sui processi del pool, a blocchi di chunk_size, e
+        restituisce un esito per presentazione, nello stesso ordine.
+        """
+        chunks = [list(batch[i:i + self.chunk_size]) for i in range(0, len(batch), self.chunk_size)]
+        errors = [error for chunk_errors in self._executor.map(_verify_chunk_job, chunks) for error in chunk_errors]
+        return [VerificationResult(presentation=p, error=e) for p, e in zip(batch, errors)]
+
+    def verify_presentation(self, presentation: Presentation) -> bool:
+        """Verifica una singola presentazione in un processo del pool; solleva l'eccezione del primo controllo fallito."""
+        error = self._executor.submit(_verify_chunk_job, [presentation]).result()[0]
+        if error is not None:
+            raise error
+        return True
+
+    def close(self):
+        """Arresta i processi e rimuove lo snapshot condiviso."""
+        self._executor.shutdown()
+        with self._publish_lock, self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment.unlink()
+                self._segment = None
+
+    def __enter__(self) -> "VerifierWorkerPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
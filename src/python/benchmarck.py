@@ -1,161 +1,306 @@
 # src/python/benchmark.py
-import time
+"""
+Benchmark end-to-end parametrico: emissione, presentazione e verifica.
+
+Gli attori (EA, UE, UV, studente), i pool di processi, il registro di revoca
+e le presentazioni dei batch vengono preparati prima delle misure; ogni
+ciclo misura solo le fasi. Per ogni scenario si riportano p50/p95/p99.
+
+Gli assi (numero di corsi, dimensione dei batch, revoche nel registro,
+processi) si variano uno alla volta attorno al primo valore di ciascuno;
+con --grid si esegue invece il prodotto cartesiano. Le verifiche sono
+misurate a regime, con il certificato dell'emittente già in cache.
+
+Esempi:
+    python benchmarck.py --courses 1,10,100,1000,10000 --output risultati.json
+    python benchmarck.py --batch-sizes 1,64,256 --workers 1,4 --baseline risultati.json
+"""
+import argparse
+import itertools
 import json
+import logging
 import os
+import platform
 import statistics
 import sys
-from typing import Dict, Any
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
-# Importa le tue classi originali
 from AccreditationAuthority.accreditation_authority import AccreditationAuthority
 from IssuingUniversity.issuing_university import IssuingUniversity
 from Student.student import Student
 from VerifyingUniversity.verifying_university import VerifyingUniversity
 from Revocation.revocation import RevocationRegistry
-from Student.wallet import StudentWallet
-from utils.crypto_utils import generate_rsa_keys, sign_data
-from utils.credential import AcademicCredential
-from typing import List
-
-
-class BenchmarkIssuingUniversity(IssuingUniversity):
-    def issue_credential(self, student_wallet: StudentWallet, courses: List[Dict[str, Any]]):
-        """Crea, firma e rilascia una credenziale accademica a uno studente."""
-        print(f"\nL'università '{self.id}' sta emettendo una credenziale per lo studente...")
-        
-        issuer_info = {'id': self.id, 'certificate': self.certificate}
-        credential = AcademicCredential(
-            issuer_info=issuer_info,
-            student_pseudonym=student_wallet.pseudonym,
-            courses=courses
-        )
-
-        data_to_sign = credential.get_public_part()
-        signature = sign_data(self.private_key, data_to_sign)
-        credential.signature = signature
-
-        print(f"Credenziale {credential.credential_id} creata e firmata con Merkle Root: {credential.merkle_root[:10]}...")
-        
-        student_wallet.receive_credential(credential)
-        return credential
-
-# --- CONFIGURAZIONE DEL BENCHMARK ---
-NUM_RUNS = 100  # Esegui 100 cicli per avere una media affidabile
-NUM_COURSES_PER_CREDENTIAL = 10 # Testa credenziali con 10 esami
+from utils.wire_format import encode_credential, encode_presentation
+from config import LOG_LEVEL, LOG_FORMAT
+
+# --- CONFIGURAZIONE PREDEFINITA DEL BENCHMARK ---
+NUM_RUNS = 100
+NUM_WARMUP_RUNS = 5
+NUM_COURSES_PER_CREDENTIAL = 10
+REGRESSION_TOLERANCE = 0.10  # +10% su p50 o p95 rispetto al baseline
+PERCENTILES = (50, 95, 99)
+
 
 def generate_mock_courses(num_courses: int) -> list:
     """Genera una lista di corsi fittizi per il test."""
     return [{"id": i, "nome": f"Corso di Prova {i}", "voto": 28, "cfu": 6} for i in range(1, num_courses + 1)]
 
-def run_single_cycle() -> Dict[str, float]:
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Statistiche di una serie di latenze (ms): percentili, media, minimo e massimo."""
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        summary = {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+        summary["stdev"] = statistics.stdev(samples)
+    else:
+        summary = {f"p{p}": samples[0] for p in PERCENTILES}
+        summary["stdev"] = 0.0
+    summary.update(mean=statistics.mean(samples), min=min(samples), max=max(samples), runs=len(samples))
+    return summary
+
+def timed_ms(operation: Callable[[], Any]) -> float:
+    start_time = time.perf_counter()
+    operation()
+    return (time.perf_counter() - start_time) * 1000
+
+
+class BenchmarkEnvironment:
+    def __init__(self, workdir: str):
+        """Attori condivisi da tutti gli scenari (chiavi e certificati generati una volta sola)."""
+        self.workdir = workdir
+        self.ea = AccreditationAuthority(name="Benchmark-EA")
+        self.issuer = IssuingUniversity(university_id="Benchmark-UE", accreditation_authority=self.ea)
+        self.verifier = VerifyingUniversity(university_id="Benchmark-UV")
+        self.verifier.add_trusted_authority(self.ea)
+        self.student = Student(name="Benchmark-Student")
+
+    def open_registry(self, revoked: int) -> RevocationRegistry:
+        """
+        Registro di revoca con revoked ID fittizi: lo snapshot JSON viene
+        scritto direttamente e indicizzato all'apertura.
+        """
+        path = os.path.join(self.workdir, f"revocation_{revoked}.json")
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([f"benchmark-revoked-{i}" for i in range(revoked)], f)
+        return RevocationRegistry(registry_file_path=path)
+
+    def issue(self, courses: List[Dict[str, Any]]) -> str:
+        """Emette una credenziale allo studente e ne restituisce l'ID."""
+        self.issuer.issue_credential(self.student.wallet, courses)
+        return list(self.student.wallet.credentials)[-1]
+
+
+def run_scenario(env: BenchmarkEnvironment, params: Dict[str, int], runs: int, warmup: int) -> Dict[str, Any]:
     """
-    Esegue un singolo ciclo completo (setup, emissione, presentazione, verifica)
-    e restituisce un dizionario con le metriche di performance misurate.
+    Prepara uno scenario (registro, pool, presentazioni del batch) e ne
+    misura le fasi per warmup + runs cicli, scartando i cicli di riscaldamento.
     """
-    # 1. SETUP DEGLI ATTORI (viene rieseguito ogni volta per isolare i test)
-    ea = AccreditationAuthority(name="Benchmark-EA")
-    uni_rennes = BenchmarkIssuingUniversity(university_id="Benchmark-UE", accreditation_authority=ea)
-    uni_salerno = VerifyingUniversity(university_id="Benchmark-UV")
-    uni_salerno.add_trusted_authority(ea)
-    studente = Student(name="Benchmark-Student")
-    registry = RevocationRegistry(registry_file_path='benchmark_revocation_list.json')
-    registry.clear_registry_for_testing()
-    courses = generate_mock_courses(NUM_COURSES_PER_CREDENTIAL)
-
-    # 2. MISURA EMISSIONE
-    start_time = time.perf_counter()
-    credential_obj = uni_rennes.issue_credential(studente.wallet, courses)
-    issue_latency = (time.perf_counter() - start_time) * 1000
+    courses = generate_mock_courses(params["courses"])
+    batch_size, workers = params["batch_size"], params["workers"]
+    course_id_to_present = (params["courses"] + 1) // 2  # un corso a metà lista
+    wallet = env.student.wallet
 
-    # 3. MISURA GENERAZIONE PRESENTAZIONE
-    cred_id = credential_obj.credential_id
-    course_id_to_present = NUM_COURSES_PER_CREDENTIAL // 2 # Scegliamo un corso a metà lista
-    
-    start_time = time.perf_counter()
-    presentation = studente.wallet.create_selective_presentation(cred_id, course_id_to_present)
-    presentation_latency = (time.perf_counter() - start_time) * 1000
-    
-    if not presentation:
-        raise RuntimeError("Benchmark fallito: la presentazione non è stata creata.")
+    # --- Setup (non misurato) ---
+    registry = env.open_registry(params["revoked"])
+    verify_pool = sign_pool = None
+    if workers > 1 and batch_size > 1:
+        verify_pool = ProcessPoolExecutor(max_workers=workers)
+        sign_pool = ProcessPoolExecutor(max_workers=workers)
+    batch_ids = [env.issue(courses) for _ in range(batch_size)] if batch_size > 1 else []
+    batch = [wallet.create_selective_presentation(cred_id, course_id_to_present) for cred_id in batch_ids]
 
-    # 4. MISURA VERIFICA COMPLETA
-    start_time = time.perf_counter()
-    is_valid = uni_salerno.verify_presentation(presentation, registry)
-    verification_latency = (time.perf_counter() - start_time) * 1000
-
-    if not is_valid:
-        raise RuntimeError("Benchmark fallito: una verifica valida non è passata.")
-
-    # 5. MISURA DIMENSIONI
-    credential_size = len(json.dumps(credential_obj.to_dict(serializable=True)).encode('utf-8'))
-    presentation_size = len(json.dumps(presentation.to_dict(serializable=True)).encode('utf-8'))
-
-    return {
-        "issue_latency": issue_latency,
-        "presentation_latency": presentation_latency,
-        "verification_latency": verification_latency,
-        "credential_size_kb": credential_size / 1024,
-        "presentation_size_kb": presentation_size / 1024,
+    phases: Dict[str, List[float]] = {"issue_ms": [], "present_ms": [], "verify_ms": []}
+    if batch_size > 1:
+        phases.update(issue_batch_ms=[], verify_batch_ms=[])
+    sizes: Dict[str, float] = {}
+    try:
+        for cycle in range(warmup + runs):
+            measured: Dict[str, float] = {}
+
+            start_time = time.perf_counter()
+            env.issuer.issue_credential(wallet, courses)
+            measured["issue_ms"] = (time.perf_counter() - start_time) * 1000
+            cred_id = list(wallet.credentials)[-1]
+
+            start_time = time.perf_counter()
+            presentation = wallet.create_selective_presentation(cred_id, course_id_to_present)
+            measured["present_ms"] = (time.perf_counter() - start_time) * 1000
+
+            measured["verify_ms"] = timed_ms(lambda: env.verifier.verify_presentation(presentation, registry))
+
+            if batch_size > 1:
+                measured["issue_batch_ms"] = timed_ms(lambda: env.issuer.issue_credentials(
+                    ((None, courses) for _ in range(batch_size)), max_workers=workers, executor=sign_pool
+                ))
+                measured["verify_batch_ms"] = timed_ms(lambda: env.verifier.verify_presentations(
+                    batch, registry, max_workers=workers, executor=verify_pool
+                ))
+
+            if not sizes:
+                credential = wallet.credentials[cred_id]
+                sizes = {
+                    "credential_kb": len(json.dumps(credential.to_dict(serializable=True)).encode('utf-8')) / 1024,
+                    "presentation_kb": len(json.dumps(presentation.to_dict(serializable=True)).encode('utf-8')) / 1024,
+                    "credential_wire_kb": len(encode_credential(credential)) / 1024,
+                    "presentation_wire_kb": len(encode_presentation(presentation)) / 1024,
+                    "presentation_wire_ref_kb": len(encode_presentation(presentation, certificate_by_reference=True)) / 1024,
+                }
+            # La credenziale misurata non serve più: il wallet non cresce tra i cicli
+            del wallet.credentials[cred_id]
+
+            if cycle >= warmup:
+                for phase, value in measured.items():
+                    phases[phase].append(value)
+    finally:
+        for cred_id in batch_ids:
+            del wallet.credentials[cred_id]
+        for pool in (verify_pool, sign_pool):
+            if pool is not None:
+                pool.shutdown()
+        registry.close()
+
+    result: Dict[str, Any] = {
+        "name": scenario_name(params),
+        "params": params,
+        "phases": {phase: summarize(samples) for phase, samples in phases.items()},
+        "sizes": sizes,
+    }
+    if batch_size > 1:
+        result["throughput_per_s"] = {
+            "issue_batch": batch_size / (result["phases"]["issue_batch_ms"]["p50"] / 1000),
+            "verify_batch": batch_size / (result["phases"]["verify_batch_ms"]["p50"] / 1000),
+        }
+    return result
+
+def scenario_name(params: Dict[str, int]) -> str:
+    return ",".join(f"{key}={value}" for key, value in params.items())
+
+def build_scenarios(axes: Dict[str, List[int]], grid: bool) -> List[Dict[str, int]]:
+    """
+    Scenari da eseguire: prodotto cartesiano degli assi (grid) oppure un
+    asse alla volta, con gli altri fissati al loro primo valore. I processi
+    contano solo nelle fasi a batch: il loro asse usa il batch più grande.
+    """
+    if grid:
+        return [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+    base = {axis: values[0] for axis, values in axes.items()}
+    scenarios = [base]
+    for axis, values in axes.items():
+        for value in values[1:]:
+            scenario = {**base, axis: value}
+            if axis == "workers":
+                scenario["batch_size"] = max(axes["batch_size"])
+            scenarios.append(scenario)
+    return scenarios
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Confronta p50 e p95 di ogni fase con il baseline (stessi scenari) e
+    restituisce le regressioni oltre la tolleranza relativa.
+    """
+    baseline_scenarios = {s["name"]: s for s in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in results["scenarios"]:
+        reference = baseline_scenarios.get(scenario["name"])
+        if reference is None:
+            continue
+        for phase, stats in scenario["phases"].items():
+            reference_stats = reference["phases"].get(phase)
+            if reference_stats is None:
+                continue
+            for percentile in ("p50", "p95"):
+                old, new = reference_stats[percentile], stats[percentile]
+                if old > 0 and new > old * (1 + tolerance):
+                    regressions.append(
+                        f"{scenario['name']} {phase} {percentile}: {old:.4f} ms -> {new:.4f} ms (+{(new / old - 1) * 100:.1f}%)"
+                    )
+    return regressions
+
+def print_results(results: Dict[str, Any]):
+    """Tabella dei percentili per scenario e fase."""
+    print(f"\n{'Scenario':<52}{'Fase':<18}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+    for scenario in results["scenarios"]:
+        for phase, stats in scenario["phases"].items():
+            print(f"{scenario['name']:<52}{phase:<18}{stats['p50']:>12.4f}{stats['p95']:>12.4f}{stats['p99']:>12.4f}")
+        for operation, rate in scenario.get("throughput_per_s", {}).items():
+            print(f"{scenario['name']:<52}{operation + ' /s':<18}{rate:>12.1f}")
+
+def parse_int_list(value: str) -> List[int]:
+    try:
+        values = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Lista di interi non valida: '{value}'")
+    if not values or min(values) < 0:
+        raise argparse.ArgumentTypeError(f"Lista di interi non valida: '{value}'")
+    return values
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end di emissione, presentazione e verifica.")
+    parser.add_argument("--runs", type=int, default=NUM_RUNS, help="cicli misurati per scenario")
+    parser.add_argument("--warmup", type=int, default=NUM_WARMUP_RUNS, help="cicli di riscaldamento non misurati")
+    parser.add_argument("--courses", type=parse_int_list, default=[NUM_COURSES_PER_CREDENTIAL], help="corsi per credenziale (es. 1,10,100,1000,10000)")
+    parser.add_argument("--batch-sizes", type=parse_int_list, default=[1], help="presentazioni/credenziali per batch (1 = nessuna fase a batch)")
+    parser.add_argument("--revoked", type=parse_int_list, default=[0], help="revoche presenti nel registro")
+    parser.add_argument("--workers", type=parse_int_list, default=[1], help="processi per le fasi a batch")
+    parser.add_argument("--grid", action="store_true", help="prodotto cartesiano degli assi invece di un asse alla volta")
+    parser.add_argument("--output", help="file JSON su cui scrivere i risultati")
+    parser.add_argument("--baseline", help="file JSON di risultati precedenti con cui confrontarsi")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="aumento relativo tollerato di p50/p95")
+    args = parser.parse_args(argv)
+    if args.runs < 1 or args.warmup < 0:
+        parser.error("--runs deve essere almeno 1 e --warmup non negativo.")
+    if min(args.courses) < 1 or min(args.batch_sizes) < 1 or min(args.workers) < 1:
+        parser.error("Corsi, dimensioni dei batch e processi devono essere almeno 1.")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Esegue gli scenari, stampa i percentili e li confronta con il baseline. Restituisce il codice di uscita."""
+    args = parse_args(argv)
+    axes = {"courses": args.courses, "batch_size": args.batch_sizes, "revoked": args.revoked, "workers": args.workers}
+    scenarios = build_scenarios(axes, args.grid)
+
+    print("--- Inizio Benchmark ---")
+    print(f"Configurazione: {len(scenarios)} scenari, {args.runs} cicli misurati (+{args.warmup} di riscaldamento) ciascuno.")
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "warmup": args.warmup,
+        },
+        "scenarios": [],
     }
+    with tempfile.TemporaryDirectory(prefix="aps-benchmark-") as workdir:
+        env = BenchmarkEnvironment(workdir)
+        for i, params in enumerate(scenarios, start=1):
+            print(f"Scenario {i}/{len(scenarios)}: {scenario_name(params)}", flush=True)
+            results["scenarios"].append(run_scenario(env, params, args.runs, args.warmup))
+    print("\n--- Fine Benchmark ---")
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRisultati scritti in '{args.output}'.")
 
-def main():
-    """Funzione principale per eseguire il benchmark e stampare i risultati aggregati."""
-    print(f"--- Inizio Benchmark ---")
-    print(f"Configurazione: {NUM_RUNS} cicli, {NUM_COURSES_PER_CREDENTIAL} esami per credenziale.")
-    
-    all_metrics = []
-    
-    # Esegui il ciclo di benchmark
-    for i in range(NUM_RUNS):
-        # Reindirizza l'output standard per non inquinare la console con i print delle classi
-        original_stdout = sys.stdout
-        sys.stdout = open(os.devnull, 'w')
-        try:
-            metrics = run_single_cycle()
-            all_metrics.append(metrics)
-        except Exception as e:
-            # Ripristina stdout prima di stampare l'errore
-            sys.stdout.close()
-            sys.stdout = original_stdout
-            print(f"\nERRORE durante il ciclo {i+1}: {e}")
-            return # Interrompi il benchmark in caso di errore
-        finally:
-            # Assicurati di ripristinare sempre stdout
-            sys.stdout.close()
-            sys.stdout = original_stdout
-        
-        # Stampa un indicatore di progresso
-        print(f"\rCiclo {i+1}/{NUM_RUNS} completato.", end="")
-
-    print("\n\n--- Fine Benchmark ---")
-
-    # Calcolo delle statistiche aggregate
-    latencies_issue = [m["issue_latency"] for m in all_metrics]
-    latencies_present = [m["presentation_latency"] for m in all_metrics]
-    latencies_verify = [m["verification_latency"] for m in all_metrics]
-    sizes_cred = [m["credential_size_kb"] for m in all_metrics]
-    sizes_pres = [m["presentation_size_kb"] for m in all_metrics]
-
-    # Stampa dei risultati formattati per la relazione
-    print("\n--- Risultati Medi delle Prestazioni ---")
-    print(f"\n** Latenza Operazioni (media su {NUM_RUNS} esecuzioni) **")
-    print(f"  - Emissione Credenziale:  {statistics.mean(latencies_issue):.4f} ms (dev. std: {statistics.stdev(latencies_issue):.4f})")
-    print(f"  - Generazione Presentazione: {statistics.mean(latencies_present):.4f} ms (dev. std: {statistics.stdev(latencies_present):.4f})")
-    print(f"  - Verifica Completa:        {statistics.mean(latencies_verify):.4f} ms (dev. std: {statistics.stdev(latencies_verify):.4f})")
-    
-    print(f"\n** Dimensione Dati (media su {NUM_RUNS} esecuzioni) **")
-    print(f"  - Dimensione Credenziale:   {statistics.mean(sizes_cred):.4f} KB (dev. std: {statistics.stdev(sizes_cred):.4f})")
-    print(f"  - Dimensione Presentazione: {statistics.mean(sizes_pres):.4f} KB (dev. std: {statistics.stdev(sizes_pres):.4f})")
-
-    # Pulizia finale del file di revoca
-    if os.path.exists('benchmark_revocation_list.json'):
-        os.remove('benchmark_revocation_list.json')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONI rispetto a '{args.baseline}' (tolleranza {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNessuna regressione rispetto a '{args.baseline}' (tolleranza {args.tolerance:.0%}).")
+    return 0
 
 if __name__ == "__main__":
-    # Assicurati che il metodo issue_credential in IssuingUniversity RESTITUISCA la credenziale.
-    # Se non lo fa, devi fare questa piccola modifica nel file originale.
-    # Esempio in IssuingUniversity/issuing_university.py:
-    #   ...
-    #   student_wallet.receive_credential(credential)
-    #   return credential  <-- AGGIUNGI QUESTA RIGA
-    main()
\ No newline at end of file
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    sys.exit(main())
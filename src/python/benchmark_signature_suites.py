@@ -0,0 +1,85 @@
+# src/python/benchmark_signature_suites.py
+"""
+Confronta le suite di firma (RSA-PSS 2048, Ed25519, ECDSA P-256):
+latenza di generazione chiavi, firma e verifica, dimensione di firme,
+chiavi pubbliche, credenziali e presentazioni.
+"""
+import json
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from IssuingUniversity.issuing_university import IssuingUniversity
+from Student.wallet import StudentWallet
+from utils.crypto_utils import generate_keys, sign_data, verify_signature, key_to_pem
+from utils.signature_suites import SUITES
+from config import LOG_LEVEL, LOG_FORMAT
+
+# --- CONFIGURAZIONE DEL BENCHMARK ---
+NUM_KEYGEN_RUNS = 20
+NUM_SIGN_RUNS = 200
+NUM_COURSES_PER_CREDENTIAL = 10
+
+def measure_ms(operation: Callable[[], Any], runs: int) -> List[float]:
+    """Esegue l'operazione runs volte e restituisce le latenze in millisecondi."""
+    latencies = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        operation()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+def benchmark_suite(suite_name: str) -> Dict[str, Any]:
+    """Misura latenze e dimensioni per una singola suite di firma."""
+    payload = {"credential_id": "benchmark", "merkle_root": "00" * 32, "issue_date": "2024-01-01"}
+
+    keygen = measure_ms(lambda: generate_keys(suite_name), NUM_KEYGEN_RUNS)
+    private_key, public_key = generate_keys(suite_name)
+    sign = measure_ms(lambda: sign_data(private_key, payload), NUM_SIGN_RUNS)
+    signature = sign_data(private_key, payload)
+    verify = measure_ms(lambda: verify_signature(public_key, signature, payload, suite_name), NUM_SIGN_RUNS)
+
+    # Dimensioni di credenziale e presentazione con tutti gli attori nella stessa suite
+    ea = AccreditationAuthority("Benchmark-EA", signature_suite=suite_name)
+    university = IssuingUniversity("Benchmark-UE", ea, signature_suite=suite_name)
+    wallet = StudentWallet("Benchmark-Student", signature_suite=suite_name)
+    courses = [{"id": i, "nome": f"Corso di Prova {i}", "voto": 28, "cfu": 6} for i in range(1, NUM_COURSES_PER_CREDENTIAL + 1)]
+    university.issue_credential(wallet, courses)
+    credential = next(iter(wallet.credentials.values()))
+    presentation = wallet.create_selective_presentation(credential.credential_id, 1)
+
+    return {
+        "keygen_ms": keygen,
+        "sign_ms": sign,
+        "verify_ms": verify,
+        "signature_bytes": len(signature),
+        "public_key_pem_bytes": len(key_to_pem(public_key)),
+        "credential_kb": len(json.dumps(credential.to_dict(serializable=True)).encode('utf-8')) / 1024,
+        "presentation_kb": len(json.dumps(presentation.to_dict(serializable=True)).encode('utf-8')) / 1024,
+    }
+
+def main():
+    """Esegue il confronto su tutte le suite e stampa una tabella riassuntiva."""
+    print("--- Inizio Benchmark Suite di Firma ---")
+    print(f"Configurazione: {NUM_KEYGEN_RUNS} generazioni di chiavi, {NUM_SIGN_RUNS} firme/verifiche per suite.\n")
+
+    results = {name: benchmark_suite(name) for name in SUITES}
+
+    print(f"{'Suite':<20}{'Keygen (ms)':>14}{'Firma (ms)':>14}{'Verifica (ms)':>16}{'Firma (B)':>12}{'Chiave PEM (B)':>17}{'Cred. (KB)':>12}{'Pres. (KB)':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<20}"
+            f"{statistics.mean(r['keygen_ms']):>14.4f}"
+            f"{statistics.mean(r['sign_ms']):>14.4f}"
+            f"{statistics.mean(r['verify_ms']):>16.4f}"
+            f"{r['signature_bytes']:>12}"
+            f"{r['public_key_pem_bytes']:>17}"
+            f"{r['credential_kb']:>12.4f}"
+            f"{r['presentation_kb']:>12.4f}"
+        )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    main()
@@ -7,5 +7,73 @@ Modulo per le costanti di configurazione del progetto.
 KEY_SIZE = 2048
 PUBLIC_EXPONENT = 65537
 
+# Suite di firma predefinita: 'rsa-pss-sha256', 'ed25519' o 'ecdsa-p256-sha256'
+SIGNATURE_SUITE = 'rsa-pss-sha256'
+
+# Numero di coppie di chiavi tenute pronte da un KeyPool
+KEY_POOL_SIZE = 32
+
 # Configurazione per il registro di revoca
-REVOCATION_REGISTRY_FILE_PATH = 'revocation_list.json'
\ No newline at end of file
+REVOCATION_REGISTRY_FILE_PATH = 'revocation_list.json'
+
+# Configurazione per la verifica in batch
+# Sotto questa soglia le firme vengono verificate nel processo corrente,
+# perché il costo di avvio del pool supererebbe il guadagno.
+BATCH_VERIFICATION_PARALLEL_THRESHOLD = 16
+
+# Configurazione per la cache dei certificati verificati
+CERTIFICATE_CACHE_MAXSIZE = 256
+CERTIFICATE_CACHE_TTL_SECONDS = None  # None = nessuna scadenza
+CERTIFICATE_CACHE_MAX_BATCH_ROOTS = 1024  # radici di batch verificate ricordate per certificato
+# Cache (opzionale) degli esiti dei controlli diversi dalla revoca, per presentazione
+RESULT_CACHE_MAXSIZE = 1024
+RESULT_CACHE_TTL_SECONDS = None  # None = nessuna scadenza
+
+# Configurazione per il Merkle Tree
+# 1 = formato originale (hash di stringhe esadecimali serializzate in JSON)
+# 2 = digest binari da 32 byte con prefissi di separazione foglia/nodo
+MERKLE_TREE_VERSION = 2
+
+# Configurazione del log append-only delle revoche
+REVOCATION_LOG_FSYNC_BATCH = 16           # revoche accodate tra due fsync
+REVOCATION_LOG_COMPACTION_THRESHOLD = 1024  # righe di log oltre cui si compatta nello snapshot
+# Intervallo con cui un registro osservato controlla i file per revoche scritte da altri processi
+REVOCATION_WATCH_INTERVAL_SECONDS = 1.0
+
+# Tasso di falsi positivi del primo livello del filtro di revoca a cascata
+REVOCATION_FILTER_FP_RATE = 0.01
+
+# Bit per lista di stato (revoca a bitstring): 16 KB non compressi, poche centinaia di byte con gzip
+STATUS_LIST_SIZE = 131072
+
+# Configurazione per l'emissione in blocco
+ISSUANCE_QUEUE_SIZE = 256             # firme in volo al massimo (backpressure)
+ISSUANCE_PARALLEL_THRESHOLD = 16      # sotto questa soglia si firma nel processo corrente
+
+# Emissione a batch: una sola firma RSA sulla radice del Merkle Tree del batch
+BATCH_SIGNING_SIZE = 256  # credenziali per radice firmata
+
+# Archivio persistente del wallet (SQLite letto tramite mmap)
+WALLET_STORE_MMAP_SIZE = 64 * 1024 * 1024  # byte del database mappati in memoria
+WALLET_STORE_CACHE_SIZE = 64               # credenziali materializzate tenute in memoria
+
+# Logging: livello predefinito degli script (le librerie non configurano nulla)
+LOG_LEVEL = 'WARNING'
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+# Frazione delle verifiche di cui emettere gli eventi strutturati per controllo
+# (logger 'VerifyingUniversity.events', livello DEBUG); i fallimenti sono sempre emessi
+VERIFICATION_EVENT_SAMPLE_RATE = 0.01
+
+# Metriche in formato testo Prometheus scritte al termine degli script (None = nessuna esportazione)
+METRICS_EXPORT_PATH = None
+
+# Servizio di verifica asincrono (socket con messaggi prefissati dalla lunghezza)
+VERIFICATION_SERVICE_HOST = '127.0.0.1'
+VERIFICATION_SERVICE_PORT = 8765
+VERIFICATION_BATCH_WINDOW_SECONDS = 0.002  # attesa massima per riempire un micro-batch
+VERIFICATION_BATCH_MAX_SIZE = 256          # presentazioni per micro-batch
+VERIFICATION_SERVICE_MAX_PENDING = 4096    # richieste in coda oltre cui il servizio rifiuta (latenza limitata)
+VERIFICATION_SERVICE_MAX_FRAME_SIZE = 1024 * 1024  # byte massimi di un messaggio
+
+# Pool di processi verificatori con stato condiviso (enti fidati e revoche in memoria condivisa)
+VERIFIER_POOL_CHUNK_SIZE = 64  # presentazioni per job inviato a un processo
@@ -12,6 +12,7 @@ Layout: un unico container nel root gestito con `grid`
 from __future__ import annotations
 
 import copy
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List, Any
@@ -19,10 +20,12 @@ from typing import Dict, List, Any
 from AccreditationAuthority.accreditation_authority import AccreditationAuthority
 from IssuingUniversity.issuing_university import IssuingUniversity
 from VerifyingUniversity.verifying_university import VerifyingUniversity
+from VerifyingUniversity.result_cache import VerificationResultCache
 from Student.student import Student
 from Revocation.revocation import RevocationRegistry
 from utils.exceptions import ProjectBaseException
 from models import VerifiablePresentation
+from config import LOG_LEVEL, LOG_FORMAT
 
 # ---------------------------------------------------------------------------
 # Credenziali di accesso dimostrative {"student", "issuer", "verifier"}
@@ -77,7 +80,8 @@ class SessionManager:
         )
 
         # Università verificatrice, che si fida dell'autorità EA
-        self.verifying_uni = VerifyingUniversity("Università di Salerno")
+        # Una presentazione verificata più volte ripaga solo il controllo di revoca
+        self.verifying_uni = VerifyingUniversity("Università di Salerno", result_cache=VerificationResultCache())
         self.verifying_uni.add_trusted_authority(self.accreditation_authority)
 
         # Studente e wallet
@@ -632,5 +636,6 @@ class MainApp(tk.Tk):
 
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
     app = MainApp()
     app.mainloop()
@@ -1,5 +1,7 @@
 # src/python/main.py
 import copy
+import logging
+import sys
 
 # Importa tutte le classi necessarie
 from AccreditationAuthority.accreditation_authority import AccreditationAuthority
@@ -9,9 +11,12 @@ from VerifyingUniversity.verifying_university import VerifyingUniversity
 from Revocation.revocation import RevocationRegistry
 from utils.exceptions import ProjectBaseException
 from utils.crypto_utils import generate_rsa_keys, sign_data
-from models import VerifiablePresentation
-from utils.exceptions import SignatureVerificationError
+from models import VerifiablePresentation, VerifiableCredentialPublicPart
+from utils.exceptions import SignatureVerificationError, MerkleProofError
 from models import Certificate
+from VerifyingUniversity.verification_policy import CHECK_LABELS
+from utils.metrics import write_prometheus_file
+from config import METRICS_EXPORT_PATH
 
 def run_simulation():
     """Esegue la simulazione completa del ciclo di vita di una credenziale."""
@@ -128,7 +133,7 @@ def run_simulation():
         type="VerifiablePresentation",
         presented_course={"id": 99, "nome": "Hacking 101", "voto": 30},
         merkle_proof=[], # Prova inventata
-        original_credential_public_part=dati_inventati,
+        original_credential_public_part=VerifiableCredentialPublicPart(**dati_inventati),
         issuer_certificate=copy.deepcopy(uni_rennes.certificate), # Usa il vero certificato di Rennes per sembrare legittimo
         credential_signature=copy.deepcopy(firma_falsa)
     )
@@ -137,9 +142,11 @@ def run_simulation():
     try:
         uni_salerno.verify_presentation(presentazione_forgiata, revocation_registry)
         print("\nRISULTATO SCENARIO FORGERY: FALLITO. La frode non è stata rilevata!")
-    except SignatureVerificationError as e:
+    except (SignatureVerificationError, MerkleProofError) as e:
+        # Con la politica fail-fast la prova di Merkle inventata cade prima della firma falsa
         print(f"\nVERIFICA FALLITA (correttamente): {e}")
-        print("\nRISULTATO SCENARIO FORGERY: SUCCESSO. La firma falsa è stata rilevata al CHECK 2!")
+        controllo = CHECK_LABELS[uni_salerno.last_report.failed_check]
+        print(f"\nRISULTATO SCENARIO FORGERY: SUCCESSO. La frode è stata rilevata al controllo '{controllo}'!")
 
     ##########################################################################################################################
     print("\n--- Simulazione di una Università Emittente Malevola (Fiducia Revocata) ---")
@@ -154,8 +161,11 @@ def run_simulation():
         signature=b'invalid_signature_bytes'  # Invalida la firma dell'EA
     )
 
-    # Lo studente prova a presentare una credenziale (crittograficamente valida) emessa da Rennes.
-    presentazione_da_ue_non_fidata = studente_francesco.wallet.create_selective_presentation(cred_id, 2)
+    # Lo studente prova a presentare una credenziale (crittograficamente valida e non revocata) emessa da Rennes.
+    # La credenziale precedente è stata revocata: con i controlli fail-fast la revoca emergerebbe per prima.
+    uni_rennes.issue_credential(studente_francesco.wallet, corsi_superati)
+    nuovo_cred_id = list(studente_francesco.wallet.credentials.keys())[-1]
+    presentazione_da_ue_non_fidata = studente_francesco.wallet.create_selective_presentation(nuovo_cred_id, 2)
 
     # Inseriamo il certificato "revocato" nella presentazione
     object.__setattr__(presentazione_da_ue_non_fidata, 'issuer_certificate', certificato_invalido)
@@ -165,9 +175,14 @@ def run_simulation():
         uni_salerno.verify_presentation(presentazione_da_ue_non_fidata, revocation_registry)
         print("\nRISULTATO SCENARIO UE MALEVOLA: FALLITO. La frode non è stata rilevata!")
     except SignatureVerificationError as e:
-        print("\nRISULTATO SCENARIO UE MALEVOLA: SUCCESSO. La mancanza di fiducia è stata rilevata al CHECK 1!")
+        controllo = CHECK_LABELS[uni_salerno.last_report.failed_check]
+        print(f"\nRISULTATO SCENARIO UE MALEVOLA: SUCCESSO. La mancanza di fiducia è stata rilevata al controllo '{controllo}'!")
         
 
 
 if __name__ == "__main__":
-    run_simulation()
\ No newline at end of file
+    # La simulazione racconta ogni passo: i messaggi INFO delle classi vanno su stdout
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    run_simulation()
+    if METRICS_EXPORT_PATH:
+        write_prometheus_file(METRICS_EXPORT_PATH)
\ No newline at end of file
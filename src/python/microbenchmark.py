@@ -0,0 +1,207 @@
+# src/python/microbenchmark.py
+"""
+Microbenchmark delle primitive di crypto_utils e di MerkleTree, misurate in
+isolamento e per diverse dimensioni dell'input.
+
+Per ogni caso: riscaldamento, calibrazione del numero di iterazioni (ogni
+ripetizione dura almeno --min-time secondi), ripetizioni cronometrate con il
+garbage collector disattivato e, in un passaggio separato sotto tracemalloc,
+la memoria allocata per operazione. Si riportano ops/s (mediana e migliore
+ripetizione), il picco di memoria transitoria e i blocchi trattenuti per operazione.
+
+Esempi:
+    python microbenchmark.py
+    python microbenchmark.py --filter merkle --sizes 10,1000,10000 --output micro.json
+"""
+import argparse
+import gc
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.crypto_utils import generate_keys, hash_data, key_to_pem, sign_data, verify_signature
+from utils.merkle_tree import MerkleTree
+from utils.signature_suites import SUITES
+from config import LOG_LEVEL, LOG_FORMAT, MERKLE_TREE_VERSION
+
+# --- CONFIGURAZIONE PREDEFINITA ---
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000]
+MIN_TIME_SECONDS = 0.1   # durata minima di una ripetizione cronometrata
+NUM_REPEATS = 5
+NUM_WARMUP_ITERATIONS = 3
+MAX_ALLOC_ITERATIONS = 200  # iterazioni del passaggio sotto tracemalloc
+
+
+def generate_mock_courses(num_courses: int) -> list:
+    """Genera una lista di corsi fittizi per il test."""
+    return [{"id": i, "nome": f"Corso di Prova {i}", "voto": 28, "cfu": 6} for i in range(1, num_courses + 1)]
+
+
+def _time_loop(operation: Callable[[], Any], iterations: int) -> float:
+    """Durata di iterations chiamate, con il GC disattivato."""
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        return time.perf_counter() - start_time
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def calibrate(operation: Callable[[], Any], min_time: float) -> int:
+    """Numero di iterazioni per cui una ripetizione dura almeno min_time."""
+    iterations = 1
+    while True:
+        elapsed = _time_loop(operation, iterations)
+        if elapsed >= min_time:
+            return iterations
+        # Stima diretta quando la misura è già significativa, altrimenti raddoppio
+        if elapsed > min_time / 10:
+            return max(iterations + 1, int(iterations * min_time / elapsed * 1.1))
+        iterations *= 2
+
+def measure_allocations(operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """
+    Memoria per operazione sotto tracemalloc: picco transitorio (byte allocati
+    oltre a quelli già in uso durante la chiamata, mediana) e blocchi/byte
+    ancora trattenuti al termine (media sulle iterazioni).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = [0] * iterations
+        before = tracemalloc.take_snapshot()
+        for i in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks[i] = peak - current
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # Le allocazioni del ciclo di misura stesso non contano
+    harness = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(harness).compare_to(before.filter_traces(harness), 'filename')
+    return {
+        "peak_bytes_per_op": statistics.median(peaks),
+        "retained_blocks_per_op": sum(stat.count_diff for stat in diff) / iterations,
+        "retained_bytes_per_op": sum(stat.size_diff for stat in diff) / iterations,
+    }
+
+def run_case(
+    operation: Callable[[], Any],
+    min_time: float = MIN_TIME_SECONDS,
+    repeats: int = NUM_REPEATS,
+    warmup: int = NUM_WARMUP_ITERATIONS,
+    allocations: bool = True
+) -> Dict[str, Any]:
+    """Riscaldamento, calibrazione, ripetizioni cronometrate ed eventuale misura delle allocazioni."""
+    for _ in range(warmup):
+        operation()
+    iterations = calibrate(operation, min_time)
+    per_op = [_time_loop(operation, iterations) / iterations for _ in range(repeats)]
+    result: Dict[str, Any] = {
+        "iterations": iterations,
+        "repeats": repeats,
+        "ops_per_s": 1 / statistics.median(per_op),
+        "best_ops_per_s": 1 / min(per_op),
+        "us_per_op": statistics.median(per_op) * 1e6,
+        "stdev_us": statistics.stdev(per_op) * 1e6 if repeats > 1 else 0.0,
+    }
+    if allocations:
+        result.update(measure_allocations(operation, min(iterations, MAX_ALLOC_ITERATIONS)))
+    return result
+
+
+# --- CASI ---
+# Ogni caso è (primitiva, dimensione, operazione); la preparazione degli input
+# (chiavi, alberi, prove) avviene alla costruzione, fuori dalle misure.
+
+def build_cases(sizes: List[int], merkle_version: int) -> List[Tuple[str, str, Callable[[], Any]]]:
+    cases: List[Tuple[str, str, Callable[[], Any]]] = []
+    keys = {name: generate_keys(name) for name in SUITES}
+
+    for size in sizes:
+        courses = generate_mock_courses(size)
+        payload = {"credential_id": "benchmark", "courses": courses}
+        cases.append(("hash_data", f"{size} corsi", lambda payload=payload: hash_data(payload)))
+
+        for suite_name, (private_key, public_key) in keys.items():
+            signature = sign_data(private_key, payload)
+            cases.append((f"sign_data[{suite_name}]", f"{size} corsi",
+                          lambda k=private_key, p=payload: sign_data(k, p)))
+            cases.append((f"verify_signature[{suite_name}]", f"{size} corsi",
+                          lambda k=public_key, s=signature, p=payload, n=suite_name: verify_signature(k, s, p, n)))
+
+        tree = MerkleTree(courses, version=merkle_version)
+        target = courses[len(courses) // 2]
+        proof = tree.get_proof(target)
+        root = tree.root
+        cases.append(("MerkleTree.__init__", f"{size} foglie",
+                      lambda c=courses: MerkleTree(c, version=merkle_version)))
+        cases.append(("MerkleTree.get_proof", f"{size} foglie",
+                      lambda t=tree, d=target: t.get_proof(d)))
+        cases.append(("MerkleTree.verify_proof", f"{size} foglie",
+                      lambda d=target, p=proof, r=root: MerkleTree.verify_proof(d, p, r, merkle_version)))
+
+    for suite_name, (private_key, public_key) in keys.items():
+        cases.append((f"key_to_pem[{suite_name}]", "chiave privata", lambda k=private_key: key_to_pem(k)))
+        cases.append((f"key_to_pem[{suite_name}]", "chiave pubblica", lambda k=public_key: key_to_pem(k)))
+    return cases
+
+def parse_int_list(value: str) -> List[int]:
+    try:
+        values = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Lista di interi non valida: '{value}'")
+    if not values or min(values) < 1:
+        raise argparse.ArgumentTypeError(f"Lista di interi non valida: '{value}'")
+    return values
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmark delle primitive crittografiche e del Merkle Tree.")
+    parser.add_argument("--sizes", type=parse_int_list, default=DEFAULT_SIZES, help="dimensioni dell'input (corsi / foglie)")
+    parser.add_argument("--filter", default="", help="esegue solo le primitive il cui nome contiene questo testo")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME_SECONDS, help="durata minima in secondi di ogni ripetizione")
+    parser.add_argument("--repeats", type=int, default=NUM_REPEATS, help="ripetizioni cronometrate per caso")
+    parser.add_argument("--warmup", type=int, default=NUM_WARMUP_ITERATIONS, help="iterazioni di riscaldamento")
+    parser.add_argument("--no-allocations", action="store_true", help="salta la misura delle allocazioni con tracemalloc")
+    parser.add_argument("--merkle-version", type=int, choices=(1, 2), default=MERKLE_TREE_VERSION, help="formato del Merkle Tree")
+    parser.add_argument("--output", help="file JSON su cui scrivere i risultati")
+    args = parser.parse_args(argv)
+    if args.repeats < 1 or args.warmup < 0 or args.min_time <= 0:
+        parser.error("--repeats deve essere almeno 1, --warmup non negativo e --min-time positivo.")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    """Esegue i casi selezionati e stampa ops/s e memoria per operazione."""
+    args = parse_args(argv)
+    cases = [case for case in build_cases(args.sizes, args.merkle_version) if args.filter.lower() in case[0].lower()]
+
+    print("--- Inizio Microbenchmark ---")
+    print(f"Configurazione: {len(cases)} casi, {args.repeats} ripetizioni da almeno {args.min_time} s ciascuna.\n")
+    print(f"{'Primitiva':<36}{'Input':<18}{'ops/s':>14}{'us/op':>14}{'Picco B/op':>14}{'Blocchi/op':>12}")
+
+    results = []
+    for name, size, operation in cases:
+        result = run_case(operation, args.min_time, args.repeats, args.warmup, not args.no_allocations)
+        results.append({"primitive": name, "input": size, **result})
+        peak = f"{result['peak_bytes_per_op']:>14.0f}" if 'peak_bytes_per_op' in result else f"{'-':>14}"
+        blocks = f"{result['retained_blocks_per_op']:>12.2f}" if 'retained_blocks_per_op' in result else f"{'-':>12}"
+        print(f"{name:<36}{size:<18}{result['ops_per_s']:>14.1f}{result['us_per_op']:>14.2f}{peak}{blocks}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"merkle_version": args.merkle_version, "results": results}, f, indent=2)
+        print(f"\nRisultati scritti in '{args.output}'.")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    main()
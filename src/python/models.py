@@ -2,32 +2,141 @@
 """
 Definisce i modelli di dati centralizzati (dataclasses) per il progetto.
 """
-from dataclasses import dataclass, asdict
-from typing import Dict, Any, List
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+import json
+from dataclasses import dataclass, asdict, fields
+from typing import ClassVar, Dict, Any, List, Optional, Set, Tuple, Union, get_args, get_origin
+from utils.canonical import CanonicalEncodable
+from utils.exceptions import ProjectBaseException, WireFormatError
+from utils.signature_suites import PublicKey, RSA_PSS_SHA256
+
+
+class _LazyHexBytes:
+    """
+    Campo bytes di una dataclass che accetta anche la stringa esadecimale
+    letta dal JSON e la decodifica solo al primo accesso.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # Nessun valore di default per la dataclass
+            raise AttributeError(self.name)
+        value = obj.__dict__[self.name]
+        if isinstance(value, str):
+            try:
+                value = bytes.fromhex(value)
+            except ValueError:
+                raise WireFormatError(f"Il campo '{self.name}' non è esadecimale valido.") from None
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+def _fields_from_dict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Seleziona i campi della dataclass dal dizionario (quelli assenti prendono il default)."""
+    if not isinstance(data, dict):
+        raise WireFormatError(f"{cls.__name__}: atteso un oggetto, ricevuto {type(data).__name__}.")
+    return {f.name: data[f.name] for f in fields(cls) if f.name in data}
+
+def _matches(value: Any, annotation: Any) -> bool:
+    """True se value ha il tipo dichiarato da annotation (contenuto di liste e dizionari incluso)."""
+    origin = get_origin(annotation)
+    if annotation is Any:
+        return True
+    if origin is Union:
+        return any(_matches(value, arg) for arg in get_args(annotation))
+    if origin is list:
+        (item_type,) = get_args(annotation) or (Any,)
+        return isinstance(value, list) and all(_matches(item, item_type) for item in value)
+    if origin is dict:
+        key_type, value_type = get_args(annotation) or (Any, Any)
+        return isinstance(value, dict) and all(_matches(k, key_type) and _matches(v, value_type) for k, v in value.items())
+    if annotation is type(None):
+        return value is None
+    if annotation is bytes:
+        # I campi _LazyHexBytes accettano anche l'esadecimale, decodificato al primo accesso
+        return isinstance(value, (bytes, str))
+    if annotation is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, annotation)
+
+def _construct(cls, **kwargs):
+    """Istanzia la dataclass dai campi letti, dopo averne controllato i tipi."""
+    for f in fields(cls):
+        if f.name in kwargs and not _matches(kwargs[f.name], f.type):
+            raise WireFormatError(
+                f"{cls.__name__} non valido: il campo '{f.name}' non può essere di tipo {type(kwargs[f.name]).__name__}."
+            )
+    try:
+        return cls(**kwargs)
+    except TypeError as e:
+        raise WireFormatError(f"{cls.__name__} non valido: {e}") from None
+
+def _loads(data: bytes) -> Dict[str, Any]:
+    try:
+        return json.loads(data)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise WireFormatError(f"JSON non valido: {e}") from None
 
 
 @dataclass(frozen=True)
-class CertificateData:
+class CertificateData(CanonicalEncodable):
     """Dati contenuti all'interno di un certificato, prima della firma."""
     university_id: str
     public_key_pem: str
+    # Suite di firma della chiave certificata (i certificati storici sono RSA-PSS)
+    signature_suite: str = RSA_PSS_SHA256
 
     def to_dict(self) -> Dict[str, Any]:
         """Converte la dataclass in un dizionario."""
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CertificateData":
+        """Ricostruisce i dati del certificato da to_dict()."""
+        return _construct(cls, **_fields_from_dict(cls, data))
+
 @dataclass(frozen=True)
-class Certificate:
+class Certificate(CanonicalEncodable):
     """Rappresenta un certificato completo, con dati e firma dell'autorità."""
     data: CertificateData
-    signature: bytes
+    # Decodificata dall'esadecimale solo al primo accesso (vedi from_dict)
+    signature: bytes = _LazyHexBytes()
     authority_name: str
 
-    def get_public_key(self) -> RSAPublicKey:
-        """Deserializza e restituisce l'oggetto chiave pubblica dall'PEM."""
-        from cryptography.hazmat.primitives import serialization
-        return serialization.load_pem_public_key(self.data.public_key_pem.encode('utf-8'))
+    def get_public_key(self) -> PublicKey:
+        """Deserializza (una sola volta) e restituisce l'oggetto chiave pubblica dall'PEM."""
+        public_key = self.__dict__.get('_public_key')
+        if public_key is None:
+            from cryptography.hazmat.primitives import serialization
+            public_key = serialization.load_pem_public_key(self.data.public_key_pem.encode('utf-8'))
+            object.__setattr__(self, '_public_key', public_key)
+        return public_key
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # La chiave deserializzata non è serializzabile: viene ricaricata dal PEM se serve
+        state = dict(self.__dict__)
+        state.pop('_public_key', None)
+        return state
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Certificate":
+        """
+        Ricostruisce un certificato da to_dict(serializable=True). La firma
+        resta esadecimale e la chiave PEM non viene interpretata finché non servono.
+        """
+        fields_data = _fields_from_dict(cls, data)
+        if 'data' in fields_data:
+            fields_data['data'] = CertificateData.from_dict(fields_data['data'])
+        return _construct(cls, **fields_data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Certificate":
+        """Ricostruisce un certificato dalla sua serializzazione JSON."""
+        return cls.from_dict(_loads(data))
     
     def to_dict(self, serializable: bool = False) -> Dict[str, Any]:
         """
@@ -47,18 +156,96 @@ class Certificate:
         return data
 
 @dataclass(frozen=True)
-class VerifiableCredentialPublicPart:
+class VerifiableCredentialPublicPart(CanonicalEncodable):
     """La parte pubblica e firmabile di una credenziale."""
     credential_id: str
     issuer_id: str
     student_pseudonym: str
     merkle_root: str
     issue_date: str
+    # Le credenziali emesse prima del formato v2 non riportano la versione
+    merkle_version: int = 1
+    signature_suite: str = RSA_PSS_SHA256
+    # Posizione nella lista di stato dell'emittente (solo per le credenziali che la usano)
+    status_list_id: Optional[str] = None
+    status_list_index: Optional[int] = None
+
+    # Assenti dalla codifica canonica quando None: le credenziali già firmate restano valide
+    CANONICAL_OPTIONAL_FIELDS: ClassVar[Tuple[str, ...]] = ('status_list_id', 'status_list_index')
 
     def to_dict(self) -> Dict[str, Any]:
         """Converte la dataclass in un dizionario."""
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VerifiableCredentialPublicPart":
+        """Ricostruisce la parte pubblica da to_dict() (i campi assenti prendono il default storico)."""
+        return _construct(cls, **_fields_from_dict(cls, data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "VerifiableCredentialPublicPart":
+        """Ricostruisce la parte pubblica dalla sua serializzazione JSON."""
+        return cls.from_dict(_loads(data))
+
+@dataclass(frozen=True)
+class CredentialBatchRoot(CanonicalEncodable):
+    """
+    Radice del Merkle Tree costruito sulle parti pubbliche di un batch di credenziali.
+    Nell'emissione a batch è l'unico dato firmato dall'emittente.
+    """
+    issuer_id: str
+    batch_root: str
+    merkle_version: int
+
+@dataclass(frozen=True)
+class StatusListData(CanonicalEncodable):
+    """
+    Contenuto firmato di una lista di stato: un bitstring (bit i = credenziale
+    di indice i revocata, a partire dal bit più significativo del primo byte)
+    compresso con gzip e codificato in base64url.
+    """
+    list_id: str
+    issuer_id: str
+    version: int
+    size: int  # numero di bit
+    encoded_list: str
+    issued_at: str
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatusListData":
+        """Ricostruisce i dati della lista da asdict()."""
+        return _construct(cls, **_fields_from_dict(cls, data))
+
+@dataclass(frozen=True)
+class StatusList:
+    """Lista di stato pubblicata: dati, firma dell'emittente e certificato con cui verificarla."""
+    data: StatusListData
+    signature: bytes = _LazyHexBytes()
+    issuer_certificate: Certificate
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte la lista in un dizionario serializzabile in JSON."""
+        return {
+            "data": asdict(self.data),
+            "signature": self.signature.hex(),
+            "issuer_certificate": self.issuer_certificate.to_dict(serializable=True)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatusList":
+        """Ricostruisce la lista da to_dict(). Solleva WireFormatError se la struttura non è valida."""
+        fields_data = _fields_from_dict(cls, data)
+        if 'data' in fields_data:
+            fields_data['data'] = StatusListData.from_dict(fields_data['data'])
+        if 'issuer_certificate' in fields_data:
+            fields_data['issuer_certificate'] = Certificate.from_dict(fields_data['issuer_certificate'])
+        return _construct(cls, **fields_data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StatusList":
+        """Ricostruisce la lista dalla sua serializzazione JSON."""
+        return cls.from_dict(_loads(data))
+
 @dataclass(frozen=True)
 class VerifiablePresentation:
     """Rappresenta una presentazione selettiva creata da uno studente per un verificatore."""
@@ -67,7 +254,10 @@ class VerifiablePresentation:
     merkle_proof: List[Dict[str, str]]
     original_credential_public_part: VerifiableCredentialPublicPart
     issuer_certificate: Certificate
-    credential_signature: bytes
+    credential_signature: bytes = _LazyHexBytes()
+    # Solo per credenziali emesse a batch: la firma copre la radice del batch
+    batch_root: Optional[str] = None
+    batch_proof: Optional[List[Dict[str, str]]] = None
 
     def to_dict(self, serializable: bool = False) -> Dict[str, Any]:
         """
@@ -87,6 +277,117 @@ class VerifiablePresentation:
             "original_credential_public_part": self.original_credential_public_part.to_dict(),
             "issuer_certificate": self.issuer_certificate.to_dict(serializable=True),
             # Converte i bytes della firma in esadecimale
-            "credential_signature": self.credential_signature.hex()
+            "credential_signature": self.credential_signature.hex(),
+            "batch_root": self.batch_root,
+            "batch_proof": self.batch_proof
         }
-        return data
\ No newline at end of file
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VerifiablePresentation":
+        """
+        Ricostruisce una presentazione da to_dict(serializable=True).
+        I campi costosi (firme esadecimali, chiave PEM dell'emittente) vengono
+        decodificati solo al primo accesso, così un verificatore può scartare
+        presentazioni di enti non fidati o revocate prima di interpretarli.
+        Solleva WireFormatError se la struttura non è valida.
+        """
+        return _construct(cls, **_presentation_fields_from_dict(cls, data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "VerifiablePresentation":
+        """Ricostruisce una presentazione dalla sua serializzazione JSON."""
+        return cls.from_dict(_loads(data))
+
+def _presentation_fields_from_dict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Campi comuni delle presentazioni, con le dataclass annidate ricostruite."""
+    fields_data = _fields_from_dict(cls, data)
+    if 'original_credential_public_part' in fields_data:
+        fields_data['original_credential_public_part'] = VerifiableCredentialPublicPart.from_dict(
+            fields_data['original_credential_public_part']
+        )
+    if 'issuer_certificate' in fields_data:
+        fields_data['issuer_certificate'] = Certificate.from_dict(fields_data['issuer_certificate'])
+    return fields_data
+
+@dataclass(frozen=True)
+class MultiCoursePresentation:
+    """Presentazione selettiva di più corsi della stessa credenziale, con una sola Merkle multiproof."""
+    type: str
+    presented_courses: List[Dict[str, Any]]
+    merkle_multiproof: Dict[str, Any]
+    original_credential_public_part: VerifiableCredentialPublicPart
+    issuer_certificate: Certificate
+    credential_signature: bytes = _LazyHexBytes()
+    batch_root: Optional[str] = None
+    batch_proof: Optional[List[Dict[str, str]]] = None
+
+    def to_dict(self, serializable: bool = False) -> Dict[str, Any]:
+        """Converte la dataclass in un dizionario (vedi VerifiablePresentation.to_dict)."""
+        if not serializable:
+            return asdict(self)
+
+        return {
+            "type": self.type,
+            "presented_courses": self.presented_courses,
+            "merkle_multiproof": self.merkle_multiproof,
+            "original_credential_public_part": self.original_credential_public_part.to_dict(),
+            "issuer_certificate": self.issuer_certificate.to_dict(serializable=True),
+            "credential_signature": self.credential_signature.hex(),
+            "batch_root": self.batch_root,
+            "batch_proof": self.batch_proof
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MultiCoursePresentation":
+        """Ricostruisce la presentazione da to_dict(serializable=True) (vedi VerifiablePresentation.from_dict)."""
+        return _construct(cls, **_presentation_fields_from_dict(cls, data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MultiCoursePresentation":
+        """Ricostruisce la presentazione dalla sua serializzazione JSON."""
+        return cls.from_dict(_loads(data))
+
+# Qualsiasi presentazione accettata dal verificatore
+Presentation = Union[VerifiablePresentation, MultiCoursePresentation]
+
+@dataclass(frozen=True)
+class VerificationResult:
+    """Esito della verifica di una singola presentazione all'interno di un batch."""
+    presentation: Presentation
+    error: Optional[ProjectBaseException] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """True se tutti i controlli sono stati superati."""
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class IssuanceReport:
+    """Riepilogo di un'emissione in blocco di credenziali."""
+    issued: int
+    elapsed_seconds: float
+
+    @property
+    def credentials_per_second(self) -> float:
+        """Throughput dell'emissione."""
+        return self.issued / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class RevocationDelta:
+    """Revoche aggiunte al registro dopo un'epoca (numero di revoche già note al consumatore)."""
+    since: int
+    epoch: int
+    revoked_ids: List[str]
+    generation: int = 0
+    # Il registro è stato svuotato o sostituito: lo stato locale va ricostruito da zero
+    reset: bool = False
+
+    def apply_to(self, revoked: Set[str]) -> Set[str]:
+        """Applica il delta a un insieme di ID revocati, in O(delta) salvo reset."""
+        if self.reset:
+            revoked.clear()
+        revoked.update(self.revoked_ids)
+        return revoked
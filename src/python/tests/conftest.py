@@ -0,0 +1,50 @@
+# src/python/tests/conftest.py
+"""
+Fixture comuni dei test. Gli attori usano chiavi Ed25519, la cui generazione
+è istantanea, e il registro di revoca vive in una cartella temporanea.
+"""
+import pytest
+
+from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from IssuingUniversity.issuing_university import IssuingUniversity
+from Revocation.revocation import RevocationRegistry
+from Student.wallet import StudentWallet
+from VerifyingUniversity.verifying_university import VerifyingUniversity
+from utils.signature_suites import ED25519
+
+COURSES = [
+    {"id": 1, "nome": "Algoritmi e Protocolli per la Sicurezza", "voto": 30, "cfu": 9, "data": "2024-06-18"},
+    {"id": 2, "nome": "Sistemi Distribuiti", "voto": 28, "cfu": 6, "data": "2024-05-20"},
+    {"id": 3, "nome": "Letteratura Francese", "voto": 25, "cfu": 6, "data": "2024-06-10"},
+]
+
+
+@pytest.fixture
+def authority() -> AccreditationAuthority:
+    return AccreditationAuthority("EU-Accreditation-Body", signature_suite=ED25519)
+
+@pytest.fixture
+def issuer(authority) -> IssuingUniversity:
+    return IssuingUniversity("Université de Rennes", authority, signature_suite=ED25519)
+
+@pytest.fixture
+def verifier(authority) -> VerifyingUniversity:
+    verifier = VerifyingUniversity("Università di Salerno")
+    verifier.add_trusted_authority(authority)
+    return verifier
+
+@pytest.fixture
+def wallet() -> StudentWallet:
+    return StudentWallet("Francesco Monda", signature_suite=ED25519)
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = RevocationRegistry(str(tmp_path / 'revocation_list.json'))
+    yield registry
+    registry.close()
+
+
+def issue(issuer: IssuingUniversity, wallet: StudentWallet, courses=COURSES) -> str:
+    """Emette una credenziale nel wallet e ne restituisce l'ID."""
+    issuer.issue_credential(wallet, courses)
+    return next(reversed(list(wallet.credentials)))
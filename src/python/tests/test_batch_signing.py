@@ -0,0 +1,56 @@
+# src/python/tests/test_batch_signing.py
+import dataclasses
+
+import pytest
+
+from Student.wallet import StudentWallet
+from utils.exceptions import SignatureVerificationError
+from utils.signature_suites import ED25519
+
+from .conftest import COURSES
+
+
+@pytest.fixture
+def batch_wallets(issuer):
+    wallets = [StudentWallet(f"Studente {i}", signature_suite=ED25519) for i in range(5)]
+    report = issuer.issue_credentials(((w, COURSES) for w in wallets), batch_signing=True, signing_batch_size=4)
+    assert report.issued == 5
+    return wallets
+
+
+def _presentation(wallet: StudentWallet, course_id: int = 1):
+    return wallet.create_selective_presentation(next(iter(wallet.credentials)), course_id)
+
+
+def test_one_signature_per_signing_batch(batch_wallets):
+    credentials = [next(iter(w.credentials.values())) for w in batch_wallets]
+    assert len({c.signature for c in credentials[:4]}) == 1
+    assert len({c.batch_root for c in credentials[:4]}) == 1
+    assert credentials[4].batch_root != credentials[0].batch_root
+
+
+def test_batch_signed_presentations_verify(batch_wallets, verifier, registry):
+    results = verifier.verify_presentations([_presentation(w) for w in batch_wallets], registry, max_workers=1)
+    assert all(r.is_valid for r in results)
+    assert verifier.verify_presentation(_presentation(batch_wallets[0], 3), registry)
+
+
+def test_public_part_outside_the_signed_batch_is_rejected(batch_wallets, verifier, registry):
+    first, last = _presentation(batch_wallets[0]), _presentation(batch_wallets[4])
+    # Prova di un'altra credenziale: la parte pubblica non appartiene alla radice firmata
+    swapped = dataclasses.replace(first, batch_proof=_presentation(batch_wallets[1]).batch_proof)
+    with pytest.raises(SignatureVerificationError):
+        verifier.verify_presentation(swapped, registry)
+    # Radice di un altro batch con la firma del primo
+    foreign_root = dataclasses.replace(last, credential_signature=first.credential_signature)
+    with pytest.raises(SignatureVerificationError):
+        verifier.verify_presentation(foreign_root, registry)
+
+
+def test_verified_root_is_not_trusted_with_another_signature(batch_wallets, verifier, registry):
+    presentation = _presentation(batch_wallets[0])
+    assert verifier.verify_presentation(presentation, registry)
+    forged = dataclasses.replace(presentation, credential_signature=bytes(64))
+    results = verifier.verify_presentations([presentation, forged], registry, max_workers=1)
+    assert results[0].is_valid
+    assert isinstance(results[1].error, SignatureVerificationError)
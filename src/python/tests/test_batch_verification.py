@@ -0,0 +1,36 @@
+# src/python/tests/test_batch_verification.py
+import dataclasses
+
+from models import CertificateData
+from utils.exceptions import SignatureVerificationError
+from VerifyingUniversity.verifying_university import _verify_credential_signature_job
+
+from .conftest import issue
+
+
+def test_signature_job_reports_malformed_inputs(issuer, wallet):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    public_part = presentation.original_credential_public_part
+    pem = presentation.issuer_certificate.data.public_key_pem
+    suite = presentation.issuer_certificate.data.signature_suite
+
+    assert _verify_credential_signature_job(pem, suite, presentation.credential_signature, public_part) is None
+    for job in [
+        ('-----BEGIN PUBLIC KEY-----\nnot a key\n-----END PUBLIC KEY-----\n', suite, presentation.credential_signature),
+        (pem, suite, 12345),
+        (pem, 'unknown-suite', presentation.credential_signature),
+    ]:
+        assert isinstance(_verify_credential_signature_job(*job, public_part), SignatureVerificationError)
+
+
+def test_malformed_key_fails_only_its_presentation(issuer, verifier, wallet, registry):
+    presentations = [wallet.create_selective_presentation(issue(issuer, wallet), 1) for _ in range(3)]
+    certificate = presentations[1].issuer_certificate
+    # Certificato con una chiave illeggibile ma (per il test) già in cache come verificato
+    broken = dataclasses.replace(certificate, data=dataclasses.replace(certificate.data, public_key_pem='garbage'))
+    verifier.certificate_cache.put(broken, certificate.get_public_key())
+    presentations[1] = dataclasses.replace(presentations[1], issuer_certificate=broken)
+
+    results = verifier.verify_presentations(presentations, registry, max_workers=1)
+    assert [r.is_valid for r in results] == [True, False, True]
+    assert isinstance(results[1].error, SignatureVerificationError)
@@ -0,0 +1,66 @@
+# src/python/tests/test_canonical.py
+import dataclasses
+import hashlib
+import json
+
+from models import VerifiableCredentialPublicPart
+from utils import canonical
+from utils.canonical import canonical_bytes
+from utils.crypto_utils import hash_data, sign_data, verify_signature
+
+from .conftest import COURSES
+
+
+def _public_part(**changes) -> VerifiableCredentialPublicPart:
+    public_part = VerifiableCredentialPublicPart(
+        credential_id="6f1c1f0e-3f7b-4c55-9a35-6f3f0d2b9c11",
+        issuer_id="Université de Rennes",
+        student_pseudonym="ab" * 32,
+        merkle_root="cd" * 32,
+        issue_date="2024-06-18T10:00:00",
+    )
+    return dataclasses.replace(public_part, **changes)
+
+
+def test_plain_data_keeps_the_historical_leaf_encoding():
+    # Stessa serializzazione delle foglie v1 originali: le radici già emesse restano valide
+    for course in COURSES:
+        expected = json.dumps(course, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        assert canonical_bytes(course) == expected
+        assert hash_data(course) == hashlib.sha256(expected).hexdigest()
+    assert canonical_bytes(b'\x00raw') == b'\x00raw'
+    assert canonical_bytes({"firma": b'\x01\xff'}) == b'{"firma":"01ff"}'
+
+
+def test_encoding_does_not_depend_on_field_or_key_order():
+    shuffled = dict(reversed(list(COURSES[0].items())))
+    assert canonical_bytes(shuffled) == canonical_bytes(COURSES[0])
+    assert hash_data(_public_part()) == hash_data(_public_part())
+
+
+def test_optional_fields_left_unset_do_not_change_the_bytes():
+    encoded = json.loads(canonical_bytes(_public_part()))
+    assert 'status_list_id' not in encoded and 'status_list_index' not in encoded
+    with_status = json.loads(canonical_bytes(_public_part(status_list_id="rennes/status/1", status_list_index=7)))
+    assert with_status == dict(encoded, status_list_id="rennes/status/1", status_list_index=7)
+
+
+def test_frozen_models_encode_once(issuer, monkeypatch):
+    calls = []
+    encode = canonical._ENCODER.encode
+
+    def counting_encode(obj):
+        calls.append(obj)
+        return encode(obj)
+
+    monkeypatch.setattr(canonical._ENCODER, 'encode', counting_encode)
+    public_part = _public_part()
+    first = canonical_bytes(public_part)
+    signature = sign_data(issuer.private_key, public_part)
+    verify_signature(issuer.public_key, signature, public_part)
+    hash_data(public_part)
+    assert canonical_bytes(public_part) is first
+    assert len(calls) == 1
+
+    # Anche il certificato dell'emittente memoizza i propri byte
+    assert canonical_bytes(issuer.certificate) is canonical_bytes(issuer.certificate)
@@ -0,0 +1,66 @@
+# src/python/tests/test_certificate_cache.py
+import pytest
+
+from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from utils.exceptions import SignatureVerificationError
+from utils.signature_suites import ED25519, get_suite
+from VerifyingUniversity import certificate_cache
+from VerifyingUniversity.certificate_cache import VerifiedCertificateCache
+
+from .conftest import issue
+
+
+def _certificate(authority: AccreditationAuthority, university_id: str):
+    _, public_key = get_suite(ED25519).generate_keys()
+    return authority.certify_university(university_id, public_key), public_key
+
+
+def test_entries_expire_after_the_ttl(authority, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(certificate_cache.time, 'monotonic', lambda: now[0])
+    cache = VerifiedCertificateCache(ttl=60)
+    certificate, public_key = _certificate(authority, "Université de Rennes")
+    cache.put(certificate, public_key)
+
+    now[0] += 59
+    assert cache.get(certificate) is public_key
+    assert cache.get_certificate(cache.certificate_digest(certificate)) == certificate
+    now[0] += 2
+    assert cache.get(certificate) is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(authority):
+    cache = VerifiedCertificateCache(maxsize=2, ttl=None)
+    entries = [_certificate(authority, f"Università {i}") for i in range(3)]
+    cache.put(*entries[0])
+    cache.put(*entries[1])
+    assert cache.get(entries[0][0]) is not None  # la prima torna la più recente
+    cache.put(*entries[2])
+    assert cache.get(entries[1][0]) is None
+    assert cache.get(entries[0][0]) is not None and cache.get(entries[2][0]) is not None
+
+
+def test_invalidate_authority_drops_only_its_certificates(authority):
+    other = AccreditationAuthority("Other-Accreditation-Body", signature_suite=ED25519)
+    cache = VerifiedCertificateCache(ttl=None)
+    cache.put(*_certificate(authority, "Université de Rennes"))
+    cache.put(*_certificate(authority, "Universidad de Sevilla"))
+    kept, kept_key = _certificate(other, "Universität Wien")
+    cache.put(kept, kept_key)
+
+    assert cache.invalidate_authority(authority.name) == 2
+    assert len(cache) == 1 and cache.get(kept) is kept_key
+
+
+def test_replacing_an_authority_key_forces_reverification(authority, issuer, verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    assert verifier.verify_presentation(presentation, registry)
+    assert len(verifier.certificate_cache) == 1
+
+    # Stesso nome, chiave diversa: il certificato in cache non deve essere riusato
+    verifier.add_trusted_authority(AccreditationAuthority(authority.name, signature_suite=ED25519))
+    assert len(verifier.certificate_cache) == 0
+    with pytest.raises(SignatureVerificationError):
+        verifier.verify_presentation(presentation, registry)
@@ -0,0 +1,48 @@
+# src/python/tests/test_issuance.py
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from .conftest import COURSES
+
+
+class _RecordingWallet:
+    """Wallet che annota quanti elementi del batch erano stati letti a ogni consegna."""
+
+    def __init__(self, consumed):
+        self.pseudonym = 'recording'
+        self.consumed = consumed
+        self.deliveries = []
+
+    def receive_credential(self, credential):
+        self.deliveries.append(len(self.consumed))
+
+
+def test_sequential_issuance_consumes_the_batch_lazily(issuer):
+    consumed = []
+    wallet = _RecordingWallet(consumed)
+
+    def batch():
+        for i in range(40):
+            consumed.append(i)
+            yield wallet, COURSES
+
+    report = issuer.issue_credentials(batch(), max_workers=1)
+    assert report.issued == 40
+    # Le consegne iniziano prima che il batch sia letto per intero
+    assert wallet.deliveries[0] < 40
+
+
+def test_issuance_rejects_non_positive_sizes(issuer):
+    with pytest.raises(ValueError):
+        issuer.issue_credentials([(None, COURSES)], queue_size=0)
+    with pytest.raises(ValueError):
+        issuer.issue_credentials([(None, COURSES)], batch_signing=True, signing_batch_size=0)
+
+
+def test_parallel_issuance_accepts_a_plain_process_pool(issuer, verifier, wallet, registry):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        report = issuer.issue_credentials([(wallet, COURSES)] * 20, executor=pool, queue_size=4)
+    assert report.issued == 20
+    presentations = [wallet.create_selective_presentation(i, 1) for i in issuer.issued_credential_ids]
+    assert all(result.is_valid for result in verifier.verify_presentations(presentations, registry, max_workers=1))
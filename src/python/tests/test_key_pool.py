@@ -0,0 +1,58 @@
+# src/python/tests/test_key_pool.py
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from utils.key_pool import KeyPool
+from utils.signature_suites import ECDSA_P256_SHA256, ED25519
+
+
+def _persisted_pool(path, count: int):
+    """Salva count chiavi Ed25519 cifrate nel file path."""
+    pool = KeyPool(ED25519, size=count, persist_path=path, password=b'secret')
+    pool.start()
+    assert pool.wait_until_full(timeout=30)
+    pool.close()
+
+
+def test_wrong_password_leaves_the_saved_keys_in_place(tmp_path):
+    path = str(tmp_path / 'keys.pem')
+    _persisted_pool(path, 3)
+    with open(path, 'rb') as f:
+        saved = f.read()
+
+    with pytest.raises(ValueError):
+        KeyPool(ED25519, size=3, persist_path=path, password=b'wrong')
+    with open(path, 'rb') as f:
+        assert f.read() == saved
+    assert len(KeyPool(ED25519, size=3, persist_path=path, password=b'secret')) == 3
+
+
+def test_keys_beyond_the_pool_size_are_kept_for_the_next_start(tmp_path):
+    path = str(tmp_path / 'keys.pem')
+    _persisted_pool(path, 5)
+
+    small = KeyPool(ED25519, size=2, persist_path=path, password=b'secret')
+    assert len(small) == 2
+    first = {small.acquire()[1].public_bytes_raw()}
+    # Alla chiusura le chiavi rimaste nel file non vengono sovrascritte
+    small.close()
+    rest = KeyPool(ED25519, size=10, persist_path=path, password=b'secret')
+    assert len(rest) == 4
+
+    # Nessuna chiave viene consegnata due volte
+    second = {rest.acquire()[1].public_bytes_raw() for _ in range(4)}
+    assert len(first | second) == 5
+
+
+def test_keys_of_another_suite_are_not_handed_out(tmp_path):
+    path = str(tmp_path / 'keys.pem')
+    _persisted_pool(path, 2)
+
+    ecdsa = KeyPool(ECDSA_P256_SHA256, size=4, persist_path=path, password=b'secret')
+    assert len(ecdsa) == 0
+    assert isinstance(ecdsa.acquire()[0], ec.EllipticCurvePrivateKey)
+    ecdsa.close()
+
+    # Le chiavi Ed25519 restano nel file per il pool della loro suite
+    ed25519_pool = KeyPool(ED25519, size=4, persist_path=path, password=b'secret')
+    assert len(ed25519_pool) == 2
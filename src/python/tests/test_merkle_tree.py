@@ -0,0 +1,78 @@
+# src/python/tests/test_merkle_tree.py
+import pytest
+
+from utils.crypto_utils import hash_data
+from utils.merkle_tree import DIGEST_SIZE, MerkleTree
+
+
+def _leaves(count: int):
+    return [{"id": i, "voto": 18 + i % 13} for i in range(count)]
+
+
+def _original_root_and_proofs(data):
+    """Radice e prove calcolate come il MerkleTree originale (ricorsivo, su stringhe esadecimali)."""
+    leaves = [hash_data(d) for d in data]
+    proofs = []
+    for idx in range(len(leaves)):
+        proof, level = [], leaves[:]
+        while len(level) > 1:
+            if len(level) % 2 == 1:
+                level.append(level[-1])
+            if idx % 2 == 0:
+                proof.append({'hash': level[idx + 1], 'position': 'right'})
+            else:
+                proof.append({'hash': level[idx - 1], 'position': 'left'})
+            level = [hash_data(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+            idx //= 2
+        proofs.append(proof)
+    level = leaves[:]
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level.append(level[-1])
+        level = [hash_data(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0], proofs
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 4, 5, 7, 8, 13, 16, 17])
+def test_flat_v1_levels_match_the_original_tree(count):
+    data = _leaves(count)
+    tree = MerkleTree(data, version=1)
+    root, proofs = _original_root_and_proofs(data)
+    assert tree.root == root
+    assert [tree.get_proof(d) for d in data] == proofs
+
+    # Un bytearray contiguo per livello, dimezzato (per eccesso) a ogni passo
+    sizes = [len(level) // DIGEST_SIZE for level in tree.levels]
+    assert all(isinstance(level, bytearray) and len(level) % DIGEST_SIZE == 0 for level in tree.levels)
+    assert sizes[0] == count and sizes[-1] == 1
+    assert all(nxt == (size + 1) // 2 for size, nxt in zip(sizes, sizes[1:]))
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_tree_rebuilt_from_levels_serves_the_same_proofs(version):
+    data = _leaves(11)
+    tree = MerkleTree(data, version=version)
+    rebuilt = MerkleTree.from_levels(data, [bytearray(level) for level in tree.levels], version)
+    assert rebuilt.root == tree.root and rebuilt.leaves == tree.leaves
+    assert all(rebuilt.get_proof(d) == tree.get_proof(d) for d in data)
+    assert tree.get_proof({"id": 99}) is None
+    assert MerkleTree([], version=version).root is None
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_malformed_proofs_are_rejected_without_raising(version):
+    data = _leaves(5)
+    tree = MerkleTree(data, version=version)
+    proof = tree.get_proof(data[2])
+    assert MerkleTree.verify_proof(data[2], proof, tree.root, version)
+
+    malformed = [
+        [{'position': proof[0]['position']}] + proof[1:],
+        [dict(proof[0], hash=42)] + proof[1:],
+        [dict(proof[0], hash=b'\x00' * 32)] + proof[1:],
+        [dict(proof[0], position='middle')] + proof[1:],
+        ['not-a-step'] + proof[1:],
+        None,
+    ]
+    for bad_proof in malformed:
+        assert not MerkleTree.verify_proof(data[2], bad_proof, tree.root, version)
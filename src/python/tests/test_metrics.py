@@ -0,0 +1,115 @@
+# src/python/tests/test_metrics.py
+import contextlib
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import metrics
+from utils.exceptions import CredentialRevokedError
+from utils.metrics import MetricsRegistry, span, start_prometheus_server, write_prometheus_file
+from VerifyingUniversity.verifying_university import VerifyingUniversity
+
+from .conftest import issue
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    registry.counter('aps_requests_total', 'Richieste ricevute.', ('path',)).inc(2, path='/verify "v1"')
+    registry.gauge('aps_queue_depth', 'Richieste in coda.').set(1.5)
+    histogram = registry.histogram('aps_latency_seconds', 'Latenza.', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert registry.render_prometheus() == '\n'.join([
+        '# HELP aps_latency_seconds Latenza.',
+        '# TYPE aps_latency_seconds histogram',
+        'aps_latency_seconds_bucket{le="0.1"} 2',
+        'aps_latency_seconds_bucket{le="1"} 3',
+        'aps_latency_seconds_bucket{le="+Inf"} 4',
+        'aps_latency_seconds_sum 3.65',
+        'aps_latency_seconds_count 4',
+        '# HELP aps_queue_depth Richieste in coda.',
+        '# TYPE aps_queue_depth gauge',
+        'aps_queue_depth 1.5',
+        '# HELP aps_requests_total Richieste ricevute.',
+        '# TYPE aps_requests_total counter',
+        'aps_requests_total{path="/verify \\"v1\\""} 2',
+    ]) + '\n'
+
+
+def test_labels_and_registrations_are_checked():
+    registry = MetricsRegistry()
+    counter = registry.counter('aps_events_total', 'Eventi.', ('kind',))
+    assert registry.counter('aps_events_total', 'Eventi.', ('kind',)) is counter
+    with pytest.raises(ValueError):
+        counter.inc(kind='a', extra='b')
+    with pytest.raises(ValueError):
+        registry.gauge('aps_events_total', 'Eventi.', ('kind',))
+    with pytest.raises(ValueError):
+        registry.counter('aps_events_total', 'Eventi.', ('other',))
+
+
+def test_verifier_counts_outcomes_and_exceptions(authority, issuer, wallet, registry):
+    metrics_registry = MetricsRegistry()
+    verifier = VerifyingUniversity("Università di Salerno", metrics=metrics_registry)
+    verifier.add_trusted_authority(authority)
+    valid_id, revoked_id = issue(issuer, wallet), issue(issuer, wallet)
+    issuer.revoke_credential(registry, revoked_id)
+
+    verifier.verify_presentation(wallet.create_selective_presentation(valid_id, 1), registry)
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(wallet.create_selective_presentation(revoked_id, 1), registry)
+
+    verifications = metrics_registry.get('aps_verifications_total')
+    assert verifications.value(verifier=verifier.id, outcome='valid') == 1
+    assert verifications.value(verifier=verifier.id, outcome='invalid') == 1
+    exceptions = metrics_registry.get('aps_verification_exceptions_total')
+    assert exceptions.value(verifier=verifier.id, exception='CredentialRevokedError') == 1
+    assert exceptions.value(verifier=verifier.id, exception='MerkleProofError') == 0
+    checks = metrics_registry.get('aps_verification_check_seconds')
+    assert checks.count(verifier=verifier.id, check='credential_signature') == 1
+    assert checks.count(verifier=verifier.id, check='revocation') == 2
+    # Le serie a zero sono esposte prima del primo fallimento
+    assert 'exception="MerkleProofError"} 0' in metrics_registry.render_prometheus()
+
+
+def test_exporters_serve_the_registry(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter('aps_exported_total', 'Esportazioni.').inc()
+    path = str(tmp_path / 'metrics.prom')
+    write_prometheus_file(path, registry)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == registry.render_prometheus()
+
+    server = start_prometheus_server(0, registry=registry)
+    try:
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(base + '/metrics') as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert response.read().decode('utf-8') == registry.render_prometheus()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + '/other')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_spans_reach_the_installed_tracer():
+    spans = []
+
+    @contextlib.contextmanager
+    def start_span(name, attributes=None):
+        spans.append((name, attributes))
+        yield
+
+    assert not metrics.tracing_enabled()
+    with span('not.traced'):
+        pass
+    metrics.install_tracer(start_span)
+    try:
+        with span('verification.revocation', check='revocation'):
+            pass
+    finally:
+        metrics.install_tracer(None)
+    assert spans == [('verification.revocation', {'check': 'revocation'})]
@@ -0,0 +1,60 @@
+# src/python/tests/test_models.py
+import json
+
+import pytest
+
+from models import Certificate, VerifiableCredentialPublicPart, VerifiablePresentation
+from utils.exceptions import WireFormatError
+
+from .conftest import issue
+
+
+@pytest.fixture
+def presentation_dict(issuer, wallet):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 2)
+    return presentation.to_dict(serializable=True)
+
+
+def test_from_bytes_round_trip(presentation_dict, verifier, registry):
+    presentation = VerifiablePresentation.from_bytes(json.dumps(presentation_dict).encode('utf-8'))
+    assert presentation.to_dict(serializable=True) == presentation_dict
+    assert verifier.verify_presentation(presentation, registry)
+
+
+@pytest.mark.parametrize('path, value', [
+    (('credential_signature',), 42),
+    (('presented_course',), ['not', 'a', 'dict']),
+    (('merkle_proof',), [1, 2]),
+    (('batch_root',), 7),
+    (('original_credential_public_part', 'merkle_version'), '2'),
+    (('original_credential_public_part', 'merkle_version'), True),
+    (('original_credential_public_part', 'status_list_index'), 1.5),
+    (('issuer_certificate', 'signature'), None),
+    (('issuer_certificate', 'data', 'university_id'), ['Université de Rennes']),
+])
+def test_from_dict_rejects_fields_of_the_wrong_type(presentation_dict, path, value):
+    target = presentation_dict
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    with pytest.raises(WireFormatError):
+        VerifiablePresentation.from_dict(presentation_dict)
+
+
+def test_from_dict_rejects_non_objects():
+    with pytest.raises(WireFormatError):
+        Certificate.from_dict(['not', 'an', 'object'])
+    with pytest.raises(WireFormatError):
+        VerifiableCredentialPublicPart.from_bytes(b'{not json')
+
+
+def test_invalid_hex_is_reported_per_presentation(presentation_dict, verifier, registry):
+    valid = VerifiablePresentation.from_dict(presentation_dict)
+    presentation_dict['issuer_certificate']['signature'] = 'zz'
+    bad_certificate = VerifiablePresentation.from_dict(presentation_dict)
+
+    results = verifier.verify_presentations([valid, bad_certificate, valid], registry, max_workers=1)
+    assert [r.is_valid for r in results] == [True, False, True]
+    assert isinstance(results[1].error, WireFormatError)
+    with pytest.raises(WireFormatError):
+        verifier.verify_presentation(bad_certificate, registry)
@@ -0,0 +1,65 @@
+# src/python/tests/test_multiproof.py
+import dataclasses
+import itertools
+
+import pytest
+
+from utils.exceptions import MerkleProofError
+from utils.merkle_tree import MerkleTree
+
+from .conftest import issue
+
+
+def _leaves(count: int):
+    return [{"id": i, "voto": 18 + i % 13} for i in range(count)]
+
+
+@pytest.mark.parametrize('version', [1, 2])
+@pytest.mark.parametrize('count', [1, 2, 3, 5, 8])
+def test_every_subset_verifies(version, count):
+    data = _leaves(count)
+    tree = MerkleTree(data, version=version)
+    for size in range(1, count + 1):
+        for subset in itertools.combinations(data, size):
+            proof = tree.get_multiproof(subset)
+            assert MerkleTree.verify_multiproof(subset, proof, tree.root, version)
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_altered_multiproofs_are_rejected(version):
+    data = _leaves(7)
+    tree = MerkleTree(data, version=version)
+    subset = [data[1], data[4]]
+    proof = tree.get_multiproof(subset)
+
+    assert not MerkleTree.verify_multiproof([data[1], data[5]], proof, tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, proof, MerkleTree(data[:6], version=version).root, version)
+    assert not MerkleTree.verify_multiproof(subset, dict(proof, hashes=proof['hashes'][:-1]), tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, dict(proof, hashes=proof['hashes'] + [proof['hashes'][0]]), tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, dict(proof, leaf_count=4), tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, dict(proof, indices=[1, 1]), tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, {'indices': 'x'}, tree.root, version)
+    assert not MerkleTree.verify_multiproof(subset, proof, tree.root, 3)
+    with pytest.raises(ValueError):
+        tree.get_multiproof([data[1], data[1]])
+
+
+def test_v2_multiproof_cannot_present_an_inner_node_as_a_leaf():
+    tree = MerkleTree(_leaves(4), version=2)
+    inner = {'hash': tree.levels[1][:32].hex()}
+    assert tree.get_multiproof([inner]) is None
+    forged = {'indices': [0], 'leaf_count': 2, 'hashes': [tree.levels[1][32:64].hex()]}
+    assert not MerkleTree.verify_multiproof([inner], forged, tree.root, 2)
+
+
+def test_multi_course_presentation(issuer, verifier, wallet, registry):
+    credential_id = issue(issuer, wallet)
+    presentation = wallet.create_multi_course_presentation(credential_id, [3, 1])
+    assert [c['id'] for c in presentation.presented_courses] == [3, 1]
+    assert verifier.verify_presentation(presentation, registry)
+    assert verifier.verify_presentations([presentation], registry)[0].is_valid
+
+    courses = [dict(presentation.presented_courses[0], voto=30), presentation.presented_courses[1]]
+    tampered = dataclasses.replace(presentation, presented_courses=courses)
+    with pytest.raises(MerkleProofError):
+        verifier.verify_presentation(tampered, registry)
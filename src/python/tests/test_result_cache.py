@@ -0,0 +1,66 @@
+# src/python/tests/test_result_cache.py
+import dataclasses
+import time
+
+import pytest
+
+from utils.exceptions import CredentialRevokedError, MerkleProofError, UntrustedAuthorityError
+from VerifyingUniversity.result_cache import VerificationResultCache
+from VerifyingUniversity.verifying_university import VerifyingUniversity
+
+from .conftest import issue
+
+
+@pytest.fixture
+def cached_verifier(authority) -> VerifyingUniversity:
+    verifier = VerifyingUniversity("Università di Salerno", result_cache=VerificationResultCache())
+    verifier.add_trusted_authority(authority)
+    return verifier
+
+
+def test_repeated_presentation_hits_the_cache(issuer, cached_verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    assert cached_verifier.verify_presentation(presentation, registry)
+    assert cached_verifier.verify_presentation(presentation, registry)
+    assert list(cached_verifier.last_report.timings) == ['revocation']
+    assert cached_verifier.result_cache.stats()['hits'] == 1
+
+
+def test_failed_or_altered_presentations_are_not_cached(issuer, cached_verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    cached_verifier.verify_presentation(presentation, registry)
+    tampered = dataclasses.replace(presentation, presented_course=dict(presentation.presented_course, voto=18))
+    with pytest.raises(MerkleProofError):
+        cached_verifier.verify_presentation(tampered, registry)
+    assert len(cached_verifier.result_cache) == 1
+
+
+def test_revocation_invalidates_and_is_still_enforced(issuer, cached_verifier, wallet, registry):
+    credential_id = issue(issuer, wallet)
+    presentation = wallet.create_selective_presentation(credential_id, 1)
+    cached_verifier.verify_presentation(presentation, registry)
+    issuer.revoke_credential(registry, credential_id)
+    assert len(cached_verifier.result_cache) == 0
+    with pytest.raises(CredentialRevokedError):
+        cached_verifier.verify_presentation(presentation, registry)
+
+
+def test_removing_an_authority_invalidates_its_entries(authority, issuer, cached_verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    cached_verifier.verify_presentations([presentation], registry)
+    assert len(cached_verifier.result_cache) == 1
+    cached_verifier.remove_trusted_authority(authority.name)
+    assert len(cached_verifier.result_cache) == 0
+    with pytest.raises(UntrustedAuthorityError):
+        cached_verifier.verify_presentation(presentation, registry)
+
+
+def test_entries_expire_after_the_ttl(issuer, wallet):
+    cache = VerificationResultCache(ttl=0.01)
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    digest = cache.presentation_digest(presentation)
+    cache.put(digest, presentation)
+    assert cache.contains(digest)
+    time.sleep(0.02)
+    assert not cache.contains(digest)
+    assert VerificationResultCache().ttl is None
@@ -0,0 +1,99 @@
+# src/python/tests/test_revocation_epochs.py
+import pytest
+
+from Revocation.revocation import RevocationRegistry
+from utils.exceptions import CredentialRevokedError
+
+from .conftest import issue
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / 'revocation_list.json')
+
+
+def _ids(start: int, stop: int):
+    return [f"credential-{i}" for i in range(start, stop)]
+
+
+def test_deltas_are_stable_across_compaction_and_reopening(path):
+    registry = RevocationRegistry(path, compaction_threshold=3)
+    for credential_id in _ids(0, 7):
+        registry.add_revocation(credential_id)
+    registry.add_revocation('credential-2')  # già revocata: nessuna nuova epoca
+    assert registry.epoch == 7
+    # Le prime sei sono state compattate nello snapshot, l'ultima è nel log
+    assert len(registry.store._index) == 6
+
+    for since in range(8):
+        delta = registry.revocations_since(since)
+        assert delta.revoked_ids == _ids(since, 7) and delta.epoch == 7 and not delta.reset
+    registry.compact()
+    assert registry.revocations_since(4).revoked_ids == _ids(4, 7)
+    registry.close()
+
+    reopened = RevocationRegistry(path, compaction_threshold=3)
+    assert reopened.epoch == 7
+    assert reopened.revocations_since(5).revoked_ids == _ids(5, 7)
+    reopened.close()
+
+
+def test_applying_deltas_tracks_the_full_set(path):
+    registry = RevocationRegistry(path, compaction_threshold=4)
+    known, epoch = set(), 0
+    for start in (0, 3, 5, 11):
+        for credential_id in _ids(start, start + 3):
+            registry.add_revocation(credential_id)
+        delta = registry.revocations_since(epoch, registry.generation)
+        delta.apply_to(known)
+        epoch = delta.epoch
+        assert known == registry.revoked_ids
+    registry.close()
+
+
+def test_clearing_the_registry_resets_consumers(path):
+    registry = RevocationRegistry(path)
+    for credential_id in _ids(0, 3):
+        registry.add_revocation(credential_id)
+    generation = registry.generation
+    registry.clear_registry_for_testing()
+    registry.add_revocation('after-reset')
+
+    delta = registry.revocations_since(3, generation)
+    assert delta.reset and delta.revoked_ids == ['after-reset']
+    assert delta.apply_to(set(_ids(0, 3))) == {'after-reset'}
+    # Un'epoca futura (registro più corto di quanto noto al consumatore) forza il reset
+    assert registry.revocations_since(10).reset
+    registry.close()
+
+
+def test_readers_pick_up_revocations_and_compactions_from_another_writer(path):
+    writer = RevocationRegistry(path, compaction_threshold=4)
+    reader = RevocationRegistry(path, compaction_threshold=4)
+    notified = []
+    reader.subscribe(notified.append)
+
+    for credential_id in _ids(0, 2):
+        writer.add_revocation(credential_id)
+    assert reader.refresh() == _ids(0, 2)
+    for credential_id in _ids(2, 9):  # attraversa una compattazione dello scrittore
+        writer.add_revocation(credential_id)
+    assert reader.refresh() == _ids(2, 9)
+    assert reader.epoch == 9 and reader.is_revoked('credential-8')
+    assert reader.revocations_since(6).revoked_ids == _ids(6, 9)
+    assert notified == _ids(0, 9)
+    reader.close()
+    writer.close()
+
+
+def test_delta_reaches_a_verifier_with_a_filter(issuer, verifier, wallet, registry):
+    credential_id = issue(issuer, wallet)
+    verifier.set_revocation_filter(registry.build_filter(issuer.issued_credential_ids, {issuer.id: issuer.last_issue_date}))
+    epoch = registry.epoch
+    presentation = wallet.create_selective_presentation(credential_id, 1)
+    assert verifier.verify_presentation(presentation, registry)
+
+    issuer.revoke_credential(registry, credential_id)
+    verifier.apply_revocation_delta(registry.revocations_since(epoch))
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(presentation, registry)
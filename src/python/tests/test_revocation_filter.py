@@ -0,0 +1,64 @@
+# src/python/tests/test_revocation_filter.py
+from IssuingUniversity.issuing_university import IssuingUniversity
+from Revocation.filter_cascade import FilterCascade
+from utils.exceptions import CredentialRevokedError
+from utils.signature_suites import ED25519
+
+from .conftest import issue
+
+
+def test_filter_is_exact_on_its_universe():
+    revoked = {f"revoked-{i}" for i in range(50)}
+    valid = {f"valid-{i}" for i in range(500)}
+    coverage = {"Université de Rennes": "2026-01-01T00:00:00"}
+    cascade = FilterCascade.from_bytes(FilterCascade.build(revoked, valid, coverage=coverage).to_bytes())
+    assert all(cascade.is_revoked(i) for i in revoked)
+    assert not any(cascade.is_revoked(i) for i in valid)
+    assert cascade.coverage == coverage
+    assert cascade.covers("Université de Rennes", "2025-12-31T23:59:59.999999")
+    assert not cascade.covers("Université de Rennes", "2026-01-01T00:00:00.000001")
+    assert not cascade.covers("Universidad de Sevilla", "2025-01-01T00:00:00")
+
+
+def test_filter_stays_a_few_bits_per_credential():
+    revoked = {f"revoked-{i}" for i in range(100)}
+    valid = {f"valid-{i}" for i in range(10_000)}
+    cascade = FilterCascade.build(revoked, valid, coverage={"Université de Rennes": "2026-01-01T00:00:00"})
+    assert len(cascade) == len(cascade.to_bytes())
+    assert len(cascade) * 8 / (len(revoked) + len(valid)) < 2
+
+
+def test_revocations_of_other_issuers_are_not_hidden_by_the_filter(authority, issuer, verifier, wallet, registry):
+    other_issuer = IssuingUniversity("Universidad de Sevilla", authority, signature_suite=ED25519)
+    for _ in range(20):
+        issue(issuer, wallet)
+    other_ids = [issue(other_issuer, wallet) for _ in range(50)]
+    for credential_id in other_ids:
+        other_issuer.revoke_credential(registry, credential_id)
+
+    verifier.set_revocation_filter(registry.build_filter(issuer.issued_credential_ids, {issuer.id: issuer.last_issue_date}))
+    presentations = [wallet.create_selective_presentation(i, 1) for i in other_ids]
+    results = verifier.verify_presentations(presentations, registry, max_workers=1)
+    assert all(isinstance(r.error, CredentialRevokedError) for r in results)
+
+
+def test_credentials_issued_after_the_filter_fall_back_to_the_registry(issuer, verifier, wallet, registry):
+    issue(issuer, wallet)
+    verifier.set_revocation_filter(registry.build_filter(issuer.issued_credential_ids, {issuer.id: issuer.last_issue_date}))
+    late_id = issue(issuer, wallet)
+    issuer.revoke_credential(registry, late_id)
+
+    presentation = wallet.create_selective_presentation(late_id, 2)
+    assert isinstance(verifier.verify_presentations([presentation], registry)[0].error, CredentialRevokedError)
+
+
+def test_filter_still_answers_for_covered_credentials(issuer, verifier, wallet, registry):
+    valid_id, revoked_id = issue(issuer, wallet), issue(issuer, wallet)
+    issuer.revoke_credential(registry, revoked_id)
+    verifier.set_revocation_filter(registry.build_filter(issuer.issued_credential_ids, {issuer.id: issuer.last_issue_date}))
+
+    results = verifier.verify_presentations(
+        [wallet.create_selective_presentation(valid_id, 1), wallet.create_selective_presentation(revoked_id, 1)], registry
+    )
+    assert results[0].is_valid
+    assert isinstance(results[1].error, CredentialRevokedError)
@@ -0,0 +1,51 @@
+# src/python/tests/test_signature_suites.py
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from utils.crypto_utils import sign_data, verify_signature
+from utils.exceptions import SignatureVerificationError
+from utils.signature_suites import ECDSA_P256_SHA256, SUITES, SignatureSuite, get_suite, suite_for_key
+
+from .conftest import COURSES
+
+_KEYS = {name: suite.generate_keys() for name, suite in SUITES.items()}
+
+
+@pytest.mark.parametrize('name', sorted(SUITES))
+def test_each_suite_signs_and_verifies(name):
+    private_key, public_key = _KEYS[name]
+    assert suite_for_key(private_key).name == name and suite_for_key(public_key).name == name
+
+    signature = sign_data(private_key, COURSES[0])
+    verify_signature(public_key, signature, COURSES[0], signature_suite=name)
+    verify_signature(public_key, signature, COURSES[0])
+    with pytest.raises(SignatureVerificationError):
+        verify_signature(public_key, signature, dict(COURSES[0], voto=18), signature_suite=name)
+
+
+@pytest.mark.parametrize('name', sorted(SUITES))
+def test_a_key_of_another_suite_is_rejected(name):
+    private_key, _ = _KEYS[name]
+    signature = sign_data(private_key, COURSES[0])
+    for other in SUITES:
+        if other == name:
+            continue
+        _, other_public_key = _KEYS[other]
+        # La suite dichiarata non corrisponde alla chiave (certificato o credenziale incoerenti)
+        with pytest.raises(SignatureVerificationError):
+            verify_signature(other_public_key, signature, COURSES[0], signature_suite=name)
+        with pytest.raises(SignatureVerificationError):
+            verify_signature(other_public_key, signature, COURSES[0])
+
+
+def test_unknown_suites_and_curves_are_refused():
+    with pytest.raises(ValueError):
+        get_suite('rsa-pkcs1v15-sha1')
+    p384_key = ec.generate_private_key(ec.SECP384R1())
+    with pytest.raises(ValueError):
+        suite_for_key(p384_key)
+    _, public_key = _KEYS[ECDSA_P256_SHA256]
+    with pytest.raises(SignatureVerificationError):
+        verify_signature(public_key, b'', COURSES[0], signature_suite='rsa-pkcs1v15-sha1')
+    with pytest.raises(TypeError):
+        SignatureSuite()
@@ -0,0 +1,100 @@
+# src/python/tests/test_status_list.py
+import dataclasses
+
+import pytest
+
+from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from IssuingUniversity.issuing_university import IssuingUniversity
+from models import StatusList
+from utils.exceptions import CredentialRevokedError, SignatureVerificationError, StatusListError, UntrustedAuthorityError
+from utils.signature_suites import ED25519
+
+from .conftest import issue
+
+
+@pytest.fixture
+def status_issuer(authority) -> IssuingUniversity:
+    return IssuingUniversity("Université de Rennes", authority, signature_suite=ED25519, status_list_size=64)
+
+
+def _publish(issuer: IssuingUniversity) -> StatusList:
+    (status_list,) = issuer.publish_status_lists()
+    return status_list
+
+
+def test_revoked_bit_is_detected_after_a_new_version(status_issuer, verifier, wallet, registry):
+    credential_id = issue(status_issuer, wallet)
+    assert verifier.update_status_list(_publish(status_issuer))
+    presentation = wallet.create_selective_presentation(credential_id, 1)
+    assert verifier.verify_presentation(presentation, registry)
+
+    status_issuer.revoke_credential(registry, credential_id)
+    assert registry.epoch == 0  # la revoca è un bit, non un ID nel registro
+    assert verifier.update_status_list(_publish(status_issuer))
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(presentation, registry)
+
+
+def test_credentials_without_a_status_entry_are_revoked_in_the_registry(status_issuer, wallet, registry):
+    issue(status_issuer, wallet)
+    status_issuer.revoke_credential(registry, "issued-before-status-lists")
+    assert registry.is_revoked("issued-before-status-lists")
+    assert all(status_list.version == 0 for status_list in status_issuer.status_lists.values())
+
+
+def test_older_or_equal_versions_are_ignored(status_issuer, verifier, wallet, registry):
+    credential_id = issue(status_issuer, wallet)
+    stale = _publish(status_issuer)
+    status_issuer.revoke_credential(registry, credential_id)
+    assert verifier.update_status_list(_publish(status_issuer))
+    assert not verifier.update_status_list(stale)
+    assert not verifier.update_status_list(_publish(status_issuer))
+
+
+def test_status_list_signature_must_match_its_issuer(authority, status_issuer, verifier, wallet):
+    issue(status_issuer, wallet)
+    published = _publish(status_issuer)
+    tampered = dataclasses.replace(published, data=dataclasses.replace(published.data, version=published.data.version + 1))
+    with pytest.raises(SignatureVerificationError):
+        verifier.update_status_list(tampered)
+
+    # Lista firmata da un'altra università ma che dichiara Rennes come emittente
+    impostor = IssuingUniversity("Universidad de Sevilla", authority, signature_suite=ED25519, status_list_size=64)
+    issue(impostor, wallet)
+    forged = _publish(impostor)
+    forged = dataclasses.replace(forged, data=dataclasses.replace(forged.data, issuer_id=status_issuer.id))
+    with pytest.raises(StatusListError):
+        verifier.update_status_list(forged)
+
+    other_authority = AccreditationAuthority("Other-Body", signature_suite=ED25519)
+    untrusted = IssuingUniversity("Université de Rennes", other_authority, signature_suite=ED25519, status_list_size=64)
+    issue(untrusted, wallet)
+    with pytest.raises(UntrustedAuthorityError):
+        verifier.update_status_list(_publish(untrusted))
+
+
+def test_index_outside_the_list_is_rejected(status_issuer, verifier, wallet, registry):
+    credential_id = issue(status_issuer, wallet)
+    verifier.update_status_list(_publish(status_issuer))
+    presentation = wallet.create_selective_presentation(credential_id, 1)
+    public_part = dataclasses.replace(presentation.original_credential_public_part, status_list_index=64)
+    out_of_range = dataclasses.replace(presentation, original_credential_public_part=public_part)
+    # La revoca precede le firme: l'indice viene rifiutato prima della firma (ormai non valida)
+    with pytest.raises(StatusListError):
+        verifier.verify_presentation(out_of_range, registry)
+
+
+def test_missing_status_list_fails_closed(status_issuer, verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(status_issuer, wallet), 1)
+    with pytest.raises(StatusListError):
+        verifier.verify_presentation(presentation, registry)
+
+
+def test_registry_revocations_apply_to_status_list_credentials(status_issuer, verifier, wallet, registry):
+    credential_id = issue(status_issuer, wallet)
+    verifier.update_status_list(_publish(status_issuer))
+    registry.add_revocation(credential_id)
+    presentation = wallet.create_selective_presentation(credential_id, 1)
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(presentation, registry)
+    assert isinstance(verifier.verify_presentations([presentation], registry)[0].error, CredentialRevokedError)
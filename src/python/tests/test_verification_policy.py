@@ -0,0 +1,78 @@
+# src/python/tests/test_verification_policy.py
+import dataclasses
+
+import pytest
+
+from utils.exceptions import CredentialRevokedError, MerkleProofError
+from VerifyingUniversity.verification_policy import (
+    CREDENTIAL_SIGNATURE, FAIL_FAST_ORDER, ISSUER_CERTIFICATE, LEGACY_ORDER, MERKLE_PROOF, REVOCATION,
+    VerificationPolicy
+)
+from VerifyingUniversity.verifying_university import VerifyingUniversity
+
+from .conftest import issue
+
+
+@pytest.fixture
+def signature_checks(verifier, monkeypatch):
+    """Registra le verifiche a chiave pubblica eseguite dal verificatore."""
+    calls = []
+    for name in ('_check_issuer_certificate', '_check_credential_signature'):
+        original = getattr(verifier, name)
+
+        def recording(*args, _name=name, _original=original):
+            calls.append(_name)
+            return _original(*args)
+
+        monkeypatch.setattr(verifier, name, recording)
+    return calls
+
+
+def test_valid_presentation_times_every_check_in_order(issuer, verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    assert verifier.verify_presentation(presentation, registry)
+    report = verifier.last_report
+    assert tuple(report.timings) == FAIL_FAST_ORDER
+    assert report.is_valid and report.failed_check is None
+    assert all(seconds >= 0 for seconds in report.timings.values())
+    assert report.total_seconds == pytest.approx(sum(report.timings.values()))
+
+
+def test_revoked_presentation_fails_before_any_signature_check(issuer, verifier, wallet, registry, signature_checks):
+    credential_id = issue(issuer, wallet)
+    issuer.revoke_credential(registry, credential_id)
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(wallet.create_selective_presentation(credential_id, 1), registry)
+    assert verifier.last_report.failed_check == REVOCATION
+    assert list(verifier.last_report.timings) == list(FAIL_FAST_ORDER[:2])
+    assert signature_checks == []
+
+
+def test_tampered_course_fails_at_the_merkle_proof(issuer, verifier, wallet, registry, signature_checks):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    tampered = dataclasses.replace(presentation, presented_course=dict(presentation.presented_course, voto=18))
+    with pytest.raises(MerkleProofError):
+        verifier.verify_presentation(tampered, registry)
+    assert verifier.last_report.failed_check == MERKLE_PROOF
+    assert signature_checks == []
+
+
+def test_legacy_order_reports_the_same_failure_after_the_signatures(authority, issuer, wallet, registry):
+    verifier = VerifyingUniversity("Università di Salerno", policy=VerificationPolicy(LEGACY_ORDER))
+    verifier.add_trusted_authority(authority)
+    credential_id = issue(issuer, wallet)
+    issuer.revoke_credential(registry, credential_id)
+    with pytest.raises(CredentialRevokedError):
+        verifier.verify_presentation(wallet.create_selective_presentation(credential_id, 1), registry)
+    assert tuple(verifier.last_report.timings) == LEGACY_ORDER
+
+
+@pytest.mark.parametrize('order', [
+    FAIL_FAST_ORDER[:-1],
+    FAIL_FAST_ORDER + (REVOCATION,),
+    (REVOCATION, MERKLE_PROOF, ISSUER_CERTIFICATE, 'authority_name', CREDENTIAL_SIGNATURE),
+    ('authority_name', REVOCATION, MERKLE_PROOF, CREDENTIAL_SIGNATURE, ISSUER_CERTIFICATE),
+])
+def test_policies_that_cannot_run_are_refused(order):
+    with pytest.raises(ValueError):
+        VerificationPolicy(order)
@@ -0,0 +1,64 @@
+# src/python/tests/test_verification_service.py
+import asyncio
+import dataclasses
+
+import pytest
+
+from models import CertificateData
+from utils import cbor
+from utils.exceptions import WireFormatError
+from utils.wire_format import decode_presentation, encode_presentation
+from VerifyingUniversity.verification_service import VerificationClient, VerificationService
+
+from .conftest import issue
+
+
+def _with_array_university_id(data: bytes) -> bytes:
+    """Stessa presentazione, con lo university_id del certificato inline trasformato in un array."""
+    message = cbor.loads(data)
+    message[3][1] = [message[3][1]]
+    return cbor.dumps(message)
+
+
+def test_decode_rejects_fields_of_the_wrong_type(issuer, wallet):
+    data = encode_presentation(wallet.create_selective_presentation(issue(issuer, wallet), 1))
+    with pytest.raises(WireFormatError):
+        decode_presentation(_with_array_university_id(data))
+    message = cbor.loads(data)
+    message[2][5] = 'v2'  # merkle_version
+    with pytest.raises(WireFormatError):
+        decode_presentation(cbor.dumps(message))
+    with pytest.raises(WireFormatError):
+        decode_presentation(cbor.dumps(message[:3] + [[]] + message[4:]))
+
+
+def test_batch_verifier_isolates_unexpected_errors(issuer, verifier, wallet, registry):
+    valid = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    # Costruita direttamente, senza passare dal formato binario: il certificato non è hashable
+    certificate = dataclasses.replace(
+        valid.issuer_certificate,
+        data=CertificateData(university_id=['Université de Rennes'], public_key_pem=valid.issuer_certificate.data.public_key_pem)
+    )
+    malformed = dataclasses.replace(valid, issuer_certificate=certificate)
+
+    results = verifier.verify_presentations([valid, malformed, valid], registry, max_workers=1)
+    assert [r.is_valid for r in results] == [True, False, True]
+    assert isinstance(results[1].error, WireFormatError)
+
+
+def test_malformed_request_does_not_fail_its_micro_batch(issuer, verifier, wallet, registry):
+    first = encode_presentation(wallet.create_selective_presentation(issue(issuer, wallet), 1))
+    second = encode_presentation(wallet.create_selective_presentation(issue(issuer, wallet), 2))
+
+    async def scenario():
+        service = VerificationService(verifier, registry, port=0, batch_window=0.2, max_workers=1)
+        async with service:
+            async with await VerificationClient.connect(*service.address) as client:
+                return await asyncio.gather(
+                    client.verify(first), client.verify(_with_array_university_id(first)), client.verify(second)
+                ), service.batches_dispatched
+
+    (valid_first, malformed, valid_second), batches = asyncio.run(scenario())
+    assert batches == 1
+    assert valid_first.valid and valid_second.valid
+    assert not malformed.valid and malformed.error == 'WireFormatError'
@@ -0,0 +1,33 @@
+# src/python/tests/test_wallet_store.py
+import pytest
+
+from Student.wallet import StudentWallet
+from Student.wallet_store import WalletStore
+from utils.signature_suites import ED25519
+
+from .conftest import issue
+
+
+def test_wallet_store_requires_a_password(tmp_path):
+    store = WalletStore(str(tmp_path / 'wallet.db'))
+    with pytest.raises(ValueError):
+        StudentWallet("Francesco Monda", signature_suite=ED25519, store=store)
+    with pytest.raises(ValueError):
+        store.save_private_key(StudentWallet("x", signature_suite=ED25519).private_key, b'')
+    store.close()
+
+
+def test_wallet_key_is_encrypted_and_credentials_survive_reopening(tmp_path, issuer):
+    path = str(tmp_path / 'wallet.db')
+    store = WalletStore(path)
+    wallet = StudentWallet("Francesco Monda", signature_suite=ED25519, store=store, store_password=b'secret')
+    credential_id = issue(issuer, wallet)
+    store.close()
+
+    store = WalletStore(path)
+    row = store._conn.execute("SELECT value FROM meta WHERE key = 'private_key'").fetchone()
+    assert b'ENCRYPTED PRIVATE KEY' in row[0]
+    reopened = StudentWallet("Francesco Monda", signature_suite=ED25519, store=store, store_password=b'secret')
+    assert reopened.pseudonym == wallet.pseudonym
+    assert reopened.credentials[credential_id].merkle_root == wallet.credentials[credential_id].merkle_root
+    store.close()
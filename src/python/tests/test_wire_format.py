@@ -0,0 +1,83 @@
+# src/python/tests/test_wire_format.py
+import pickle
+
+import pytest
+
+from utils import cbor
+from utils.crypto_utils import hash_data
+from utils.exceptions import WireFormatError
+from utils.wire_format import decode_credential, decode_presentation, encode_credential, encode_presentation
+
+from .conftest import COURSES, issue
+
+
+def test_presentations_round_trip(issuer, verifier, wallet, registry):
+    credential_id = issue(issuer, wallet)
+    for presentation in (
+        wallet.create_selective_presentation(credential_id, 2),
+        wallet.create_multi_course_presentation(credential_id, [1, 3]),
+    ):
+        decoded = decode_presentation(encode_presentation(presentation))
+        assert decoded == presentation
+        assert verifier.verify_presentation(decoded, registry)
+
+
+def test_credential_round_trip(issuer, wallet):
+    credential = wallet.credentials[issue(issuer, wallet)]
+    decoded = decode_credential(encode_credential(credential))
+    assert decoded.get_public_part() == credential.get_public_part()
+    assert decoded.signature == credential.signature
+    assert decoded.merkle_root == credential.merkle_root
+
+
+def test_certificate_by_reference_needs_a_known_certificate(issuer, verifier, wallet, registry):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    data = encode_presentation(presentation, certificate_by_reference=True)
+    assert len(data) < len(encode_presentation(presentation))
+    with pytest.raises(WireFormatError):
+        decode_presentation(data, verifier.resolve_certificate)
+
+    verifier.verify_presentation(presentation, registry)
+    assert decode_presentation(data, verifier.resolve_certificate) == presentation
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda m: [2] + m[1:],                          # versione del formato
+    lambda m: m[:1] + [3] + m[2:],                  # tipo di messaggio
+    lambda m: m[:-1],                               # campo mancante
+    lambda m: m[:2] + [m[2][:5]] + m[3:],           # parte pubblica troncata
+    lambda m: m[:3] + [[9, b'x']] + m[4:],          # forma del certificato
+    lambda m: m[:3] + [[1, b'short']] + m[4:],      # digest del certificato
+    lambda m: m[:4] + ['signature'] + m[5:],        # firma non binaria
+    lambda m: m[:6] + [[b'\x00' * 31, b'']] + m[7:],  # fratelli della prova di batch
+    lambda m: m[:7] + [['not', 'a', 'course']] + m[8:],
+    lambda m: m[:8] + [{'not': 'a proof'}],
+])
+def test_malformed_messages_are_rejected(issuer, wallet, mutate):
+    data = encode_presentation(wallet.create_selective_presentation(issue(issuer, wallet), 1))
+    with pytest.raises(WireFormatError):
+        decode_presentation(cbor.dumps(mutate(cbor.loads(data))))
+
+
+def test_undecodable_bytes_are_rejected():
+    for data in (b'', b'\xff', cbor.dumps({'a': 1}), cbor.dumps([1])):
+        with pytest.raises(WireFormatError):
+            decode_presentation(data)
+
+
+def test_binary_course_values_decode_to_bytes_with_the_same_hash(issuer, verifier, wallet, registry):
+    courses = [dict(course, attestato=bytes([course["id"]]) * 8) for course in COURSES]
+    credential_id = issue(issuer, wallet, courses)
+    credential = wallet.credentials[credential_id]
+
+    decoded = decode_credential(encode_credential(credential))
+    for original, course in zip(credential.courses, decoded.courses):
+        assert type(course["attestato"]) is bytes
+        assert hash_data(course) == hash_data(original)
+    assert decoded.merkle_root == credential.merkle_root
+
+    message = bytearray(encode_presentation(wallet.create_selective_presentation(credential_id, 2)))
+    presentation = decode_presentation(message)
+    message[:] = bytes(len(message))  # il buffer ricevuto può essere riutilizzato
+    assert presentation.presented_course["attestato"] == bytes([2]) * 8
+    assert verifier.verify_presentation(pickle.loads(pickle.dumps(presentation)), registry)
@@ -0,0 +1,65 @@
+# src/python/tests/test_worker_pool.py
+import pytest
+
+from Revocation.revocation import RevocationRegistry
+from Revocation.revocation_store import DIGEST_SIZE, SortedDigestIndex, credential_digest
+from utils.exceptions import CredentialRevokedError, UntrustedAuthorityError
+from VerifyingUniversity.worker_pool import VerifierWorkerPool
+
+from .conftest import issue
+
+
+@pytest.fixture
+def pool(verifier, registry):
+    pool = VerifierWorkerPool(verifier, registry, max_workers=2, chunk_size=2)
+    yield pool
+    pool.close()
+
+
+def test_workers_switch_to_each_published_snapshot(issuer, wallet, registry, pool):
+    credential_ids = [issue(issuer, wallet) for _ in range(4)]
+    presentations = [wallet.create_selective_presentation(i, 1) for i in credential_ids]
+    assert all(r.is_valid for r in pool.verify_presentations(presentations))
+
+    registry.add_revocation(credential_ids[1])
+    # Finché non viene pubblicato, i processi usano lo snapshot precedente
+    assert pool.verify_presentation(presentations[1])
+    assert pool.publish() == 2
+    results = pool.verify_presentations(presentations)
+    assert [r.is_valid for r in results] == [True, False, True, True]
+    assert isinstance(results[1].error, CredentialRevokedError)
+    with pytest.raises(CredentialRevokedError):
+        pool.verify_presentation(presentations[1])
+
+
+def test_trust_changes_reach_the_workers(authority, issuer, verifier, wallet, pool):
+    presentation = wallet.create_selective_presentation(issue(issuer, wallet), 1)
+    assert pool.verify_presentation(presentation)
+
+    verifier.remove_trusted_authority(authority.name)
+    pool.publish()
+    with pytest.raises(UntrustedAuthorityError):
+        pool.verify_presentation(presentation)
+
+    verifier.add_trusted_authority(authority)
+    pool.publish()
+    assert all(r.is_valid for r in pool.verify_presentations([presentation] * 4))
+
+
+def test_revoked_digests_merge_the_indexed_snapshot_and_the_log(tmp_path):
+    registry = RevocationRegistry(str(tmp_path / 'revocation_list.json'), compaction_threshold=50)
+    ids = [f"credential-{i}" for i in range(120)]
+    for credential_id in ids:
+        registry.add_revocation(credential_id)
+    # 100 revoche nello snapshot indicizzato, 20 ancora nel log
+    assert len(registry.store._index) == 100
+    digests = registry.revoked_digests()
+    assert digests == SortedDigestIndex.encode(credential_digest(i) for i in ids)
+
+    index = SortedDigestIndex(digests, len(digests) // DIGEST_SIZE)
+    assert all(index.contains(credential_digest(i)) for i in ids)
+    assert not index.contains(credential_digest("never-revoked"))
+    # Nessuna vista sull'mmap resta aperta: la compattazione lo può richiudere
+    registry.compact()
+    assert registry.revoked_digests() == digests
+    registry.close()
@@ -0,0 +1,64 @@
+# src/python/utils/canonical.py
+"""
+Codifica canonica unica usata per firme e hash.
+
+Il formato è JSON compatto (separatori senza spazi, chiavi ordinate, UTF-8):
+coincide con la serializzazione storica delle foglie del Merkle Tree, quindi
+le radici v1 già emesse restano verificabili. Le dataclass frozen di
+models.py memoizzano i propri byte canonici tramite CanonicalEncodable, così
+firme e verifiche ripetute sullo stesso oggetto non riserializzano nulla.
+"""
+import dataclasses
+import json
+from typing import Any, Dict
+
+
+def _default(obj: Any) -> Any:
+    """Converte i tipi non JSON-nativi nella loro forma canonica."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return canonical_fields(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).hex()
+    raise TypeError(f"Oggetto di tipo {type(obj).__name__} non serializzabile in forma canonica")
+
+# Un unico encoder riutilizzato: json.dumps con argomenti non di default
+# ne costruirebbe uno nuovo a ogni chiamata.
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'), default=_default)
+
+
+def canonical_fields(obj: Any) -> Dict[str, Any]:
+    """
+    Restituisce i campi di una dataclass (non ricorsivo: le annidate passano da _default).
+    I campi elencati in CANONICAL_OPTIONAL_FIELDS vengono omessi quando valgono
+    None, così aggiungerli a un modello non cambia i byte (e le firme) degli oggetti già emessi.
+    """
+    optional = getattr(obj, 'CANONICAL_OPTIONAL_FIELDS', ())
+    data = {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    for name in optional:
+        if data.get(name) is None:
+            data.pop(name, None)
+    return data
+
+def canonical_bytes(data: Any) -> bytes:
+    """
+    Restituisce la codifica canonica dei dati.
+    I bytes restano invariati; gli oggetti CanonicalEncodable usano la codifica memoizzata.
+    """
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, CanonicalEncodable):
+        return data.canonical_bytes
+    return _ENCODER.encode(data).encode('utf-8')
+
+
+class CanonicalEncodable:
+    """Mixin per dataclass frozen: calcola la codifica canonica una sola volta."""
+
+    @property
+    def canonical_bytes(self) -> bytes:
+        cached = self.__dict__.get('_canonical_bytes')
+        if cached is None:
+            cached = _ENCODER.encode(canonical_fields(self)).encode('utf-8')
+            # Le dataclass sono frozen: si aggira __setattr__ come fa dataclasses stesso
+            object.__setattr__(self, '_canonical_bytes', cached)
+        return cached
@@ -0,0 +1,160 @@
+# src/python/utils/cbor.py
+"""
+Codifica CBOR (RFC 8949) minimale e deterministica, senza dipendenze esterne.
+
+Supporta i tipi usati dal formato di trasmissione: interi, byte string,
+stringhe di testo, array, mappe, booleani, None e float a 64 bit. Le mappe
+sono scritte con le chiavi ordinate per byte codificati (codifica
+deterministica, §4.2.1); il decoder lavora su una memoryview dell'input e,
+con zero_copy=True, restituisce le byte string come sue porzioni, senza copiarle.
+"""
+import struct
+from typing import Any, Tuple
+
+# Tipi maggiori (3 bit alti del byte iniziale)
+_UNSIGNED = 0
+_NEGATIVE = 1
+_BYTES = 2
+_TEXT = 3
+_ARRAY = 4
+_MAP = 5
+_SIMPLE = 7
+
+_FALSE = 0xf4
+_TRUE = 0xf5
+_NULL = 0xf6
+_FLOAT64 = 0xfb
+
+
+class CBORDecodeError(ValueError):
+    """Sollevata quando i dati non sono CBOR valido (o usano funzioni non supportate)."""
+    pass
+
+
+def _head(major: int, value: int) -> bytes:
+    """Byte iniziale più l'eventuale argomento, nella forma più corta possibile."""
+    if value < 24:
+        return bytes((major << 5 | value,))
+    if value < 0x100:
+        return struct.pack('>BB', major << 5 | 24, value)
+    if value < 0x10000:
+        return struct.pack('>BH', major << 5 | 25, value)
+    if value < 0x100000000:
+        return struct.pack('>BI', major << 5 | 26, value)
+    if value < 0x10000000000000000:
+        return struct.pack('>BQ', major << 5 | 27, value)
+    raise ValueError("Intero troppo grande per la codifica CBOR.")
+
+def _encode(obj: Any, out: list):
+    # bool va controllato prima di int (bool è sottoclasse di int)
+    if obj is None:
+        out.append(bytes((_NULL,)))
+    elif obj is True:
+        out.append(bytes((_TRUE,)))
+    elif obj is False:
+        out.append(bytes((_FALSE,)))
+    elif isinstance(obj, int):
+        out.append(_head(_UNSIGNED, obj) if obj >= 0 else _head(_NEGATIVE, -1 - obj))
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        out.append(_head(_BYTES, len(obj)))
+        out.append(bytes(obj))
+    elif isinstance(obj, str):
+        encoded = obj.encode('utf-8')
+        out.append(_head(_TEXT, len(encoded)))
+        out.append(encoded)
+    elif isinstance(obj, (list, tuple)):
+        out.append(_head(_ARRAY, len(obj)))
+        for item in obj:
+            _encode(item, out)
+    elif isinstance(obj, dict):
+        items = sorted((dumps(k), v) for k, v in obj.items())
+        out.append(_head(_MAP, len(items)))
+        for encoded_key, value in items:
+            out.append(encoded_key)
+            _encode(value, out)
+    elif isinstance(obj, float):
+        out.append(struct.pack('>Bd', _FLOAT64, obj))
+    else:
+        raise TypeError(f"Oggetto di tipo {type(obj).__name__} non codificabile in CBOR")
+
+def dumps(obj: Any) -> bytes:
+    """Codifica un oggetto in CBOR deterministico."""
+    out: list = []
+    _encode(obj, out)
+    return b''.join(out)
+
+
+def _read_argument(data: memoryview, offset: int, info: int) -> Tuple[int, int]:
+    if info < 24:
+        return info, offset
+    if info == 24:
+        return data[offset], offset + 1
+    if info == 25:
+        return struct.unpack_from('>H', data, offset)[0], offset + 2
+    if info == 26:
+        return struct.unpack_from('>I', data, offset)[0], offset + 4
+    if info == 27:
+        return struct.unpack_from('>Q', data, offset)[0], offset + 8
+    raise CBORDecodeError("Lunghezze indefinite e argomenti riservati non sono supportati.")
+
+def _decode(data: memoryview, offset: int, zero_copy: bool, depth: int) -> Tuple[Any, int]:
+    if depth > 64:
+        raise CBORDecodeError("Annidamento CBOR troppo profondo.")
+    initial = data[offset]
+    offset += 1
+    major, info = initial >> 5, initial & 0x1f
+
+    if major == _SIMPLE:
+        if initial == _NULL:
+            return None, offset
+        if initial == _TRUE:
+            return True, offset
+        if initial == _FALSE:
+            return False, offset
+        if initial == _FLOAT64:
+            return struct.unpack_from('>d', data, offset)[0], offset + 8
+        raise CBORDecodeError(f"Valore semplice CBOR non supportato: 0x{initial:02x}")
+
+    value, offset = _read_argument(data, offset, info)
+    if major == _UNSIGNED:
+        return value, offset
+    if major == _NEGATIVE:
+        return -1 - value, offset
+    if major in (_BYTES, _TEXT):
+        end = offset + value
+        if end > len(data):
+            raise CBORDecodeError("Stringa CBOR troncata.")
+        chunk = data[offset:end]
+        if major == _TEXT:
+            return str(chunk, 'utf-8'), end
+        return (chunk if zero_copy else chunk.tobytes()), end
+    if major == _ARRAY:
+        items = []
+        for _ in range(value):
+            item, offset = _decode(data, offset, zero_copy, depth + 1)
+            items.append(item)
+        return items, offset
+    if major == _MAP:
+        result = {}
+        for _ in range(value):
+            key, offset = _decode(data, offset, False, depth + 1)
+            result[key], offset = _decode(data, offset, zero_copy, depth + 1)
+        return result, offset
+    raise CBORDecodeError("I tag CBOR non sono supportati.")
+
+def loads(data: bytes, zero_copy: bool = False) -> Any:
+    """
+    Decodifica un singolo oggetto CBOR che deve occupare tutto l'input.
+
+    Args:
+        data: I byte da decodificare (bytes, bytearray o memoryview).
+        zero_copy: Se True, le byte string sono memoryview sull'input anziché copie.
+    """
+    view = memoryview(data).cast('B')
+    try:
+        obj, offset = _decode(view, 0, zero_copy, 0)
+    except (IndexError, struct.error, UnicodeDecodeError, TypeError) as e:
+        raise CBORDecodeError(f"Dati CBOR non validi: {e}") from None
+    if offset != len(view):
+        raise CBORDecodeError("Byte residui dopo l'oggetto CBOR.")
+    return obj
@@ -4,15 +4,29 @@ import uuid
 import datetime
 from typing import List, Dict, Any, Optional
 
+from config import MERKLE_TREE_VERSION
 from .merkle_tree import MerkleTree
 from models import Certificate, VerifiableCredentialPublicPart
 
 class AcademicCredential:
-    def __init__(self, issuer_info: Dict[str, Any], student_pseudonym: str, courses: List[Dict[str, Any]]):
-        """Rappresenta una credenziale accademica verificabile."""
+    def __init__(
+        self,
+        issuer_info: Dict[str, Any],
+        student_pseudonym: str,
+        courses: List[Dict[str, Any]],
+        status_list_id: Optional[str] = None,
+        status_list_index: Optional[int] = None
+    ):
+        """
+        Rappresenta una credenziale accademica verificabile.
+        status_list_id e status_list_index indicano il bit della lista di
+        stato dell'emittente che ne registra la revoca (se la usa).
+        """
         self.credential_id = str(uuid.uuid4())
         self.issuer_info: Certificate = issuer_info['certificate']
         self.issuer_id: str = issuer_info['id']
+        # La credenziale è firmata con la suite della chiave certificata dell'emittente
+        self.signature_suite: str = self.issuer_info.data.signature_suite
         self.student_pseudonym = student_pseudonym
         
         # Ordina i dizionari per garantire hash consistenti
@@ -21,29 +35,91 @@ class AcademicCredential:
         self.issue_date = datetime.datetime.utcnow().isoformat()
 
         # Costruisci il Merkle Tree
-        self.tree = MerkleTree(self.courses)
+        self.merkle_version = MERKLE_TREE_VERSION
+        self.tree = MerkleTree(self.courses, version=self.merkle_version)
         self.merkle_root = self.tree.root
 
         self.signature: Optional[bytes] = None
+        # Valorizzati solo nell'emissione a batch: la firma copre la radice del batch
+        self.batch_root: Optional[str] = None
+        self.batch_proof: Optional[List[Dict[str, str]]] = None
+        self.status_list_id = status_list_id
+        self.status_list_index = status_list_index
+
+        self._public_part: Optional[VerifiableCredentialPublicPart] = None
+
+    @classmethod
+    def from_stored(
+        cls,
+        public_part: VerifiableCredentialPublicPart,
+        issuer_certificate: Certificate,
+        courses: List[Dict[str, Any]],
+        tree: MerkleTree,
+        signature: bytes,
+        batch_root: Optional[str] = None,
+        batch_proof: Optional[List[Dict[str, str]]] = None
+    ) -> "AcademicCredential":
+        """
+        Ricostruisce una credenziale già emessa (es. letta dal wallet su disco)
+        senza generare un nuovo ID né ricalcolare il Merkle Tree.
+        """
+        credential = cls.__new__(cls)
+        credential.credential_id = public_part.credential_id
+        credential.issuer_info = issuer_certificate
+        credential.issuer_id = public_part.issuer_id
+        credential.signature_suite = public_part.signature_suite
+        credential.student_pseudonym = public_part.student_pseudonym
+        # I corsi letti da disco non sono condivisi con nessuno: non serve una copia difensiva
+        credential.courses = courses
+        credential.original_courses = courses
+        credential.issue_date = public_part.issue_date
+        credential.merkle_version = public_part.merkle_version
+        credential.tree = tree
+        credential.merkle_root = public_part.merkle_root
+        credential.signature = signature
+        credential.batch_root = batch_root
+        credential.batch_proof = batch_proof
+        credential.status_list_id = public_part.status_list_id
+        credential.status_list_index = public_part.status_list_index
+        credential._public_part = public_part
+        return credential
 
     def get_public_part(self) -> VerifiableCredentialPublicPart:
-        """Restituisce un dataclass con i dati pubblici e firmabili."""
-        return VerifiableCredentialPublicPart(
-            credential_id=self.credential_id,
-            issuer_id=self.issuer_id,
-            student_pseudonym=self.student_pseudonym,
-            merkle_root=self.merkle_root,
-            issue_date=self.issue_date
-        )
+        """
+        Restituisce un dataclass con i dati pubblici e firmabili.
+        L'oggetto viene creato una sola volta, così la sua codifica canonica resta memoizzata.
+        """
+        if self._public_part is None:
+            self._public_part = VerifiableCredentialPublicPart(
+                credential_id=self.credential_id,
+                issuer_id=self.issuer_id,
+                student_pseudonym=self.student_pseudonym,
+                merkle_root=self.merkle_root,
+                issue_date=self.issue_date,
+                merkle_version=self.merkle_version,
+                signature_suite=self.signature_suite,
+                status_list_id=self.status_list_id,
+                status_list_index=self.status_list_index
+            )
+        return self._public_part
 
     def generate_proof_for_course(self, course_data: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
         """Genera una prova di inclusione per un corso specifico."""
         return self.tree.get_proof(course_data)
     
+    def generate_multiproof_for_courses(self, courses_data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Genera un'unica prova di inclusione per più corsi."""
+        return self.tree.get_multiproof(courses_data)
+
     @staticmethod
-    def verify_proof(leaf_data: Dict[str, Any], proof: List[Dict[str, str]], merkle_root: str) -> bool:
+    def verify_proof(leaf_data: Dict[str, Any], proof: List[Dict[str, str]], merkle_root: str, merkle_version: int) -> bool:
         """Delega la verifica della prova di inclusione a MerkleTree."""
-        return MerkleTree.verify_proof(leaf_data, proof, merkle_root)
+        return MerkleTree.verify_proof(leaf_data, proof, merkle_root, version=merkle_version)
+
+    @staticmethod
+    def verify_multiproof(courses_data: List[Dict[str, Any]], multiproof: Dict[str, Any], merkle_root: str, merkle_version: int) -> bool:
+        """Delega la verifica della multiproof a MerkleTree."""
+        return MerkleTree.verify_multiproof(courses_data, multiproof, merkle_root, version=merkle_version)
 
     def to_dict(self, serializable: bool = False) -> Dict[str, Any]:
         """
@@ -64,9 +140,14 @@ class AcademicCredential:
             "courses": self.original_courses, # Lista dei corsi originali
             "issue_date": self.issue_date,
             "merkle_root": self.merkle_root,
+            "merkle_version": self.merkle_version,
             # Includi l'intero certificato dell'emittente
             "issuer_info": self.issuer_info, # Questo potrebbe essere un oggetto
-            "signature": self.signature
+            "signature": self.signature,
+            "batch_root": self.batch_root,
+            "batch_proof": self.batch_proof,
+            "status_list_id": self.status_list_id,
+            "status_list_index": self.status_list_index
         }
 
         if serializable:
@@ -1,76 +1,56 @@
 # src/python/utils/crypto_utils.py
 """
 Funzioni di utilità per operazioni crittografiche come hashing, generazione di chiavi e firme.
+L'algoritmo di firma è scelto dalla suite a cui appartiene la chiave (vedi signature_suites).
 """
 import hashlib
-import json
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes, serialization
+from typing import Optional
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
 from cryptography.exceptions import InvalidSignature
 
-from config import KEY_SIZE, PUBLIC_EXPONENT
+from config import SIGNATURE_SUITE
+from .canonical import canonical_bytes
 from .exceptions import SignatureVerificationError
+from .signature_suites import PrivateKey, PublicKey, RSA_PSS_SHA256, get_suite, suite_for_key
 
 def hash_data(data: any) -> str:
     """Crea un hash SHA256 dei dati in modo deterministico."""
-    if not isinstance(data, bytes):
-        data_string = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
-    else:
-        data_string = data
-    return hashlib.sha256(data_string).hexdigest()
+    return hashlib.sha256(canonical_bytes(data)).hexdigest()
+
+def generate_keys(signature_suite: str = SIGNATURE_SUITE) -> tuple[PrivateKey, PublicKey]:
+    """Genera una coppia di chiavi per la suite di firma indicata."""
+    return get_suite(signature_suite).generate_keys()
 
 def generate_rsa_keys() -> tuple[RSAPrivateKey, RSAPublicKey]:
     """Genera una coppia di chiavi RSA."""
-    private_key = rsa.generate_private_key(
-        public_exponent=PUBLIC_EXPONENT,
-        key_size=KEY_SIZE,
-    )
-    public_key = private_key.public_key()
-    return private_key, public_key
+    return generate_keys(RSA_PSS_SHA256)
 
-def sign_data(private_key: RSAPrivateKey, data: any) -> bytes:
-    """Firma i dati usando una chiave privata RSA."""
-    if not isinstance(data, bytes):
-        data_bytes = json.dumps(data, sort_keys=True, default=lambda o: o.__dict__).encode('utf-8')
-    else:
-        data_bytes = data
-        
-    return private_key.sign(
-        data_bytes,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
+def sign_data(private_key: PrivateKey, data: any) -> bytes:
+    """Firma i dati con la suite a cui appartiene la chiave privata."""
+    return suite_for_key(private_key).sign(private_key, canonical_bytes(data))
 
-def verify_signature(public_key: RSAPublicKey, signature: bytes, data: any):
+def verify_signature(public_key: PublicKey, signature: bytes, data: any, signature_suite: Optional[str] = None):
     """
-    Verifica una firma usando la chiave pubblica RSA.
+    Verifica una firma con la suite a cui appartiene la chiave pubblica.
+    Se signature_suite è indicata, la chiave deve appartenere a quella suite.
     Solleva SignatureVerificationError in caso di fallimento.
     """
-    if not isinstance(data, bytes):
-        data_bytes = json.dumps(data, sort_keys=True, default=lambda o: o.__dict__).encode('utf-8')
-    else:
-        data_bytes = data
+    try:
+        suite = get_suite(signature_suite) if signature_suite is not None else suite_for_key(public_key)
+    except ValueError as e:
+        raise SignatureVerificationError(f"Verifica della firma fallita: {e}")
+    if not suite.owns_key(public_key):
+        raise SignatureVerificationError(f"Verifica della firma fallita: la chiave non appartiene alla suite '{suite.name}'.")
 
     try:
-        public_key.verify(
-            signature,
-            data_bytes,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        suite.verify(public_key, signature, canonical_bytes(data))
     except InvalidSignature as e:
         raise SignatureVerificationError(f"Verifica della firma fallita: {e}")
 
-def key_to_pem(key: RSAPrivateKey | RSAPublicKey) -> str:
+def key_to_pem(key: PrivateKey | PublicKey) -> str:
     """Serializza una chiave (privata o pubblica) in formato PEM string."""
-    if isinstance(key, RSAPrivateKey):
+    if hasattr(key, 'private_bytes'):
         pem_bytes = key.private_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PrivateFormat.PKCS8,
@@ -81,4 +61,4 @@ def key_to_pem(key: RSAPrivateKey | RSAPublicKey) -> str:
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
-    return pem_bytes.decode('utf-8')
\ No newline at end of file
+    return pem_bytes.decode('utf-8')
@@ -29,4 +29,16 @@ class UntrustedAuthorityError(ProjectBaseException):
 
 class CredentialRevokedError(ProjectBaseException):
     """Sollevata quando si tenta di verificare una credenziale revocata."""
-    pass
\ No newline at end of file
+    pass
+
+class WireFormatError(ProjectBaseException):
+    """Sollevata quando un messaggio ricevuto (JSON o formato binario di trasmissione) non è valido."""
+    pass
+
+class ServiceOverloadedError(ProjectBaseException):
+    """Sollevata quando il servizio di verifica ha troppe richieste in attesa per accettarne altre."""
+    pass
+
+class StatusListError(ProjectBaseException):
+    """Sollevata quando la lista di stato di una credenziale non è disponibile o non è valida."""
+    pass
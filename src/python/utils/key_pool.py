@@ -0,0 +1,236 @@
+# src/python/utils/key_pool.py
+"""
+Servizio di pre-generazione delle coppie di chiavi.
+
+Un KeyPool genera chiavi in processi worker in background e le tiene in un
+pool limitato; i costruttori degli attori (wallet, università, enti) le
+prelevano con acquire_keys() e, se il pool è vuoto o non installato,
+ricadono sulla generazione immediata. Le chiavi non usate possono essere
+salvate su disco come PKCS8 cifrato e ricaricate all'avvio successivo.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from cryptography.hazmat.primitives import serialization
+
+from config import SIGNATURE_SUITE, KEY_POOL_SIZE
+from .crypto_utils import generate_keys
+from .signature_suites import PrivateKey, PublicKey, get_suite
+
+_PEM_END = b'-----END ENCRYPTED PRIVATE KEY-----'
+
+
+def _private_key_to_der(private_key: PrivateKey) -> bytes:
+    """Serializza una chiave privata in DER (PKCS8, non cifrato) per lo scambio tra processi."""
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+def _generate_private_key_der(signature_suite: str) -> bytes:
+    """Job eseguito nei processi worker: genera una chiave e la restituisce in DER."""
+    private_key, _ = generate_keys(signature_suite)
+    return _private_key_to_der(private_key)
+
+
+class KeyPool:
+    def __init__(
+        self,
+        signature_suite: str = SIGNATURE_SUITE,
+        size: int = KEY_POOL_SIZE,
+        max_workers: Optional[int] = None,
+        persist_path: Optional[str] = None,
+        password: Optional[bytes] = None
+    ):
+        """
+        Crea un pool di chiavi per la suite indicata. Chiamare start() per
+        avviare la generazione in background.
+
+        Args:
+            signature_suite: Suite delle chiavi generate.
+            size: Numero massimo di chiavi tenute pronte.
+            max_workers: Processi dedicati alla generazione (None = numero di core).
+            persist_path: File da cui caricare (e su cui salvare alla chiusura) le chiavi pronte.
+            password: Password di cifratura PKCS8, obbligatoria con persist_path.
+        """
+        if persist_path is not None and not password:
+            raise ValueError("La persistenza delle chiavi richiede una password di cifratura.")
+        self.signature_suite = signature_suite
+        self.size = size
+        self.max_workers = max_workers
+        self.persist_path = persist_path
+        self.password = password
+
+        self._keys: "queue.Queue[bytes]" = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._closed = False
+        self.pooled_acquisitions = 0
+        self.inline_generations = 0
+
+        if persist_path is not None and os.path.exists(persist_path):
+            self._load(persist_path)
+
+    # ------------------------------------------------------------------ ciclo di vita
+    def start(self) -> "KeyPool":
+        """Avvia i worker e riempie il pool in background."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._refill()
+        return self
+
+    def close(self):
+        """Ferma i worker e, se configurato, salva su disco le chiavi non utilizzate."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if self.persist_path is not None:
+            self._save(self.persist_path)
+
+    def __enter__(self) -> "KeyPool":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ------------------------------------------------------------------ generazione
+    def _refill(self):
+        """Sottomette nuovi job finché chiavi pronte + job in corso non raggiungono size."""
+        with self._lock:
+            if self._executor is None or self._closed:
+                return
+            missing = self.size - self._keys.qsize() - self._in_flight
+            for _ in range(max(0, missing)):
+                future = self._executor.submit(_generate_private_key_der, self.signature_suite)
+                future.add_done_callback(self._on_generated)
+                self._in_flight += 1
+
+    def _on_generated(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            self._keys.put_nowait(future.result())
+        except queue.Full:
+            pass
+
+    # ------------------------------------------------------------------ API
+    def acquire(self) -> Tuple[PrivateKey, PublicKey]:
+        """
+        Preleva una coppia di chiavi dal pool. Ogni chiave viene consegnata
+        una sola volta; se il pool è vuoto la coppia viene generata subito.
+        """
+        try:
+            private_key_der = self._keys.get_nowait()
+        except queue.Empty:
+            self.inline_generations += 1
+            self._refill()
+            return generate_keys(self.signature_suite)
+        self.pooled_acquisitions += 1
+        self._refill()
+        # Le chiavi del pool sono generate dai nostri worker (o validate al
+        # caricamento da disco): la costosa validazione RSA si può saltare.
+        private_key = serialization.load_der_private_key(
+            private_key_der, password=None, unsafe_skip_rsa_key_validation=True
+        )
+        return private_key, private_key.public_key()
+
+    def wait_until_full(self, timeout: Optional[float] = None) -> bool:
+        """Attende che il pool sia pieno (utile prima di un benchmark)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._keys.qsize() < self.size:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def __len__(self) -> int:
+        """Numero di chiavi pronte."""
+        return self._keys.qsize()
+
+    # ------------------------------------------------------------------ persistenza
+    def _save(self, path: str):
+        """
+        Salva le chiavi pronte come PEM PKCS8 cifrati (scrittura atomica),
+        dopo quelle rimaste nel file perché eccedevano il pool al caricamento.
+        """
+        blocks: List[bytes] = []
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                blocks.append(f.read())
+        while True:
+            try:
+                private_key_der = self._keys.get_nowait()
+            except queue.Empty:
+                break
+            private_key = serialization.load_der_private_key(
+                private_key_der, password=None, unsafe_skip_rsa_key_validation=True
+            )
+            blocks.append(private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.BestAvailableEncryption(self.password)
+            ))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(blocks))
+        os.replace(tmp_path, path)
+
+    def _load(self, path: str):
+        """
+        Carica le chiavi salvate. Il file viene modificato solo dopo che
+        tutte le chiavi sono state decifrate (una password errata lo lascia
+        intatto): le chiavi caricate ne vengono tolte, così una chiave non
+        può essere consegnata da due pool diversi. Quelle oltre la capacità
+        del pool e quelle di un'altra suite di firma vi restano, per il
+        prossimo avvio o per il pool della loro suite.
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        blocks = [block + _PEM_END for block in content.split(_PEM_END) if block.strip()]
+        keys = [serialization.load_pem_private_key(block, password=self.password) for block in blocks]
+        suite = get_suite(self.signature_suite)
+        leftover = []
+        for block, private_key in zip(blocks, keys):
+            if suite.owns_key(private_key):
+                try:
+                    self._keys.put_nowait(_private_key_to_der(private_key))
+                    continue
+                except queue.Full:
+                    pass
+            leftover.append(block)
+        if not leftover:
+            os.remove(path)
+            return
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(block.lstrip() for block in leftover))
+        os.replace(tmp_path, path)
+
+
+# Pool installati, uno per suite di firma
+_installed_pools: Dict[str, KeyPool] = {}
+
+def install_key_pool(pool: KeyPool):
+    """Rende il pool la sorgente di chiavi predefinita per la sua suite."""
+    _installed_pools[pool.signature_suite] = pool
+
+def uninstall_key_pool(signature_suite: str = SIGNATURE_SUITE) -> Optional[KeyPool]:
+    """Rimuove il pool installato per la suite e lo restituisce."""
+    return _installed_pools.pop(signature_suite, None)
+
+def acquire_keys(signature_suite: str = SIGNATURE_SUITE) -> Tuple[PrivateKey, PublicKey]:
+    """Preleva una coppia di chiavi dal pool installato, o la genera se non ce n'è uno."""
+    pool = _installed_pools.get(signature_suite)
+    if pool is None:
+        return generate_keys(signature_suite)
+    return pool.acquire()
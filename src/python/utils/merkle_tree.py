@@ -1,81 +1,238 @@
 import hashlib
-import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
+
+from config import MERKLE_TREE_VERSION
+from utils.canonical import canonical_bytes
 from utils.crypto_utils import hash_data
 
+# Dimensione in byte di un digest SHA256
+DIGEST_SIZE = 32
+
+# Prefissi di separazione di dominio del formato v2, per impedire che
+# un nodo interno possa essere presentato come foglia (e viceversa)
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(data: Any, version: int = MERKLE_TREE_VERSION) -> bytes:
+    """Calcola il digest binario di una foglia secondo la versione del formato."""
+    if version == 1:
+        return bytes.fromhex(hash_data(data))
+    return hashlib.sha256(LEAF_PREFIX + canonical_bytes(data)).digest()
+
+def node_hash(left: bytes, right: bytes, version: int = MERKLE_TREE_VERSION) -> bytes:
+    """Calcola il digest binario di un nodo interno a partire dai due figli."""
+    if version == 1:
+        # v1: concatenazione delle stringhe esadecimali, serializzata in JSON
+        return bytes.fromhex(hash_data(left.hex() + right.hex()))
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
 
 class MerkleTree:
-    def __init__(self, data_list: List[Dict[str, Any]]):
+    def __init__(self, data_list: List[Dict[str, Any]], version: int = MERKLE_TREE_VERSION):
+        if version not in (1, 2):
+            raise ValueError(f"Versione del Merkle Tree non supportata: {version}")
         self.data_list = data_list
-        self.leaves = [hash_data(d) for d in self.data_list]
-        self.root = self._calculate_root(self.leaves)
-
-    def _calculate_root(self, hashes: List[str]) -> Optional[str]:
-        """Metodo ricorsivo per calcolare la Merkle Root."""
-        if not hashes:
-            return None
-        if len(hashes) == 1:
-            return hashes[0]
-
-        next_level = []
-        # Applica il padding se la lista è dispari
-        if len(hashes) % 2 == 1:
-            hashes.append(hashes[-1])
-
-        for i in range(0, len(hashes), 2):
-            combined = hashes[i] + hashes[i+1]
-            next_level.append(hash_data(combined))
-        
-        return self._calculate_root(next_level)
+        self.version = version
+        # Ogni livello è un bytearray contiguo di digest da 32 byte:
+        # levels[0] sono le foglie, levels[-1] contiene solo la radice.
+        self.levels: List[bytearray] = self._build_levels(
+            [leaf_hash(d, version) for d in self.data_list], version
+        )
+        self._index_levels()
+
+    @classmethod
+    def from_levels(cls, data_list: List[Dict[str, Any]], levels: List[bytearray], version: int) -> "MerkleTree":
+        """Ricostruisce un albero da livelli già calcolati (es. letti da disco), senza ricalcolare hash."""
+        tree = cls.__new__(cls)
+        tree.data_list = data_list
+        tree.version = version
+        tree.levels = levels
+        tree._index_levels()
+        return tree
+
+    def _index_levels(self):
+        """Costruisce l'indice delle foglie e la radice a partire dai livelli."""
+        # Indice hash della foglia -> posizione (prima occorrenza, come list.index)
+        self._leaf_index: Dict[bytes, int] = {}
+        for i in range(self.leaf_count - 1, -1, -1):
+            self._leaf_index[self._node(0, i)] = i
+        self.root = self._node(len(self.levels) - 1, 0).hex() if self.levels else None
+
+    @property
+    def leaf_count(self) -> int:
+        """Numero di foglie dell'albero."""
+        return len(self.levels[0]) // DIGEST_SIZE if self.levels else 0
+
+    @property
+    def leaves(self) -> List[str]:
+        """Hash esadecimali delle foglie, nell'ordine dei dati."""
+        return [self._node(0, i).hex() for i in range(self.leaf_count)]
+
+    @staticmethod
+    def _build_levels(leaf_hashes: List[bytes], version: int) -> List[bytearray]:
+        """Costruisce iterativamente tutti i livelli dell'albero, dalle foglie alla radice."""
+        if not leaf_hashes:
+            return []
+
+        levels = [bytearray().join(leaf_hashes)]
+        current = leaf_hashes
+        while len(current) > 1:
+            next_level = []
+            for i in range(0, len(current), 2):
+                # Padding: un nodo senza fratello viene accoppiato con se stesso
+                right = current[i + 1] if i + 1 < len(current) else current[i]
+                next_level.append(node_hash(current[i], right, version))
+            levels.append(bytearray().join(next_level))
+            current = next_level
+        return levels
+
+    def _node(self, level: int, index: int) -> bytes:
+        """Restituisce il digest del nodo in posizione index del livello indicato."""
+        offset = index * DIGEST_SIZE
+        return bytes(self.levels[level][offset:offset + DIGEST_SIZE])
 
     def get_proof(self, data_to_prove: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
-        """Genera una Merkle Proof per un dato specifico."""
-        try:
-            current_hash = hash_data(data_to_prove)
-            idx = self.leaves.index(current_hash)
-        except ValueError:
+        """Genera una Merkle Proof per un dato specifico, in O(log n) sui livelli già calcolati."""
+        idx = self._leaf_index.get(leaf_hash(data_to_prove, self.version))
+        if idx is None:
             return None # Il dato non è nell'albero
 
         proof = []
-        current_level_hashes = self.leaves[:]
-
-        while len(current_level_hashes) > 1:
-            # Applica il padding se il livello attuale è dispari
-            if len(current_level_hashes) % 2 == 1:
-                current_level_hashes.append(current_level_hashes[-1])
-
+        for level in range(len(self.levels) - 1):
+            level_size = len(self.levels[level]) // DIGEST_SIZE
             if idx % 2 == 0: # Nodo a sinistra
-                sibling_hash = current_level_hashes[idx + 1]
-                proof.append({'hash': sibling_hash, 'position': 'right'})
+                # Se il livello è dispari l'ultimo nodo è fratello di se stesso
+                sibling_idx = idx + 1 if idx + 1 < level_size else idx
+                proof.append({'hash': self._node(level, sibling_idx).hex(), 'position': 'right'})
             else: # Nodo a destra
-                sibling_hash = current_level_hashes[idx - 1]
-                proof.append({'hash': sibling_hash, 'position': 'left'})
-            
-            # Passa al livello successivo
-            next_level = []
-            for i in range(0, len(current_level_hashes), 2):
-                combined = current_level_hashes[i] + current_level_hashes[i+1]
-                next_level.append(hash_data(combined))
-            
-            current_level_hashes = next_level
+                proof.append({'hash': self._node(level, idx - 1).hex(), 'position': 'left'})
             idx = idx // 2
-            
+
         return proof
 
+    def get_multiproof(self, data_to_prove: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Genera una prova di inclusione unica per più dati (Merkle multiproof).
+
+        I fratelli condivisi tra i percorsi, o ricavabili dai dati stessi,
+        non vengono ripetuti: la prova contiene solo gli hash mancanti, in
+        ordine di livello e di posizione. Restituisce None se un dato non è
+        nell'albero.
+        """
+        indices = []
+        for data in data_to_prove:
+            idx = self._leaf_index.get(leaf_hash(data, self.version))
+            if idx is None:
+                return None
+            indices.append(idx)
+        if len(set(indices)) != len(indices):
+            raise ValueError("La multiproof non può contenere due volte lo stesso dato.")
+
+        hashes = []
+        known = sorted(indices)
+        for level in range(len(self.levels) - 1):
+            level_size = len(self.levels[level]) // DIGEST_SIZE
+            known_set = set(known)
+            for idx in known:
+                sibling_idx = idx ^ 1
+                # L'ultimo nodo di un livello dispari è fratello di se stesso
+                if sibling_idx < level_size and sibling_idx not in known_set:
+                    hashes.append(self._node(level, sibling_idx).hex())
+            known = sorted({idx // 2 for idx in known})
+
+        return {'indices': indices, 'leaf_count': self.leaf_count, 'hashes': hashes}
+
     @staticmethod
-    def verify_proof(data_to_verify: Dict[str, Any], proof: List[Dict[str, str]], root: str) -> bool:
-        """Verifica una Merkle Proof."""
-        computed_hash = hash_data(data_to_verify)
-        
-        for p in proof:
-            sibling_hash = p['hash']
-            if p['position'] == 'left':
-                computed_hash = hash_data(sibling_hash + computed_hash)
-            elif p['position'] == 'right':
-                computed_hash = hash_data(computed_hash + sibling_hash)
-            else:
+    def verify_multiproof(data_list: Sequence[Dict[str, Any]], multiproof: Dict[str, Any], root: str, version: int) -> bool:
+        """
+        Verifica in un solo passaggio che tutti i dati appartengano all'albero
+        con la radice indicata, ricostruendo i livelli solo dove serve.
+        La versione va indicata: è quella registrata accanto alla radice.
+        """
+        if version not in (1, 2):
+            return False
+        try:
+            indices = [int(i) for i in multiproof['indices']]
+            leaf_count = int(multiproof['leaf_count'])
+            hashes = [bytes.fromhex(h) for h in multiproof['hashes']]
+            if not data_list or len(indices) != len(data_list) or len(set(indices)) != len(indices):
+                return False
+            if any(i < 0 or i >= leaf_count for i in indices):
+                return False
+            if any(len(h) != DIGEST_SIZE for h in hashes):
                 return False
 
-        return computed_hash == root
+            nodes = {idx: leaf_hash(data, version) for idx, data in zip(indices, data_list)}
+            consumed = 0
+            level_size = leaf_count
+            while level_size > 1:
+                parents = {}
+                for idx in sorted(nodes):
+                    sibling_idx = idx ^ 1
+                    if sibling_idx in nodes:
+                        sibling = nodes[sibling_idx]
+                    elif sibling_idx >= level_size:
+                        sibling = nodes[idx]
+                    else:
+                        if consumed >= len(hashes):
+                            return False
+                        sibling = hashes[consumed]
+                        consumed += 1
+                    if idx % 2 == 0:
+                        parents[idx // 2] = node_hash(nodes[idx], sibling, version)
+                    else:
+                        parents[idx // 2] = node_hash(sibling, nodes[idx], version)
+                nodes = parents
+                level_size = (level_size + 1) // 2
+        except (KeyError, TypeError, ValueError):
+            return False
 
+        # Tutti gli hash forniti devono essere stati usati
+        return consumed == len(hashes) and nodes.get(0, b'').hex() == root
+
+    @staticmethod
+    def verify_proof(data_to_verify: Dict[str, Any], proof: List[Dict[str, str]], root: str, version: int) -> bool:
+        """
+        Verifica una Merkle Proof.
+        La versione va indicata (quella registrata accanto alla radice): con
+        version=1 verifica le radici prodotte dal formato originale.
+        """
+        if version == 1:
+            # Una prova malformata (campi mancanti o non stringhe) è solo non valida
+            try:
+                computed_hash = hash_data(data_to_verify)
+
+                for p in proof:
+                    sibling_hash = p['hash']
+                    if p['position'] == 'left':
+                        computed_hash = hash_data(sibling_hash + computed_hash)
+                    elif p['position'] == 'right':
+                        computed_hash = hash_data(computed_hash + sibling_hash)
+                    else:
+                        return False
+            except (KeyError, TypeError, ValueError):
+                return False
+
+            return computed_hash == root
+
+        if version != 2:
+            return False
+
+        # v2: l'esadecimale viene decodificato solo al confine della serializzazione
+        try:
+            computed = leaf_hash(data_to_verify, 2)
+            for p in proof:
+                sibling = bytes.fromhex(p['hash'])
+                if len(sibling) != DIGEST_SIZE:
+                    return False
+                if p['position'] == 'left':
+                    computed = node_hash(sibling, computed, 2)
+                elif p['position'] == 'right':
+                    computed = node_hash(computed, sibling, 2)
+                else:
+                    return False
+        except (KeyError, TypeError, ValueError):
+            return False
 
+        return computed.hex() == root
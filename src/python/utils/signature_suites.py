@@ -0,0 +1,117 @@
+# src/python/utils/signature_suites.py
+"""
+Suite di firma intercambiabili: RSA-PSS (2048 bit), Ed25519 ed ECDSA P-256.
+
+L'identificativo della suite viene registrato in CertificateData e nella parte
+pubblica delle credenziali, così il verificatore sceglie l'algoritmo corretto
+senza configurazione aggiuntiva.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple, Union
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ed25519, ec
+
+from config import KEY_SIZE, PUBLIC_EXPONENT
+
+RSA_PSS_SHA256 = 'rsa-pss-sha256'
+ED25519 = 'ed25519'
+ECDSA_P256_SHA256 = 'ecdsa-p256-sha256'
+
+PrivateKey = Union[rsa.RSAPrivateKey, ed25519.Ed25519PrivateKey, ec.EllipticCurvePrivateKey]
+PublicKey = Union[rsa.RSAPublicKey, ed25519.Ed25519PublicKey, ec.EllipticCurvePublicKey]
+
+
+class SignatureSuite(ABC):
+    """Interfaccia comune delle suite di firma."""
+    name: str
+    private_key_type: type
+    public_key_type: type
+
+    @abstractmethod
+    def generate_keys(self) -> Tuple[PrivateKey, PublicKey]:
+        """Genera una nuova coppia di chiavi della suite."""
+
+    @abstractmethod
+    def sign(self, private_key: PrivateKey, data: bytes) -> bytes:
+        """Firma i byte indicati."""
+
+    @abstractmethod
+    def verify(self, public_key: PublicKey, signature: bytes, data: bytes):
+        """Solleva cryptography.exceptions.InvalidSignature se la firma non è valida."""
+
+    def owns_key(self, key: Union[PrivateKey, PublicKey]) -> bool:
+        """True se la chiave appartiene a questa suite."""
+        return isinstance(key, (self.private_key_type, self.public_key_type))
+
+
+class RsaPssSuite(SignatureSuite):
+    name = RSA_PSS_SHA256
+    private_key_type = rsa.RSAPrivateKey
+    public_key_type = rsa.RSAPublicKey
+
+    _PADDING = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+    def generate_keys(self):
+        private_key = rsa.generate_private_key(public_exponent=PUBLIC_EXPONENT, key_size=KEY_SIZE)
+        return private_key, private_key.public_key()
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, self._PADDING, hashes.SHA256())
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(signature, data, self._PADDING, hashes.SHA256())
+
+
+class Ed25519Suite(SignatureSuite):
+    name = ED25519
+    private_key_type = ed25519.Ed25519PrivateKey
+    public_key_type = ed25519.Ed25519PublicKey
+
+    def generate_keys(self):
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        return private_key, private_key.public_key()
+
+    def sign(self, private_key, data):
+        return private_key.sign(data)
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(signature, data)
+
+
+class EcdsaP256Suite(SignatureSuite):
+    name = ECDSA_P256_SHA256
+    private_key_type = ec.EllipticCurvePrivateKey
+    public_key_type = ec.EllipticCurvePublicKey
+
+    def generate_keys(self):
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        return private_key, private_key.public_key()
+
+    def sign(self, private_key, data):
+        return private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def verify(self, public_key, signature, data):
+        public_key.verify(signature, data, ec.ECDSA(hashes.SHA256()))
+
+    def owns_key(self, key):
+        return super().owns_key(key) and isinstance(key.curve, ec.SECP256R1)
+
+
+SUITES: Dict[str, SignatureSuite] = {
+    suite.name: suite for suite in (RsaPssSuite(), Ed25519Suite(), EcdsaP256Suite())
+}
+
+
+def get_suite(name: str) -> SignatureSuite:
+    """Restituisce la suite con l'identificativo indicato."""
+    try:
+        return SUITES[name]
+    except KeyError:
+        raise ValueError(f"Suite di firma sconosciuta: '{name}'.") from None
+
+def suite_for_key(key: Union[PrivateKey, PublicKey]) -> SignatureSuite:
+    """Individua la suite a cui appartiene una chiave."""
+    for suite in SUITES.values():
+        if suite.owns_key(key):
+            return suite
+    raise ValueError(f"Nessuna suite di firma per chiavi di tipo {type(key).__name__}.")
@@ -0,0 +1,384 @@
+# src/python/utils/wire_format.py
+"""
+Formato binario di trasmissione (versionato) per presentazioni e credenziali.
+
+Ogni messaggio è un array CBOR [versione, tipo, ...campi]. Rispetto al JSON
+di to_dict(serializable=True):
+- hash, radici e pseudonimi viaggiano come digest grezzi da 32 byte;
+- le prove di Merkle sono la concatenazione dei fratelli più una maschera
+  di bit delle direzioni (bit i = 1 se il fratello i è a sinistra);
+- le chiavi pubbliche dei certificati sono DER anziché PEM;
+- il certificato dell'emittente può essere inviato per riferimento (il suo
+  digest), se il destinatario lo conosce già.
+
+I campi che non hanno la forma attesa (es. un ID che non è un UUID) vengono
+trasmessi come testo, così la decodifica restituisce sempre esattamente i
+valori firmati. In decodifica ogni campo deve avere uno dei tipi previsti,
+altrimenti il messaggio viene rifiutato con WireFormatError.
+
+Il decoder lavora su porzioni (memoryview) del messaggio ricevuto: digest e
+fratelli delle prove vengono convertiti in esadecimale direttamente dalla
+porzione, e solo al confine dei modelli i valori binari diventano bytes
+(firme, valori binari dei corsi). Nessuna memoryview finisce nei modelli,
+che restano quindi serializzabili e indipendenti dal buffer ricevuto.
+"""
+import base64
+import binascii
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from . import cbor
+from .credential import AcademicCredential
+from .crypto_utils import hash_data
+from .exceptions import WireFormatError
+from .merkle_tree import MerkleTree, DIGEST_SIZE
+from .signature_suites import RSA_PSS_SHA256, ED25519, ECDSA_P256_SHA256
+from models import (
+    Certificate, CertificateData, VerifiableCredentialPublicPart,
+    VerifiablePresentation, MultiCoursePresentation, Presentation
+)
+
+WIRE_FORMAT_VERSION = 1
+
+# Tipi di messaggio
+KIND_PRESENTATION = 1
+KIND_MULTI_COURSE_PRESENTATION = 2
+KIND_CREDENTIAL = 3
+
+# Forme del certificato
+_CERTIFICATE_INLINE = 0
+_CERTIFICATE_REFERENCE = 1
+
+# Codici compatti delle suite di firma
+_SUITE_CODES = {RSA_PSS_SHA256: 0, ED25519: 1, ECDSA_P256_SHA256: 2}
+_SUITE_NAMES = {code: name for name, code in _SUITE_CODES.items()}
+
+_PEM_HEADER = '-----BEGIN PUBLIC KEY-----\n'
+_PEM_FOOTER = '-----END PUBLIC KEY-----\n'
+
+# Restituisce il certificato con il digest indicato, o None se sconosciuto
+CertificateResolver = Callable[[str], Optional[Certificate]]
+
+# Byte string decodificate (memoryview con zero_copy)
+_BYTES = (bytes, memoryview)
+_NONE = type(None)
+
+
+def _plain(value: Any) -> Any:
+    """Copia in bytes le memoryview annidate in un valore decodificato (es. i campi di un corso)."""
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _expect(value: Any, types: tuple, field: str) -> Any:
+    """Restituisce value se è di uno dei tipi attesi, altrimenti solleva WireFormatError."""
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        raise WireFormatError(f"Campo '{field}' di tipo non valido: {type(value).__name__}.")
+    return value
+
+def _expect_array(value: Any, length: int, field: str) -> List[Any]:
+    """value deve essere un array CBOR di esattamente length elementi."""
+    if not isinstance(value, list) or len(value) != length:
+        raise WireFormatError(f"Campo '{field}' non valido: atteso un array di {length} elementi.")
+    return value
+
+
+# ---------------------------------------------------------------------- campi compatti
+def _pack_digest(value: Optional[str]) -> Union[bytes, str, None]:
+    """Digest esadecimale -> 32 byte grezzi (testo invariato se non è un digest canonico)."""
+    if value is None:
+        return None
+    if len(value) == 2 * DIGEST_SIZE and value == value.lower():
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return value
+
+def _unpack_digest(value: Any, field: str) -> Optional[str]:
+    if value is None or isinstance(_expect(value, (str, *_BYTES), field), str):
+        return value
+    return value.hex()
+
+def _pack_uuid(value: str) -> Union[bytes, str]:
+    try:
+        packed = uuid.UUID(value)
+    except ValueError:
+        return value
+    return packed.bytes if str(packed) == value else value
+
+def _unpack_uuid(value: Any, field: str) -> str:
+    return value if isinstance(_expect(value, (str, *_BYTES), field), str) else str(uuid.UUID(bytes=bytes(value)))
+
+def _pack_suite(name: str) -> Union[int, str]:
+    return _SUITE_CODES.get(name, name)
+
+def _unpack_suite(value: Any) -> str:
+    if isinstance(_expect(value, (str, int), 'signature_suite'), str):
+        return value
+    if value not in _SUITE_NAMES:
+        raise WireFormatError(f"Codice di suite di firma sconosciuto: {value}")
+    return _SUITE_NAMES[value]
+
+def _pem_to_der(pem: str) -> Union[bytes, str]:
+    """PEM -> DER, solo se la riconversione restituisce esattamente lo stesso PEM."""
+    if not (pem.startswith(_PEM_HEADER) and pem.endswith(_PEM_FOOTER)):
+        return pem
+    try:
+        der = base64.b64decode(pem[len(_PEM_HEADER):-len(_PEM_FOOTER)], validate=False)
+    except (binascii.Error, ValueError):
+        return pem
+    return der if _der_to_pem(der) == pem else pem
+
+def _der_to_pem(der: Any) -> str:
+    if isinstance(_expect(der, (str, *_BYTES), 'public_key'), str):
+        return der
+    encoded = base64.b64encode(der).decode('ascii')
+    lines = [encoded[i:i + 64] for i in range(0, len(encoded), 64)]
+    return _PEM_HEADER + ''.join(line + '\n' for line in lines) + _PEM_FOOTER
+
+
+# ---------------------------------------------------------------------- prove di Merkle
+def _pack_proof(proof: Optional[List[Dict[str, str]]]) -> Optional[List[Any]]:
+    """Prova -> [fratelli concatenati, maschera delle direzioni]."""
+    if proof is None:
+        return None
+    siblings = bytearray()
+    mask = 0
+    for i, step in enumerate(proof):
+        sibling = bytes.fromhex(step['hash'])
+        if len(sibling) != DIGEST_SIZE or step['position'] not in ('left', 'right'):
+            raise WireFormatError("Prova di Merkle non rappresentabile nel formato binario.")
+        siblings += sibling
+        if step['position'] == 'left':
+            mask |= 1 << i
+    return [bytes(siblings), mask.to_bytes((len(proof) + 7) // 8, 'little')]
+
+def _unpack_proof(packed: Optional[List[Any]], field: str) -> Optional[List[Dict[str, str]]]:
+    if packed is None:
+        return None
+    siblings, mask_bytes = _expect_array(packed, 2, field)
+    _expect(siblings, _BYTES, field)
+    _expect(mask_bytes, _BYTES, field)
+    if len(siblings) % DIGEST_SIZE:
+        raise WireFormatError("Lunghezza dei fratelli della prova di Merkle non valida.")
+    mask = int.from_bytes(mask_bytes, 'little')
+    return [
+        {
+            'hash': siblings[offset:offset + DIGEST_SIZE].hex(),
+            'position': 'left' if mask >> i & 1 else 'right'
+        }
+        for i, offset in enumerate(range(0, len(siblings), DIGEST_SIZE))
+    ]
+
+def _pack_multiproof(multiproof: Dict[str, Any]) -> List[Any]:
+    return [
+        list(multiproof['indices']),
+        multiproof['leaf_count'],
+        b''.join(bytes.fromhex(h) for h in multiproof['hashes'])
+    ]
+
+def _unpack_multiproof(packed: List[Any]) -> Dict[str, Any]:
+    indices, leaf_count, hashes = _expect_array(packed, 3, 'merkle_multiproof')
+    for index in _expect(indices, (list,), 'merkle_multiproof.indices'):
+        _expect(index, (int,), 'merkle_multiproof.indices')
+    _expect(leaf_count, (int,), 'merkle_multiproof.leaf_count')
+    if len(_expect(hashes, _BYTES, 'merkle_multiproof.hashes')) % DIGEST_SIZE:
+        raise WireFormatError("Lunghezza degli hash della multiproof non valida.")
+    return {
+        'indices': list(indices),
+        'leaf_count': leaf_count,
+        'hashes': [hashes[i:i + DIGEST_SIZE].hex() for i in range(0, len(hashes), DIGEST_SIZE)]
+    }
+
+
+# ---------------------------------------------------------------------- modelli
+def _pack_certificate(certificate: Certificate, by_reference: bool) -> List[Any]:
+    if by_reference:
+        return [_CERTIFICATE_REFERENCE, bytes.fromhex(hash_data(certificate))]
+    data = certificate.data
+    return [
+        _CERTIFICATE_INLINE,
+        data.university_id,
+        _pem_to_der(data.public_key_pem),
+        _pack_suite(data.signature_suite),
+        certificate.signature,
+        certificate.authority_name
+    ]
+
+def _unpack_certificate(packed: List[Any], resolve_certificate: Optional[CertificateResolver]) -> Certificate:
+    if not isinstance(packed, list) or not packed:
+        raise WireFormatError("Certificato dell'emittente non valido: atteso un array.")
+    if packed[0] == _CERTIFICATE_REFERENCE:
+        _, digest = _expect_array(packed, 2, 'issuer_certificate')
+        if len(_expect(digest, _BYTES, 'issuer_certificate.digest')) != DIGEST_SIZE:
+            raise WireFormatError("Digest del certificato per riferimento non valido.")
+        digest = digest.hex()
+        certificate = resolve_certificate(digest) if resolve_certificate is not None else None
+        if certificate is None:
+            raise WireFormatError(f"Certificato per riferimento sconosciuto: {digest[:16]}...")
+        return certificate
+    if packed[0] != _CERTIFICATE_INLINE:
+        raise WireFormatError("Forma del certificato non riconosciuta.")
+    _, university_id, public_key, suite, signature, authority_name = _expect_array(packed, 6, 'issuer_certificate')
+    return Certificate(
+        data=CertificateData(
+            university_id=_expect(university_id, (str,), 'issuer_certificate.university_id'),
+            public_key_pem=_der_to_pem(public_key),
+            signature_suite=_unpack_suite(suite)
+        ),
+        signature=bytes(_expect(signature, _BYTES, 'issuer_certificate.signature')),
+        authority_name=_expect(authority_name, (str,), 'issuer_certificate.authority_name')
+    )
+
+def _pack_public_part(public_part: VerifiableCredentialPublicPart) -> List[Any]:
+    packed = [
+        _pack_uuid(public_part.credential_id),
+        public_part.issuer_id,
+        _pack_digest(public_part.student_pseudonym),
+        _pack_digest(public_part.merkle_root),
+        public_part.issue_date,
+        public_part.merkle_version,
+        _pack_suite(public_part.signature_suite)
+    ]
+    # La posizione nella lista di stato si accoda solo se presente: i messaggi senza restano invariati
+    if public_part.status_list_id is not None or public_part.status_list_index is not None:
+        packed += [public_part.status_list_id, public_part.status_list_index]
+    return packed
+
+def _unpack_public_part(packed: List[Any]) -> VerifiableCredentialPublicPart:
+    if not isinstance(packed, list) or len(packed) not in (7, 9):
+        raise WireFormatError("Parte pubblica della credenziale non valida: atteso un array di 7 o 9 elementi.")
+    credential_id, issuer_id, pseudonym, merkle_root, issue_date, merkle_version, suite, *status = packed
+    status_list_id, status_list_index = status if status else (None, None)
+    return VerifiableCredentialPublicPart(
+        credential_id=_unpack_uuid(credential_id, 'credential_id'),
+        issuer_id=_expect(issuer_id, (str,), 'issuer_id'),
+        student_pseudonym=_unpack_digest(pseudonym, 'student_pseudonym'),
+        merkle_root=_unpack_digest(merkle_root, 'merkle_root'),
+        issue_date=_expect(issue_date, (str,), 'issue_date'),
+        merkle_version=_expect(merkle_version, (int,), 'merkle_version'),
+        signature_suite=_unpack_suite(suite),
+        status_list_id=_expect(status_list_id, (str, _NONE), 'status_list_id'),
+        status_list_index=_expect(status_list_index, (int, _NONE), 'status_list_index')
+    )
+
+
+def _decode_message(data: bytes, expected_kinds: tuple) -> List[Any]:
+    try:
+        message = cbor.loads(data, zero_copy=True)
+    except cbor.CBORDecodeError as e:
+        raise WireFormatError(str(e)) from None
+    if not isinstance(message, list) or len(message) < 2:
+        raise WireFormatError("Messaggio non riconosciuto.")
+    if message[0] != WIRE_FORMAT_VERSION:
+        raise WireFormatError(f"Versione del formato non supportata: {message[0]}")
+    if message[1] not in expected_kinds:
+        raise WireFormatError(f"Tipo di messaggio inatteso: {message[1]}")
+    return message
+
+
+# ---------------------------------------------------------------------- API
+def encode_presentation(presentation: Presentation, certificate_by_reference: bool = False) -> bytes:
+    """
+    Codifica una presentazione (singolo corso o multi-corso) nel formato binario.
+
+    Args:
+        presentation: La presentazione da trasmettere.
+        certificate_by_reference: Invia solo il digest del certificato dell'emittente.
+    """
+    common = [
+        _pack_public_part(presentation.original_credential_public_part),
+        _pack_certificate(presentation.issuer_certificate, certificate_by_reference),
+        presentation.credential_signature,
+        _pack_digest(presentation.batch_root),
+        _pack_proof(presentation.batch_proof)
+    ]
+    if isinstance(presentation, MultiCoursePresentation):
+        return cbor.dumps([
+            WIRE_FORMAT_VERSION, KIND_MULTI_COURSE_PRESENTATION, *common,
+            presentation.presented_courses, _pack_multiproof(presentation.merkle_multiproof)
+        ])
+    return cbor.dumps([
+        WIRE_FORMAT_VERSION, KIND_PRESENTATION, *common,
+        presentation.presented_course, _pack_proof(presentation.merkle_proof)
+    ])
+
+def decode_presentation(data: bytes, resolve_certificate: Optional[CertificateResolver] = None) -> Presentation:
+    """
+    Decodifica una presentazione prodotta da encode_presentation.
+    Solleva WireFormatError se il messaggio non è valido.
+
+    Args:
+        data: I byte ricevuti.
+        resolve_certificate: Risolve i certificati inviati per riferimento.
+    """
+    message = _decode_message(data, (KIND_PRESENTATION, KIND_MULTI_COURSE_PRESENTATION))
+    try:
+        _, kind, public_part, certificate, signature, batch_root, batch_proof, courses, proof = message
+        common = dict(
+            original_credential_public_part=_unpack_public_part(public_part),
+            issuer_certificate=_unpack_certificate(certificate, resolve_certificate),
+            credential_signature=bytes(_expect(signature, _BYTES, 'credential_signature')),
+            batch_root=_unpack_digest(batch_root, 'batch_root'),
+            batch_proof=_unpack_proof(batch_proof, 'batch_proof')
+        )
+        if kind == KIND_MULTI_COURSE_PRESENTATION:
+            for course in _expect(courses, (list,), 'presented_courses'):
+                _expect(course, (dict,), 'presented_courses')
+            return MultiCoursePresentation(
+                type="MultiCoursePresentation",
+                presented_courses=_plain(courses),
+                merkle_multiproof=_unpack_multiproof(proof),
+                **common
+            )
+        return VerifiablePresentation(
+            type="VerifiablePresentation",
+            presented_course=_plain(_expect(courses, (dict,), 'presented_course')),
+            merkle_proof=_unpack_proof(proof, 'merkle_proof'),
+            **common
+        )
+    except (ValueError, TypeError, LookupError) as e:
+        raise WireFormatError(f"Presentazione non valida: {e}") from None
+
+def encode_credential(credential: AcademicCredential, certificate_by_reference: bool = False) -> bytes:
+    """Codifica una credenziale completa (con tutti i corsi) nel formato binario."""
+    return cbor.dumps([
+        WIRE_FORMAT_VERSION, KIND_CREDENTIAL,
+        _pack_public_part(credential.get_public_part()),
+        _pack_certificate(credential.issuer_info, certificate_by_reference),
+        credential.signature,
+        _pack_digest(credential.batch_root),
+        _pack_proof(credential.batch_proof),
+        credential.courses
+    ])
+
+def decode_credential(data: bytes, resolve_certificate: Optional[CertificateResolver] = None) -> AcademicCredential:
+    """
+    Decodifica una credenziale prodotta da encode_credential, ricostruendo il Merkle Tree.
+    Solleva WireFormatError se il messaggio non è valido.
+    """
+    message = _decode_message(data, (KIND_CREDENTIAL,))
+    try:
+        _, _, public_part, certificate, signature, batch_root, batch_proof, courses = message
+        public_part = _unpack_public_part(public_part)
+        courses = [
+            dict(sorted(_plain(_expect(course, (dict,), 'courses')).items()))
+            for course in _expect(courses, (list,), 'courses')
+        ]
+        return AcademicCredential.from_stored(
+            public_part=public_part,
+            issuer_certificate=_unpack_certificate(certificate, resolve_certificate),
+            courses=courses,
+            tree=MerkleTree(courses, version=public_part.merkle_version),
+            signature=bytes(_expect(signature, _BYTES, 'signature')),
+            batch_root=_unpack_digest(batch_root, 'batch_root'),
+            batch_proof=_unpack_proof(batch_proof, 'batch_proof')
+        )
+    except (ValueError, TypeError, LookupError, AttributeError) as e:
+        raise WireFormatError(f"Credenziale non valida: {e}") from None
@@ -0,0 +1,165 @@
+# src/python/verification_loadgen.py
+"""
+Generatore di carico per il servizio di verifica asincrono.
+
+Avvia in locale il servizio (VerifyingUniversity.verification_service) con
+un'università verificatrice che si fida dell'EA di benchmark, poi apre
+--clients connessioni; ciascuna mantiene --concurrency richieste in volo
+finché non ne ha inviate --requests. Riporta throughput, percentili della
+latenza vista dal client, dimensione media dei micro-batch e richieste rifiutate.
+
+Esempio:
+    python verification_loadgen.py --clients 16 --concurrency 8 --requests 500 --window 0.002
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from AccreditationAuthority.accreditation_authority import AccreditationAuthority
+from IssuingUniversity.issuing_university import IssuingUniversity
+from Student.student import Student
+from VerifyingUniversity.verifying_university import VerifyingUniversity
+from VerifyingUniversity.verification_service import VerificationClient, VerificationService
+from Revocation.revocation import RevocationRegistry
+from utils.wire_format import encode_presentation
+from config import (
+    LOG_LEVEL, LOG_FORMAT, VERIFICATION_BATCH_WINDOW_SECONDS, VERIFICATION_BATCH_MAX_SIZE,
+    VERIFICATION_SERVICE_MAX_PENDING
+)
+
+# --- CONFIGURAZIONE PREDEFINITA ---
+NUM_CLIENTS = 8
+NUM_REQUESTS_PER_CLIENT = 200
+CONCURRENCY_PER_CLIENT = 4
+NUM_DISTINCT_PRESENTATIONS = 32
+NUM_COURSES_PER_CREDENTIAL = 10
+
+
+def generate_mock_courses(num_courses: int) -> list:
+    """Genera una lista di corsi fittizi per il test."""
+    return [{"id": i, "nome": f"Corso di Prova {i}", "voto": 28, "cfu": 6} for i in range(1, num_courses + 1)]
+
+def prepare_presentations(count: int, courses: int, certificate_by_reference: bool) -> Tuple[VerifyingUniversity, List[bytes], bytes]:
+    """
+    Crea gli attori ed emette count credenziali. Restituisce il verificatore,
+    le presentazioni codificate e una presentazione con certificato in linea,
+    da inviare per prima quando le altre lo riferiscono soltanto.
+    """
+    ea = AccreditationAuthority(name="Loadgen-EA")
+    issuer = IssuingUniversity(university_id="Loadgen-UE", accreditation_authority=ea)
+    verifier = VerifyingUniversity(university_id="Loadgen-UV")
+    verifier.add_trusted_authority(ea)
+    student = Student(name="Loadgen-Student")
+    issuer.issue_credentials([(student.wallet, generate_mock_courses(courses))] * count, max_workers=1)
+
+    presentations = [
+        student.wallet.create_selective_presentation(cred_id, 1) for cred_id in list(student.wallet.credentials)[:count]
+    ]
+    encoded = [encode_presentation(p, certificate_by_reference) for p in presentations]
+    return verifier, encoded, encode_presentation(presentations[0])
+
+async def run_client(host: str, port: int, payloads: List[bytes], requests: int, concurrency: int, offset: int) -> Dict[str, Any]:
+    """Una connessione con concurrency richieste in volo; restituisce latenze (ms) ed esiti."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async with await VerificationClient.connect(host, port) as client:
+        async def worker():
+            for i in counter:
+                payload = payloads[(offset + i) % len(payloads)]
+                start_time = time.perf_counter()
+                reply = await client.verify(payload)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+                if not reply.valid:
+                    errors[reply.error] = errors.get(reply.error, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors}
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    verifier, payloads, warmup_payload = prepare_presentations(args.distinct, args.courses, args.by_reference)
+    with tempfile.TemporaryDirectory(prefix="aps-loadgen-") as workdir:
+        registry = RevocationRegistry(registry_file_path=os.path.join(workdir, "revocation_list.json"))
+        service = VerificationService(
+            verifier, registry, port=0,
+            batch_window=args.window, max_batch_size=args.batch_max,
+            max_pending=args.max_pending, max_workers=args.workers
+        )
+        async with service:
+            host, port = service.address
+            # Prima richiesta con il certificato in linea: la UV lo verifica e lo mette in cache
+            async with await VerificationClient.connect(host, port) as client:
+                await client.verify(warmup_payload)
+
+            start_time = time.perf_counter()
+            outcomes = await asyncio.gather(*(
+                run_client(host, port, payloads, args.requests, args.concurrency, offset=c * args.requests)
+                for c in range(args.clients)
+            ))
+            elapsed = time.perf_counter() - start_time
+            batches, served = service.batches_dispatched, service.requests_served
+        registry.close()
+
+    latencies = sorted(ms for outcome in outcomes for ms in outcome["latencies"])
+    errors: Dict[str, int] = {}
+    for outcome in outcomes:
+        for name, count in outcome["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        "clients": args.clients,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(latencies) / elapsed,
+        "latency_ms": {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": latencies[-1]},
+        "mean_batch_size": served / batches if batches else 0.0,
+        "errors": errors,
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generatore di carico per il servizio di verifica.")
+    parser.add_argument("--clients", type=int, default=NUM_CLIENTS, help="connessioni concorrenti")
+    parser.add_argument("--requests", type=int, default=NUM_REQUESTS_PER_CLIENT, help="richieste per connessione")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY_PER_CLIENT, help="richieste in volo per connessione")
+    parser.add_argument("--distinct", type=int, default=NUM_DISTINCT_PRESENTATIONS, help="presentazioni distinte inviate a rotazione")
+    parser.add_argument("--courses", type=int, default=NUM_COURSES_PER_CREDENTIAL, help="corsi per credenziale")
+    parser.add_argument("--window", type=float, default=VERIFICATION_BATCH_WINDOW_SECONDS, help="finestra dei micro-batch in secondi")
+    parser.add_argument("--batch-max", type=int, default=VERIFICATION_BATCH_MAX_SIZE, help="presentazioni al massimo per micro-batch")
+    parser.add_argument("--max-pending", type=int, default=VERIFICATION_SERVICE_MAX_PENDING, help="richieste in attesa oltre cui il servizio rifiuta")
+    parser.add_argument("--workers", type=int, default=None, help="processi per le firme (default: numero di core)")
+    parser.add_argument("--by-reference", action="store_true", help="invia il certificato dell'emittente per riferimento")
+    parser.add_argument("--output", help="file JSON su cui scrivere i risultati")
+    args = parser.parse_args(argv)
+    if min(args.clients, args.requests, args.concurrency, args.distinct, args.courses, args.batch_max, args.max_pending) < 1:
+        parser.error("Tutti i conteggi devono essere almeno 1.")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    print("--- Inizio Generazione di Carico ---")
+    print(f"Configurazione: {args.clients} client x {args.requests} richieste, {args.concurrency} in volo per client, finestra {args.window * 1000:.1f} ms.")
+    result = asyncio.run(run_load(args))
+
+    latency = result["latency_ms"]
+    print(f"\nRichieste completate: {result['requests']} in {result['elapsed_s']:.2f} s ({result['throughput_per_s']:.1f} richieste/s)")
+    print(f"Latenza (ms): p50 {latency['p50']:.3f}  p95 {latency['p95']:.3f}  p99 {latency['p99']:.3f}  max {latency['max']:.3f}")
+    print(f"Dimensione media dei micro-batch: {result['mean_batch_size']:.1f}")
+    if result["errors"]:
+        print("Esiti negativi: " + ", ".join(f"{name}={count}" for name, count in sorted(result["errors"].items())))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nRisultati scritti in '{args.output}'.")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    main()